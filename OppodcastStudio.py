@@ -1,17 +1,119 @@
+import time
+LAUNCHED = time.perf_counter()  # Origin of the startup timeline, before the heavy imports
 import customtkinter as ctk
 import pygame
+import tkinter as tk
 import os
+import sys
 import json
-import time
-from datetime import datetime
+import mmap
+import socket
+import struct
+import hashlib
+import hmac
+import ipaddress
+import re
+import io
+import csv
+import base64
+import tempfile
+import sqlite3
+import subprocess
+import bisect
+from contextlib import contextmanager
+from functools import wraps
+import queue
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener, Pipe
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlsplit
 from tkinter import filedialog, Menu
 
+try:
+    import numpy as np
+except ImportError:  # Waveforms are simply not drawn without NumPy
+    np = None
+
 # --- CONFIGURATION ---
 ctk.set_appearance_mode("Dark")
 ctk.set_default_color_theme("blue")
 
 CONFIG_DIR = "presets"
+CACHE_DIR = "cache"
+PCM_CACHE_DIR = os.path.join(CACHE_DIR, "pcm")
+PEAKS_CACHE_DIR = os.path.join(CACHE_DIR, "peaks")
 NOTES_FILE = "notes.txt"
+LIBRARY_DB = os.path.join(CONFIG_DIR, "library.db")
+NOTES_BACKUP_DIR = "notes_backups"
+NOTES_DEBOUNCE_MS = 600  # Quiet time after the last keystroke before notes are written
+PRESET_SAVE_DELAY_MS = 250  # Edits closer together than this share one preset write
+SOUND_CACHE_BUDGET = 512 * 1024 * 1024  # Bytes of decoded audio kept for reuse
+STREAM_THRESHOLD = 180  # Seconds; longer files play from disk instead of RAM
+WATCH_INTERVAL = 30  # Seconds between background rescans of watched library folders
+AUDIO_EXTENSIONS = (".mp3", ".wav", ".ogg")
+WAVEFORM_RESOLUTIONS = (64, 256, 1024)  # Buckets per overview: pads, player bar, detail
+LOUDNESS_TARGET = -16.0  # LUFS every slot is brought to when normalisation is on
+TRUE_PEAK_CEILING = -1.0  # dBTP that gain may never push a file above
+SILENCE_THRESHOLD_DB = -60.0  # Level below which leading/trailing audio counts as silence
+CUE_PREROLL = 0.01  # Seconds kept before the first audible sample so attacks aren't clipped
+FRAME_MS = 16  # One UI frame, the granularity of end-of-playback updates
+MIXER_CHANNELS = 32  # Mixer channels opened at start
+MAX_MIXER_CHANNELS = 128  # The pool grows up to this before voices get stolen
+MIXER_GROW = 16  # Channels added each time the pool is full
+VOICE_STEALING = "priority"  # Voice given up when the pool is full: "oldest", "quietest" or "priority"
+PLAY_MODES = ("toggle", "retrigger", "overlap", "one_shot", "loop")
+MODE_PRIORITY = {"overlap": 0, "retrigger": 1, "one_shot": 1, "toggle": 2, "loop": 3}  # Stolen lowest first
+CUE_ARM_AHEAD = 0.5  # Seconds before a cue list item ends that the next one is queued behind it
+CUE_POLL_MS = 20  # Engine event polling while the cue list is running
+ENGINE_ADDRESS = ("127.0.0.1", 47815)  # Where the audio engine process listens
+ENGINE_KEY_FILE = os.path.join(CACHE_DIR, "engine.key")
+ENGINE_LOG_FILE = os.path.join(CACHE_DIR, "engine.log")
+ENGINE_IDLE_POLL = 0.05  # Seconds the engine waits for commands when nothing is due
+ENGINE_SPAWN_TIMEOUT = 5  # Seconds to wait for a freshly started engine to answer
+STARTUP_POLL_MS = 20  # How often the window checks whether the engine has answered, while starting
+ENGINE_ORPHAN_TIMEOUT = 60  # Seconds an engine without UI and without sound waits for one
+ENGINE_MAX_RESPAWNS = 3  # Engine deaths within a minute before it runs on a thread of the window instead
+ENGINE_WATCH_MS = 1000  # How often an idle window checks that the engine is still there
+AUDIO_DRIVER = os.environ.get("SDL_AUDIODRIVER")  # As launched, before a UI silences its own mixer
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 33, 50, 100, 250, 500, 1000, 2500)
+STALL_PROBE_MS = 100  # Period of the event-loop heartbeat
+STALL_THRESHOLD_MS = 50  # A heartbeat this late means the main loop was blocked
+BANK_ROWS, BANK_COLS = 5, 6  # Size of a new bank
+MAX_BANK_ROWS, MAX_BANK_COLS = 26, 12  # Rows are lettered A-Z
+PREFETCH_BANKS = 1  # Banks either side of the visible one whose sounds are kept loaded
+PREFETCH_DEPTH = 2  # Background loads in flight before prefetching waits
+PREFETCH_INTERVAL_MS = 50
+PRESET_SWITCH_POLL_MS = 20  # How often a staged preset is checked for readiness
+PRESET_SWITCH_TIMEOUT_MS = 5000  # Switch anyway after this, the rest loads in place
+PREDICT_PRESETS = 2  # Likely next presets decoded ahead of time
+PREDICT_BUDGET = 128 * 1024 * 1024  # Bytes of decoded audio those may add to the sound cache
+PREDICT_QUIET_MS = 500  # Decoding ahead waits this long after a trigger or a real load
+RUNDOWN_FILE = os.path.join(CONFIG_DIR, "rundown.txt")  # Presets in show order, one per line
+HISTORY_FILE = os.path.join(CACHE_DIR, "preset_history.json")  # Switch counts between presets
+ASRUN_FILE = os.path.join("logs", "asrun.jsonl")  # As-run log, rotated next to itself
+ASRUN_BUFFER = 4096  # Plays held in memory until the writer has saved them
+ASRUN_BATCH = 256  # Plays that wake the writer early...
+ASRUN_FLUSH_S = 2.0  # ...otherwise it writes this often
+ASRUN_MAX_BYTES = 8 * 1024 * 1024  # Size at which the log file is rotated
+ASRUN_KEEP = 0  # Rotated files kept; 0 keeps every one
+ASRUN_END_TOLERANCE = 0.25  # Seconds short of its end a play may stop and still count as complete
+REMOTE_HOST = os.environ.get("OPPODCAST_REMOTE_HOST", "127.0.0.1")  # "0.0.0.0" to accept the LAN
+REMOTE_TOKEN_FILE = os.path.join(CACHE_DIR, "remote.token")  # Shared secret other machines must send
+REMOTE_ORIGINS = {o.strip() for o in os.environ.get("OPPODCAST_REMOTE_ORIGINS", "").split(",") if o.strip()}  # Web pages besides localhost's
+REMOTE_OSC_PORT = 9000  # UDP
+REMOTE_WS_PORT = 9001  # TCP
+REMOTE_POLL_MS = 30  # How often the window catches up on remote commands
+REMOTE_RATE = 100  # Commands per second allowed per client...
+REMOTE_BURST = 30  # ...with bursts up to this many
+REMOTE_DEBOUNCE_MS = 50  # Repeated hits of one pad closer than this count once
+REMOTE_MAX_CLIENTS = 16
+REMOTE_MAX_MESSAGE = 64 * 1024
+OSC_MAX_DEPTH = 8  # Bundles nested deeper than this are rejected
+REMOTE_MAX_BACKLOG = 1024 * 1024  # Bytes queued for a WebSocket client that stopped reading
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
 
 if not os.path.exists(CONFIG_DIR):
     os.makedirs(CONFIG_DIR)
@@ -36,9 +138,49 @@ TRANSLATIONS = {
         "btn_reset": "RESET",
         "status_live": "Prêt (Live)",
         "status_edit": "Sélectionnez ou déplacez",
+        "status_preparing": "Préparation de la palette...",
+        "status_engine_lost": "Moteur audio relancé",
         "warn_edit": "Activez le Mode Édition !",
         "new_preset": "Nouvelle Palette",
-        "name_prompt": "Nom :"
+        "name_prompt": "Nom :",
+        "loading": "Chargement...",
+        "search": "Rechercher...",
+        "folder_btn": "Dossier...",
+        "missing": "(introuvable)",
+        "normalize": "Normaliser le volume",
+        "remote": "Télécommande (OSC/WebSocket)",
+        "bank": "Banque",
+        "new_bank": "Nouvelle banque",
+        "bank_prompt": "Lignes x colonnes (ex. 5x6) :",
+        "rundown": "Conducteur",
+        "rundown_prompt": "Palettes dans l'ordre de l'émission, séparées par des virgules :",
+        "asrun": "Diffusé...",
+        "asrun_prompt": "Période, ex. 2026-10-17 ou 2026-10-17 09:00 / 2026-10-17 12:00 (vide = aujourd'hui) :",
+        "cue_start": "Point d'entrée (s)...",
+        "cue_end": "Point de sortie (s)...",
+        "cue_reset": "Points de cue automatiques",
+        "cue_prompt": "Secondes depuis le début du fichier (vide = auto) :",
+        "diagnostics": "Diagnostics",
+        "diag_dump": "Exporter JSON",
+        "diag_reset": "Réinitialiser",
+        "play_from": "Lecture",
+        "mode_auto": "Auto (selon durée)",
+        "play_mode": "Appui",
+        "mode_toggle": "Lecture / arrêt",
+        "mode_retrigger": "Relance au début",
+        "mode_overlap": "Superposition",
+        "mode_one_shot": "Une fois (sans arrêt)",
+        "mode_loop": "Boucle",
+        "cuelist_next": "Suivant",
+        "cuelist_empty": "Liste de cues vide",
+        "cuelist_add": "Ajouter à la liste de cues",
+        "cuelist_remove": "Retirer de la liste de cues",
+        "cuelist_fade": "Fondu...",
+        "cuelist_fade_prompt": "Fondu enchaîné entre les cues, en secondes (0 = sans blanc) :",
+        "cuelist_follow": "Enchaîner",
+        "cuelist_clear": "Vider",
+        "mode_memory": "Mémoire",
+        "mode_stream": "Flux disque"
     },
     "en": {
         "commands": "CONTROLS",
@@ -58,207 +200,3657 @@ TRANSLATIONS = {
         "btn_reset": "RESET",
         "status_live": "Ready (Live)",
         "status_edit": "Select or Move items",
+        "status_preparing": "Preparing preset...",
+        "status_engine_lost": "Audio engine restarted",
         "warn_edit": "Enable Edit Mode first!",
         "new_preset": "New Palette",
-        "name_prompt": "Name:"
+        "name_prompt": "Name:",
+        "loading": "Loading...",
+        "search": "Search...",
+        "folder_btn": "Folder...",
+        "missing": "(missing)",
+        "normalize": "Normalize loudness",
+        "remote": "Remote control (OSC/WebSocket)",
+        "bank": "Bank",
+        "new_bank": "New bank",
+        "bank_prompt": "Rows x columns (e.g. 5x6):",
+        "rundown": "Rundown",
+        "rundown_prompt": "Presets in show order, separated by commas:",
+        "asrun": "As-run...",
+        "asrun_prompt": "Time range, e.g. 2026-10-17 or 2026-10-17 09:00 / 2026-10-17 12:00 (empty = today):",
+        "cue_start": "Cue in (s)...",
+        "cue_end": "Cue out (s)...",
+        "cue_reset": "Automatic cue points",
+        "cue_prompt": "Seconds from the start of the file (empty = auto):",
+        "diagnostics": "Diagnostics",
+        "diag_dump": "Dump JSON",
+        "diag_reset": "Reset",
+        "play_from": "Playback",
+        "mode_auto": "Auto (by duration)",
+        "play_mode": "On press",
+        "mode_toggle": "Play / stop",
+        "mode_retrigger": "Restart from the top",
+        "mode_overlap": "Overlap (polyphonic)",
+        "mode_one_shot": "One-shot (no stop)",
+        "mode_loop": "Loop",
+        "cuelist_next": "Next",
+        "cuelist_empty": "Cue list empty",
+        "cuelist_add": "Add to cue list",
+        "cuelist_remove": "Remove from cue list",
+        "cuelist_fade": "Fade...",
+        "cuelist_fade_prompt": "Crossfade between cues, in seconds (0 = gapless):",
+        "cuelist_follow": "Auto-follow",
+        "cuelist_clear": "Clear",
+        "mode_memory": "Memory",
+        "mode_stream": "Disk stream"
     }
 }
 
-class LibraryItem(ctk.CTkFrame):
+def atomic_write_text(path, text):
+    """Write through a temp file and rename, so a crash never leaves a truncated file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def path_key(path):
+    """Normalised form used to compare paths coming from dialogs, presets and scans."""
+    return os.path.normcase(os.path.normpath(os.path.abspath(path)))
+
+
+def file_identity(path):
+    """Key that changes whenever the file on disk changes."""
+    st = os.stat(path)
+    return (os.path.normcase(os.path.abspath(path)), st.st_mtime_ns, st.st_size)
+
+
+def sound_nbytes(sound):
+    freq, size, channels = pygame.mixer.get_init()
+    return int(round(sound.get_length() * freq)) * channels * (abs(size) // 8)
+
+
+MP3_BITRATES = {
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],  # MPEG-1 Layer III
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],      # MPEG-2/2.5 Layer III
+}
+MP3_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+
+def probe_audio(path):
+    """
+    Read codec, duration and format from the file headers without decoding.
+    Returns None when the format is not recognised.
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        head = f.read(64 * 1024)
+        if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+            info = _probe_wav(f)
+        elif head[:4] == b"OggS":
+            f.seek(max(0, size - 64 * 1024))
+            info = _probe_ogg(head, f.read())
+        else:
+            info = _probe_mp3(head, size)
+    if info:
+        info["size"] = size
+    return info
+
+
+def _probe_wav(f):
+    f.seek(12)
+    fmt = None
+    while True:
+        chunk = f.read(8)
+        if len(chunk) < 8: return None
+        cid, clen = chunk[:4], struct.unpack("<I", chunk[4:])[0]
+        if cid == b"fmt ":
+            fmt = f.read(clen)
+            f.seek(clen % 2, 1)
+        elif cid == b"data" and fmt:
+            channels, rate, byte_rate = struct.unpack("<HII", fmt[2:12])
+            return {"codec": "wav", "sample_rate": rate, "channels": channels,
+                    "duration": clen / byte_rate if byte_rate else 0}
+        else:
+            f.seek(clen + clen % 2, 1)
+
+
+def _probe_ogg(head, tail):
+    pos = tail.rfind(b"OggS")
+    if pos < 0 or len(tail) < pos + 14: return None
+    granule = struct.unpack("<q", tail[pos + 6:pos + 14])[0]
+    vorbis = head.find(b"\x01vorbis")
+    if vorbis >= 0:
+        channels, rate = struct.unpack("<BI", head[vorbis + 11:vorbis + 16])
+        codec = "vorbis"
+    elif head.find(b"OpusHead") >= 0:
+        channels, rate = head[head.find(b"OpusHead") + 9], 48000  # Opus granules are always 48 kHz
+        codec = "opus"
+    else:
+        return None
+    return {"codec": codec, "sample_rate": rate, "channels": channels,
+            "duration": max(granule, 0) / rate if rate else 0}
+
+
+def _probe_mp3(head, size):
+    pos = 0
+    if head[:3] == b"ID3":
+        pos = 10 + ((head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9])
+    # Scan for the first frame sync in the data we already read
+    while pos + 4 <= len(head):
+        if head[pos] == 0xFF and (head[pos + 1] & 0xE6) == 0xE2:
+            break
+        pos += 1
+    else:
+        return None
+    b1, b2, b3 = head[pos + 1], head[pos + 2], head[pos + 3]
+    version = (b1 >> 3) & 3  # 3 = MPEG-1, 2 = MPEG-2, 0 = MPEG-2.5
+    bitrate_idx, rate_idx = b2 >> 4, (b2 >> 2) & 3
+    if version == 1 or rate_idx == 3 or bitrate_idx in (0, 15): return None
+    rate = MP3_RATES[version][rate_idx]
+    bitrate = MP3_BITRATES[1 if version == 3 else 2][bitrate_idx] * 1000
+    channels = 1 if (b3 >> 6) == 3 else 2
+    samples_per_frame = 1152 if version == 3 else 576
+
+    # VBR files carry a Xing/Info header with the exact frame count
+    duration = None
+    for tag in (b"Xing", b"Info"):
+        x = head.find(tag, pos, pos + 64)
+        if x >= 0 and len(head) >= x + 12 and head[x + 7] & 1:
+            frames = struct.unpack(">I", head[x + 8:x + 12])[0]
+            duration = frames * samples_per_frame / rate
+            break
+    if duration is None:
+        duration = (size - pos) * 8 / bitrate
+    return {"codec": "mp3", "sample_rate": rate, "channels": channels, "duration": duration}
+
+
+class StreamedSound:
+    """
+    Stands in for a pygame Sound for long files that are played from disk
+    through pygame.mixer.music, so memory stays flat whatever their length.
+    There is only one music stream: starting a streamed slot cuts the
+    previous one.
+    """
+    owner = None    # MusicVoice currently holding the stream
+    paused = False
+
+    def __init__(self, path, duration, cue=None):
+        self.path = path
+        self.start, self.end = cue or (0, None)
+        self.duration = max((self.end or duration) - self.start, 0)
+        self.volume = 1.0
+
+    def get_length(self):
+        return self.duration
+
+    def set_volume(self, value):
+        self.volume = value
+        if StreamedSound.owner and StreamedSound.owner.sound is self:
+            pygame.mixer.music.set_volume(value)
+
+    def play(self, loops=0, fade_ms=0):
+        pygame.mixer.music.load(self.path)
+        pygame.mixer.music.set_volume(self.volume)
+        pygame.mixer.music.play(loops=loops, start=self.start, fade_ms=fade_ms)
+        StreamedSound.owner = MusicVoice(self)
+        StreamedSound.paused = False
+        return StreamedSound.owner
+
+
+class MusicVoice:
+    """Channel-like handle on the music stream, so SoundButton treats both alike."""
+    def __init__(self, sound):
+        self.sound = sound
+
+    def fadeout(self, ms):
+        if StreamedSound.owner is self:
+            pygame.mixer.music.fadeout(ms)
+
+    def get_busy(self):
+        if StreamedSound.owner is not self: return False
+        return StreamedSound.paused or pygame.mixer.music.get_busy()
+
+    def stop(self):
+        if StreamedSound.owner is self:
+            pygame.mixer.music.stop()
+            StreamedSound.owner = None
+
+
+class PcmCache:
+    """
+    Keeps every decoded file on disk as raw PCM already in the mixer format,
+    so later loads are a memory-mapped copy instead of a decode + resample.
+    Each file starts with a small header recording the source identity and
+    mixer format; a mismatch means the entry is stale and gets rebuilt.
+    """
+    MAGIC = b"OPPCM1"
+
+    def __init__(self, directory=PCM_CACHE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, path):
+        key = os.path.normcase(os.path.abspath(path)).encode("utf-8")
+        return os.path.join(self.directory, hashlib.sha1(key).hexdigest() + ".pcm")
+
+    def header_for(self, path):
+        _, mtime_ns, size = file_identity(path)
+        freq, bits, channels = mixer_format()
+        meta = json.dumps({"mtime_ns": mtime_ns, "size": size, "freq": freq, "bits": bits, "channels": channels})
+        meta = meta.encode("utf-8")
+        return self.MAGIC + struct.pack("<I", len(meta)) + meta
+
+    def decode(self, path):
+        """Return a Sound for `path`, from the PCM cache when it is still valid."""
+        header = self.header_for(path)
+        sound = self.load(path, header)
+        if sound is None:
+            sound = pygame.mixer.Sound(path)
+            try:
+                self.store(path, header, sound)
+            except OSError as e:
+                print(f"PCM cache write failed: {e}")
+        return sound
+
+    def load(self, path, header):
+        cache_path = self.path_for(path)
+        try:
+            with open(cache_path, "rb") as f:
+                if f.read(len(header)) != header: return None
+                if os.fstat(f.fileno()).st_size == len(header): return None
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    with memoryview(mm) as view, view[len(header):] as pcm:
+                        return pygame.mixer.Sound(buffer=pcm)
+        except (OSError, ValueError):
+            return None
+
+    def samples(self, path):
+        """
+        The cached PCM of `path` as a read-only (frames, channels) int16 array,
+        memory-mapped so nothing is decoded or copied. None if not cached.
+        """
+        if np is None or mixer_format()[1] != -16: return None
+        header = self.header_for(path)
+        cache_path = self.path_for(path)
+        try:
+            with open(cache_path, "rb") as f:
+                if f.read(len(header)) != header: return None
+            if os.path.getsize(cache_path) == len(header): return None
+            data = np.memmap(cache_path, dtype="<i2", mode="r", offset=len(header))
+        except (OSError, ValueError):
+            return None
+        channels = mixer_format()[2]
+        return data[:len(data) - len(data) % channels].reshape(-1, channels)
+
+    def store(self, path, header, sound):
+        cache_path = self.path_for(path)
+        tmp = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"  # The engine process shares the cache
+        with open(tmp, "wb") as f:
+            f.write(header)
+            f.write(sound.get_raw())
+        os.replace(tmp, cache_path)
+
+
+def compute_peaks(samples, resolutions=WAVEFORM_RESOLUTIONS):
+    """
+    Min/max envelope of (frames, channels) int16 samples at each resolution,
+    as {resolution: int8 array of shape (2, resolution)}. Coarser levels are
+    folded from the finest one, so the samples are only read once.
+    """
+    finest = max(resolutions)
+    frames = len(samples) // finest * finest
+    if frames == 0:
+        samples = np.concatenate([samples, np.zeros((finest - len(samples), samples.shape[1]), samples.dtype)])
+        frames = finest
+    block = samples[:frames].reshape(finest, -1)  # Channels interleave, so a bucket spans whole frames
+    lo = (block.min(axis=1) >> 8).astype(np.int8)
+    hi = (block.max(axis=1) >> 8).astype(np.int8)
+    peaks = {}
+    for res in resolutions:
+        step = finest // res
+        peaks[res] = np.stack([lo.reshape(res, step).min(axis=1), hi.reshape(res, step).max(axis=1)])
+    return peaks
+
+
+class WaveformCache:
+    """
+    Waveform overviews, computed once per file on a background worker from
+    the PCM cache and stored in cache/peaks/ keyed by file identity. The UI
+    only ever reads finished peaks from memory, so drawing never decodes.
+    """
+    def __init__(self, pcm_cache, directory=PEAKS_CACHE_DIR):
+        self.pcm_cache = pcm_cache
+        self.directory = directory
+        self.memory = {}      # path key -> peaks dict
+        self.pending = set()
+        self.results = queue.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="waveform")
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, path):
+        return self.memory.get(path_key(path))
+
+    def request(self, path):
+        """Peaks for `path` if ready; otherwise schedule them and return None."""
+        if np is None: return None
+        key = path_key(path)
+        if key in self.memory: return self.memory[key]
+        if key not in self.pending:
+            self.pending.add(key)
+            self.executor.submit(self._build, key, path)
+        return None
+
+    def _build(self, key, path):
+        peaks = None
+        try:
+            peaks = self._load(path) or self._compute(path)
+        except Exception as e:
+            print(f"Waveform error: {e}")
+        self.results.put((key, path, peaks))
+
+    def _file_for(self, path):
+        return os.path.join(self.directory, os.path.basename(self.pcm_cache.path_for(path))[:-4] + ".npz")
+
+    def _load(self, path):
+        try:
+            with np.load(self._file_for(path)) as data:
+                if tuple(data["ident"]) != file_identity(path)[1:]: return None
+                peaks = {res: data[f"r{res}"] for res in WAVEFORM_RESOLUTIONS}
+                peaks["seconds"] = float(data["seconds"])  # Missing from older files: recomputed
+                return peaks
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def _compute(self, path):
+        samples = self.pcm_cache.samples(path)
+        if samples is None:
+            self.pcm_cache.decode(path)
+            samples = self.pcm_cache.samples(path)
+            if samples is None: return None
+        peaks = compute_peaks(samples)
+        finest = max(WAVEFORM_RESOLUTIONS)
+        seconds = max(len(samples) // finest, 1) * finest / mixer_format()[0]  # What the buckets span
+        target = self._file_for(path)
+        tmp = f"{target}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, ident=np.array(file_identity(path)[1:], dtype=np.int64), seconds=seconds,
+                     **{f"r{res}": arr for res, arr in peaks.items()})
+        os.replace(tmp, target)
+        peaks["seconds"] = seconds
+        return peaks
+
+    def drain(self):
+        """Finished (path, peaks) pairs, now also available through get()."""
+        done = []
+        while True:
+            try:
+                key, path, peaks = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending.discard(key)
+            if peaks is not None:
+                self.memory[key] = peaks
+                done.append((path, peaks))
+        return done
+
+    def is_busy(self):
+        return bool(self.pending)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def cue_peaks(peaks, resolution, cue):
+    """
+    The (2, n) overview of at least `resolution` buckets, where the file has
+    them, covering only a (start, end) cue, so it lines up with a sound
+    trimmed to that cue.
+    """
+    seconds = peaks.get("seconds")
+    if not cue or not seconds: return peaks[resolution]
+    for res in sorted(r for r in WAVEFORM_RESOLUTIONS if r >= resolution):
+        a = min(int(cue[0] / seconds * res), res - 1)
+        b = res if cue[1] is None else min(max(int(cue[1] / seconds * res) + 1, a + 1), res)
+        if b - a >= resolution: break
+    return peaks[res][:, a:b]
+
+
+def draw_waveform(canvas, peaks, width, height, color, tag="wave"):
+    """Draw a min/max envelope as one polygon; returns the canvas item."""
+    canvas.delete(tag)
+    lo, hi = peaks
+    n = len(hi)
+    mid, half = height / 2, height / 2 - 1
+    xs = [i * (width - 1) / max(n - 1, 1) for i in range(n)]
+    top = [c for x, v in zip(xs, hi) for c in (x, mid - max(int(v), 1) / 127 * half)]
+    bottom = [c for x, v in zip(reversed(xs), reversed(lo)) for c in (x, mid - min(int(v), -1) / 127 * half)]
+    return canvas.create_polygon(top + bottom, fill=color, outline="", tags=tag)
+
+
+class WaveformBar(tk.Canvas):
+    """
+    Player bar progress drawn over the track's waveform. Bars up to the
+    play position are recoloured incrementally, so a tick only touches
+    the bars that were crossed since the previous one.
+    """
+    def __init__(self, master, width=220, height=28, bg="#222", played="#2CC985", unplayed="#555", **kwargs):
+        super().__init__(master, width=width, height=height, bg=bg, highlightthickness=0, **kwargs)
+        self.bar_width = width
+        self.bar_height = height
+        self.col_played = played
+        self.col_unplayed = unplayed
+        self.bars = []
+        self.played = 0
+        self.value = 0
+        self.fill = self.create_rectangle(0, height / 2 - 3, 0, height / 2 + 3, fill=played, outline="")
+        self.create_line(0, height / 2, width, height / 2, fill=unplayed, tags="base")
+        self.tag_raise(self.fill)
+
+    def set_peaks(self, peaks):
+        """Show a (2, n) min/max overview, or None for the plain bar."""
+        self.delete("bar")
+        self.bars = []
+        self.played = 0
+        if peaks is not None:
+            lo, hi = peaks
+            count = self.bar_width // 2
+            step = len(hi) / count
+            mid, half = self.bar_height / 2, self.bar_height / 2 - 1
+            for i in range(count):
+                a, b = int(i * step), max(int((i + 1) * step), int(i * step) + 1)
+                top = mid - max(int(hi[a:b].max()), 1) / 127 * half
+                bottom = mid - min(int(lo[a:b].min()), -1) / 127 * half
+                self.bars.append(self.create_line(i * 2, top, i * 2, bottom, fill=self.col_unplayed, tags="bar"))
+        self.itemconfigure(self.fill, state="hidden" if self.bars else "normal")
+        self.set(self.value)
+
+    def set(self, value):
+        self.value = value
+        if not self.bars:
+            self.coords(self.fill, 0, self.bar_height / 2 - 3, value * self.bar_width, self.bar_height / 2 + 3)
+            return
+        played = int(value * len(self.bars))
+        if played > self.played:
+            for item in self.bars[self.played:played]:
+                self.itemconfigure(item, fill=self.col_played)
+        elif played < self.played:
+            for item in self.bars[played:self.played]:
+                self.itemconfigure(item, fill=self.col_unplayed)
+        self.played = played
+
+
+def trim_sound(sound, cue):
+    """
+    New Sound holding only the cue range of `sound`, sliced straight out of
+    its decoded buffer: one copy of the kept part, no second decode.
+    """
+    freq, size, channels = pygame.mixer.get_init()
+    raw = memoryview(sound).cast("B")
+    frame = abs(size) // 8 * channels
+    start = int(cue[0] * freq) * frame
+    end = raw.nbytes if cue[1] is None else min(int(cue[1] * freq) * frame, raw.nbytes)
+    if end - start < frame:
+        return sound
+    with raw[start:end] as part:
+        return pygame.mixer.Sound(buffer=part)
+
+
+class SoundCache:
+    """
+    Process-wide cache of decoded sounds, keyed by file identity.
+    Thread-safe so decoder workers can share it. Least recently used sounds
+    are evicted past the byte budget, except those currently playing.
+    """
+    def __init__(self, budget=SOUND_CACHE_BUDGET, decode=pygame.mixer.Sound):
+        self.budget = budget
+        self.decode = decode
+        self.entries = OrderedDict()  # key -> (sound, nbytes)
+        self.inflight = {}            # key -> Event, so a file is only decoded once at a time
+        self.lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, path, cue=None):
+        """
+        Return the decoded sound for `path`, decoding it at most once.
+        With a (start, end) cue, the trimmed version is cut from the full one,
+        which is then dropped unless it was already cached for another pad.
+        """
+        if cue:
+            key = file_identity(path) + tuple(cue)
+            with self.lock:
+                entry = self.entries.get(key)
+                if entry:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                shared = key[:3] in self.entries
+            sound = trim_sound(self.get(path), cue)
+            self.put(key, sound)
+            if not shared:
+                self.discard(key[:3])
+            return sound
+
+        key = file_identity(path)
+        while True:
+            with self.lock:
+                entry = self.entries.get(key)
+                if entry:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                pending = self.inflight.get(key)
+                if not pending:
+                    self.misses += 1
+                    pending = self.inflight[key] = threading.Event()
+                    break
+            # Another worker is decoding the same file: wait and re-check
+            pending.wait()
+
+        try:
+            sound = self.decode(path)
+            self.put(key, sound)
+            return sound
+        finally:
+            with self.lock:
+                del self.inflight[key]
+            pending.set()
+
+    def put(self, key, sound):
+        nbytes = sound_nbytes(sound)
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old:
+                self.bytes -= old[1]
+            self.entries[key] = (sound, nbytes)
+            self.bytes += nbytes
+            self._evict()
+
+    def discard(self, key):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry:
+                self.bytes -= entry[1]
+
+    def _evict(self):
+        for key in list(self.entries):
+            if self.bytes <= self.budget: break
+            sound, nbytes = self.entries[key]
+            if sound.get_num_channels() > 0: continue  # never drop a sound on air
+            del self.entries[key]
+            self.bytes -= nbytes
+            self.evictions += 1
+
+    def set_budget(self, budget):
+        with self.lock:
+            self.budget = budget
+            self._evict()
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "budget": self.budget,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class AudioLoader:
+    """
+    Decodes sounds on a small worker pool so the Tk main thread never blocks.
+    Finished sounds are queued and picked up by the UI through after().
+    """
+    def __init__(self, cache, max_workers=None):
+        self.cache = cache
+        workers = max_workers or max(2, min(4, (os.cpu_count() or 2) - 1))
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="decoder")
+        self.results = queue.Queue()
+        self.generation = 0
+        self.slot_futures = {}
+
+    def submit(self, slot_id, path, stream=None, cue=None):
+        """
+        Queue a decode for a slot, replacing any pending one for that slot.
+        `stream` forces disk streaming on or off; None decides by duration.
+        `cue` is an optional (start, end) range in seconds to play.
+        """
+        self.cancel_slot(slot_id)
+        self.slot_futures[slot_id] = self.executor.submit(self._decode, self.generation, slot_id, path, stream, cue)
+
+    def cancel_slot(self, slot_id):
+        future = self.slot_futures.pop(slot_id, None)
+        if future:
+            future.cancel()
+
+    def cancel_all(self):
+        """Drop every pending decode. In-flight ones finish but are discarded."""
+        self.generation += 1
+        for future in self.slot_futures.values():
+            future.cancel()
+        self.slot_futures.clear()
+
+    def _decode(self, generation, slot_id, path, stream, cue):
+        if generation != self.generation: return
+        try:
+            if stream is not False:
+                info = probe_audio(path)
+                duration = info["duration"] if info else 0
+                if stream is None:
+                    stream = duration >= STREAM_THRESHOLD
+            sound = StreamedSound(path, duration, cue) if stream else self.cache.get(path, cue)
+            self.results.put((generation, slot_id, path, cue, sound, None))
+        except Exception as e:
+            self.results.put((generation, slot_id, path, cue, None, e))
+
+    def drain(self, limit=8):
+        """Return up to `limit` finished loads that still belong to the current generation."""
+        done = []
+        while len(done) < limit:
+            try:
+                item = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if item[0] != self.generation: continue
+            done.append(item[1:])
+        return done
+
+    def is_busy(self):
+        for slot_id in [s for s, f in self.slot_futures.items() if f.done()]:
+            del self.slot_futures[slot_id]
+        return bool(self.slot_futures) or not self.results.empty()
+
+    def shutdown(self):
+        self.cancel_all()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class SoundWarmer:
+    """
+    Decodes sounds no slot has asked for yet (those of the presets likely
+    to come next) into the sound cache, so switching to them finds them
+    ready. One file at a time on its own thread, only while `is_quiet()`
+    says nothing live is going on, and at most `budget` bytes per list.
+    A new list replaces the old one, whatever was left of it.
+    """
+    def __init__(self, cache, is_quiet, budget=PREDICT_BUDGET):
+        self.cache = cache
+        self.is_quiet = is_quiet
+        self.budget = budget
+        self.wanted = deque()  # (path, stream, cue)
+        self.generation = 0
+        self.used = 0
+        self.working = False
+        self.closed = False
+        self.cond = threading.Condition()
+        self.thread = threading.Thread(target=self.run, daemon=True, name="warmer")
+        self.thread.start()
+
+    def warm(self, items):
+        with self.cond:
+            self.generation += 1
+            self.wanted = deque(items)
+            self.used = 0
+            self.cond.notify()
+
+    def next_item(self):
+        with self.cond:
+            self.working = False
+            while not self.wanted and not self.closed:
+                self.cond.wait()
+            if self.closed: return None
+            self.working = True
+            return self.generation, self.wanted.popleft()
+
+    def run(self):
+        while True:
+            job = self.next_item()
+            if job is None: return
+            generation, (path, stream, cue) = job
+            while not self.is_quiet() and not self.closed:
+                time.sleep(PREDICT_QUIET_MS / 4000)
+            if generation != self.generation: continue  # Predictions changed meanwhile
+            try:
+                info = probe_audio(path)
+                duration = info["duration"] if info else 0
+                if stream or (stream is None and duration >= STREAM_THRESHOLD): continue  # Played from disk
+                freq, bits, channels = pygame.mixer.get_init()
+                nbytes = int(duration * freq) * channels * abs(bits) // 8
+                if self.used + nbytes > self.budget: continue
+                self.used += nbytes
+                self.cache.get(path, cue)
+            except Exception:
+                continue  # The slot's own load will report it
+
+    def is_busy(self):
+        return bool(self.wanted) or self.working
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.wanted.clear()
+            self.cond.notify()
+
+
+class Voice:
+    """One playing sound, timed on the monotonic clock so pauses and wall-clock changes don't skew it."""
+    __slots__ = ("channel", "duration", "start", "end", "paused_at", "cut", "loop", "priority")
+    UNKNOWN_RECHECK = 0.5  # Seconds between checks for voices of unknown length
+
+    def __init__(self, channel, duration, cut=False, loop=False, priority=0):
+        self.channel = channel
+        self.duration = duration
+        self.cut = cut
+        self.loop = loop  # Starts over at its end until stopped
+        self.priority = priority
+        self.start = time.monotonic()
+        self.end = self.start + (duration if duration > 0 else self.UNKNOWN_RECHECK)
+        self.paused_at = None
+
+    def elapsed(self, now=None):
+        if self.paused_at is not None:
+            now = self.paused_at
+        return (now or time.monotonic()) - self.start
+
+    def remaining(self, now=None):
+        return max(self.duration - self.elapsed(now), 0)
+
+    def progress(self, now=None):
+        return min(self.elapsed(now) / self.duration, 1.0) if self.duration > 0 else 0
+
+
+class VoiceTracker:
+    """
+    Position service for every playing voice. The UI needs one timer for
+    all pads: it sleeps until the next voice is due to end, and pausing
+    freezes both the positions and the deadlines.
+    """
+    def __init__(self):
+        self.voices = {}  # owner -> Voice
+
+    def add(self, owner, channel, duration, cut=False, loop=False, priority=0):
+        """`cut` stops the channel at its deadline (streams trimmed by a cue out)."""
+        voice = self.voices[owner] = Voice(channel, duration, cut, loop, priority)
+        return voice
+
+    def get(self, owner):
+        return self.voices.get(owner)
+
+    def keep(self, owner, voice):
+        """Track a voice that already exists, e.g. one handed over by another tracker."""
+        self.voices[owner] = voice
+
+    def remove(self, owner):
+        self.voices.pop(owner, None)
+
+    def clear(self):
+        self.voices.clear()
+
+    def __contains__(self, owner):
+        return owner in self.voices
+
+    def __len__(self):
+        return len(self.voices)
+
+    def items(self):
+        return self.voices.items()
+
+    def pause(self):
+        now = time.monotonic()
+        for voice in self.voices.values():
+            if voice.paused_at is None:
+                voice.paused_at = now
+
+    def resume(self):
+        now = time.monotonic()
+        for voice in self.voices.values():
+            if voice.paused_at is None: continue
+            shift = now - voice.paused_at
+            voice.start += shift
+            voice.end += shift
+            voice.paused_at = None
+
+    def next_deadline(self):
+        """Monotonic time of the next expected end, or None when nothing can end."""
+        ends = [v.end for v in self.voices.values() if v.paused_at is None]
+        return min(ends) if ends else None
+
+    def pop_finished(self):
+        """Remove and return the owners whose channel has gone quiet."""
+        now = time.monotonic()
+        done = []
+        for owner, voice in list(self.voices.items()):
+            if voice.paused_at is not None or voice.end > now: continue
+            if voice.cut:
+                voice.channel.stop()
+            elif voice.channel.get_busy():
+                if voice.loop and voice.duration > 0:
+                    voice.start, voice.end = voice.end, voice.end + voice.duration  # Next pass
+                elif voice.duration <= 0:
+                    voice.end = now + voice.UNKNOWN_RECHECK
+                continue
+            del self.voices[owner]
+            done.append(owner)
+        return done
+
+    def swap(self, a, b):
+        va, vb = self.voices.pop(a, None), self.voices.pop(b, None)
+        if va: self.voices[b] = va
+        if vb: self.voices[a] = vb
+
+    def relabel(self, rename):
+        """Re-key every voice through `rename(owner)`."""
+        self.voices = {rename(owner): voice for owner, voice in self.voices.items()}
+
+    def owners(self, kind):
+        return [owner for owner, voice in self.voices.items() if isinstance(voice.channel, kind)]
+
+
+MIXER_READY = threading.Event()  # Set once this process has opened the mixer
+
+
+def init_mixer():
+    """Open the mixer in the format every cache and slot assumes."""
+    pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
+    pygame.mixer.set_num_channels(MIXER_CHANNELS)
+    MIXER_READY.set()
+
+
+def mixer_format():
+    """(frequency, size, channels), waiting for the mixer while the engine is still being reached."""
+    MIXER_READY.wait(ENGINE_SPAWN_TIMEOUT * 2)
+    return pygame.mixer.get_init()
+
+
+def read_secret(path):
+    """Random hex secret stored at `path`, created on first use (owner-only)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        with open(path, "rb") as f:
+            key = f.read().strip()
+        if key: return key
+    except OSError:
+        pass
+    key = os.urandom(32).hex().encode("ascii")
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    return key
+
+
+def engine_key():
+    """Shared secret for the engine connection."""
+    return read_secret(ENGINE_KEY_FILE)
+
+
+def remote_token():
+    """Token remote clients on other machines must send: OPPODCAST_REMOTE_TOKEN, else cache/remote.token."""
+    return os.environ.get("OPPODCAST_REMOTE_TOKEN") or read_secret(REMOTE_TOKEN_FILE).decode("ascii")
+
+
+def is_loopback(host):
+    if host == "localhost": return True
+    try:
+        return ipaddress.ip_address(host.strip("[]")).is_loopback
+    except ValueError:
+        return False
+
+
+class CuePlayer:
+    """
+    The cue list, played inside the engine so its transitions don't depend
+    on the UI. Shortly before an item ends the next one is armed: queued on
+    the same channel (Channel.queue) so it starts on the sample the first
+    one stops at, or, with a crossfade, started with a fade-in while the
+    first fades out. GO starts the next item at once, fading or cutting the
+    one on air. Streamed items can't be queued: they start on the engine's
+    clock instead. Items without a sound are skipped.
+
+    Its voices are the engine's, under negative tokens, and announced with
+    ("cued", slot, token, start, duration); ("cue", position) follows every
+    move through the list.
+    """
+    def __init__(self, engine):
+        self.engine = engine
+        self.items = []  # slot_ids
+        self.crossfade = 0.0  # Seconds; 0 = gapless
+        self.follow = True  # Go on to the next item by itself
+        self.position = -1  # Item on air, or the last one started
+        self.key = None  # Voice key of the item on air
+        self.queued = None  # (index, sound) queued behind it
+        self.next_token = 0
+
+    def configure(self, items, crossfade, follow):
+        if items != self.items:
+            current = self.items[self.position] if 0 <= self.position < len(self.items) else None
+            self.position = items.index(current) if current in items else -1
+            if current not in items:
+                self.key = None  # Plays out as an ordinary voice, nothing follows it
+            if self.queued:  # Already on the channel: keep following it if it is still listed
+                queued = self.items[self.queued[0]]
+                self.queued = (items.index(queued), self.queued[1]) if queued in items else None
+            self.items = items
+            self.announce()
+        self.crossfade = max(float(crossfade), 0.0)
+        self.follow = bool(follow)
+
+    def seek(self, index):
+        """Make `index` the item the next GO starts."""
+        self.position = min(max(index, 0), len(self.items)) - 1
+        self.announce()
+
+    def announce(self):
+        self.engine.events.append(("cue", self.position))
+
+    def on_air(self):
+        return self.engine.voices.get(self.key) if self.key else None
+
+    def go(self):
+        index = next((i for i in range(self.position + 1, len(self.items)) if self.items[i] in self.engine.sounds), None)
+        if index is None: return
+        voice = self.on_air()
+        fade_ms = int(self.crossfade * 1000) if voice else 0
+        if voice:
+            self.release(voice)
+        self.next_token -= 1
+        if self.engine.play(self.items[index], self.next_token, fade_ms=fade_ms, event="cued"):
+            self.key = (self.items[index], self.next_token)
+        self.position = index
+        self.announce()
+
+    def release(self, voice):
+        if self.crossfade > 0:
+            voice.channel.fadeout(int(self.crossfade * 1000))
+            voice.end = min(voice.end, time.monotonic() + self.crossfade)
+        else:
+            voice.channel.stop()  # Also drops anything queued on it
+            self.engine.voices.remove(self.key)
+            self.engine.events.append(("ended", *self.key))
+        self.key = self.queued = None
+
+    def arm_time(self):
+        """When update() next has something to do, or None."""
+        voice = self.on_air()
+        if voice is None or self.queued is not None or not self.follow or voice.paused_at is not None: return None
+        return voice.end - max(self.crossfade, CUE_ARM_AHEAD)
+
+    def update(self):
+        """Called on every engine poll, before ended voices are collected."""
+        voice = self.on_air()
+        if voice is None:
+            self.key = self.queued = None
+            return
+        if self.queued is not None:
+            if voice.channel.get_busy() and voice.channel.get_queue() is None:
+                # The queued item took over the channel, exactly where the previous one stopped
+                self.engine.voices.remove(self.key)
+                self.engine.events.append(("ended", *self.key))
+                (self.position, sound), self.queued = self.queued, None
+                self.next_token -= 1
+                self.key = (self.items[self.position], self.next_token)
+                follower = self.engine.voices.add(self.key, voice.channel, sound.get_length(),
+                                                  priority=MODE_PRIORITY["toggle"])
+                follower.start, follower.end = voice.end, voice.end + follower.duration
+                self.engine.events.append(("cued", *self.key, follower.start, follower.duration))
+                self.announce()
+            return
+        arm_at = self.arm_time()
+        if arm_at is None or time.monotonic() < arm_at: return
+        index = next((i for i in range(self.position + 1, len(self.items)) if self.items[i] in self.engine.sounds), None)
+        if index is None: return
+        sound = self.engine.sounds[self.items[index]]
+        if self.crossfade > 0 or isinstance(sound, StreamedSound) or isinstance(voice.channel, MusicVoice):
+            if time.monotonic() >= voice.end - self.crossfade:
+                self.go()
+        else:
+            voice.channel.queue(sound)
+            self.queued = (index, sound)
+
+
+class AudioEngine:
+    """
+    Everything that makes sound: the mixer, decoding, the sound of each slot
+    and the voices on air. It knows nothing about Tk. A UI drives it with
+    (command, *args) messages and hears back through events, either from
+    another process (serve_engine) or from a thread (EngineClient.in_thread).
+
+    Events: ("loaded", slot, path, cue, duration, streamed),
+    ("failed", slot, path, cue, message), ("started", slot, token, start,
+    duration), ("ended", slot, token) and ("state", snapshot) on connect.
+
+    Voices are keyed by (slot, token), so a slot can have several on air
+    (overlap mode). The mixer grows by MIXER_GROW channels when every one
+    is busy, and past MAX_MIXER_CHANNELS a voice is stolen by
+    VOICE_STEALING instead of dropping the new one.
+    """
+    COMMANDS = frozenset({"load", "unload", "cancel_all", "play", "stop", "stop_all",
+                          "pause", "resume", "set_volume", "swap", "warm", "cue_list", "cue_go", "cue_seek"})
+
+    def __init__(self, budget=SOUND_CACHE_BUDGET):
+        init_mixer()
+        self.pcm_cache = PcmCache()
+        self.cache = SoundCache(budget, decode=self.pcm_cache.decode)
+        self.loader = AudioLoader(self.cache)
+        self.busy_at = 0.0  # Monotonic time of the last trigger or slot load
+        self.warmer = SoundWarmer(self.cache, self.is_quiet)
+        self.sounds = {}  # slot_id -> Sound or StreamedSound
+        self.volumes = {}  # slot_id -> last volume asked for
+        self.voices = VoiceTracker()  # (slot_id, token) -> Voice
+        self.cue = CuePlayer(self)
+        self.paused = False
+        self.events = []
+
+    # --- Commands ---
+    def load(self, slot_id, path, stream=None, cue=None):
+        self.loader.submit(slot_id, path, stream, cue)
+
+    def unload(self, slot_id):
+        """Forget a slot's sound. A voice already on air plays to its end."""
+        self.loader.cancel_slot(slot_id)
+        self.sounds.pop(slot_id, None)
+
+    def cancel_all(self):
+        self.loader.cancel_all()
+
+    def warm(self, items):
+        """Decode [(path, stream, cue)] ahead, in the background, dropping the previous list."""
+        self.warmer.warm(items)
+
+    def cue_list(self, items, crossfade=0.0, follow=True):
+        self.cue.configure(list(items), crossfade, follow)
+
+    def cue_go(self):
+        self.busy_at = time.monotonic()
+        self.cue.go()
+
+    def cue_seek(self, index):
+        self.cue.seek(index)
+
+    def is_quiet(self):
+        return time.monotonic() - self.busy_at > PREDICT_QUIET_MS / 1000
+
+    def play(self, slot_id, token=None, mode=None, fade_ms=0, event="started"):
+        """Start a voice. Only "overlap" keeps the slot's earlier ones; "loop" repeats until stopped."""
+        self.busy_at = time.monotonic()
+        sound = self.sounds.get(slot_id)
+        if mode != "overlap":
+            self.stop(slot_id)
+        loop = mode == "loop"
+        if isinstance(sound, StreamedSound):
+            # There is a single music stream: whoever held it is done
+            for key in self.voices.owners(MusicVoice):
+                self.voices.remove(key)
+                self.events.append(("ended", *key))
+            channel = sound.play(-1 if loop else 0, fade_ms)
+        else:
+            channel = self.allocate() if sound else None
+            if channel:
+                channel.set_volume(self.volumes.get(slot_id, 1.0))
+                channel.play(sound, -1 if loop else 0, fade_ms=fade_ms)
+        if channel is None:
+            self.events.append(("ended", slot_id, token))  # Nothing to play it on
+            return None
+        # A stream only ends with its file: cut it at the cue out (a looped one plays it whole)
+        cut = isinstance(sound, StreamedSound) and sound.end is not None and not loop
+        voice = self.voices.add((slot_id, token), channel, sound.get_length(), cut, loop,
+                                MODE_PRIORITY.get(mode, MODE_PRIORITY["toggle"]))
+        self.events.append((event, slot_id, token, voice.start, voice.duration))
+        return voice
+
+    def allocate(self):
+        """A free mixer channel, growing the pool or stealing a voice when all are busy."""
+        channel = pygame.mixer.find_channel()
+        if channel is None:
+            count = pygame.mixer.get_num_channels()
+            if count < MAX_MIXER_CHANNELS:
+                pygame.mixer.set_num_channels(min(count + MIXER_GROW, MAX_MIXER_CHANNELS))
+                channel = pygame.mixer.find_channel()
+        return channel or self.steal()
+
+    def steal(self):
+        candidates = [(key, voice) for key, voice in self.voices.items() if not isinstance(voice.channel, MusicVoice)]
+        if not candidates: return None
+        if VOICE_STEALING == "oldest":
+            rank = lambda item: item[1].start
+        elif VOICE_STEALING == "quietest":
+            rank = lambda item: (item[1].channel.get_volume(), item[1].start)
+        else:
+            rank = lambda item: (item[1].priority, item[1].start)
+        key, voice = min(candidates, key=rank)
+        voice.channel.stop()
+        self.voices.remove(key)
+        self.events.append(("ended", *key))
+        return voice.channel
+
+    def slot_voices(self, slot_id):
+        return [key for key, _ in self.voices.items() if key[0] == slot_id]
+
+    def stop(self, slot_id):
+        for key in self.slot_voices(slot_id):
+            self.voices.get(key).channel.stop()
+            self.voices.remove(key)
+
+    def stop_all(self):
+        pygame.mixer.stop()
+        pygame.mixer.music.stop()
+        StreamedSound.owner = None
+        StreamedSound.paused = False
+        self.voices.clear()
+        self.paused = False
+
+    def pause(self):
+        # Paused channels still report busy, so the state is tracked here
+        if self.paused: return
+        self.paused = True
+        pygame.mixer.pause()
+        pygame.mixer.music.pause()
+        StreamedSound.paused = StreamedSound.owner is not None
+        self.voices.pause()
+
+    def resume(self):
+        if not self.paused: return
+        self.paused = False
+        pygame.mixer.unpause()
+        pygame.mixer.music.unpause()
+        StreamedSound.paused = False
+        self.voices.resume()
+
+    def set_volume(self, slot_id, volume):
+        """Per-slot volume. Sounds are shared between slots, so it lives on the channel."""
+        self.volumes[slot_id] = volume
+        sound = self.sounds.get(slot_id)
+        if isinstance(sound, StreamedSound):
+            sound.set_volume(volume)
+        for key in self.slot_voices(slot_id):
+            voice = self.voices.get(key)
+            if not isinstance(voice.channel, MusicVoice):
+                voice.channel.set_volume(volume)
+
+    def swap(self, a, b):
+        """Exchange two slots; loads still pending for either are dropped."""
+        self.loader.cancel_slot(a)
+        self.loader.cancel_slot(b)
+        for table in (self.sounds, self.volumes):
+            va, vb = table.pop(a, None), table.pop(b, None)
+            if va is not None: table[b] = va
+            if vb is not None: table[a] = vb
+        names = {a: b, b: a}
+        self.voices.relabel(lambda key: (names.get(key[0], key[0]), key[1]))
+        if self.cue.key:
+            self.cue.key = (names.get(self.cue.key[0], self.cue.key[0]), self.cue.key[1])
+
+    # --- Events ---
+    def handle(self, message):
+        name, *args = message
+        if name in self.COMMANDS:
+            getattr(self, name)(*args)
+
+    def poll(self):
+        """Turn finished loads and ended voices into events, and return all pending events."""
+        for slot_id, path, cue, sound, error in self.loader.drain():
+            if error:
+                self.events.append(("failed", slot_id, path, cue, str(error)))
+                continue
+            self.sounds[slot_id] = sound
+            streamed = isinstance(sound, StreamedSound)
+            if streamed and slot_id in self.volumes:
+                sound.set_volume(self.volumes[slot_id])
+            self.events.append(("loaded", slot_id, path, cue, sound.get_length(), streamed))
+        if self.loader.is_busy():
+            self.busy_at = time.monotonic()
+        self.cue.update()
+        for key in self.voices.pop_finished():
+            self.events.append(("ended", *key))
+        events, self.events = self.events, []
+        return events
+
+    def timeout(self):
+        """Seconds poll() can wait before it has something to report."""
+        if self.loader.is_busy(): return 0.005
+        deadlines = [t for t in (self.voices.next_deadline(), self.cue.arm_time()) if t is not None]
+        if not deadlines: return ENGINE_IDLE_POLL
+        return min(max(min(deadlines) - time.monotonic(), 0.001), ENGINE_IDLE_POLL)
+
+    def state(self):
+        """Snapshot for a UI (re)connecting while sounds may be on air."""
+        voices = {}
+        for (slot_id, token), voice in sorted(self.voices.items(), key=lambda item: item[1].start):
+            voices[slot_id] = (token, voice.start, voice.duration, voice.paused_at, voice.loop)  # Latest per slot
+        return {"voices": voices, "paused": self.paused}
+
+    def run(self, conn):
+        """Serve one UI connection until it goes away. True if it asked the engine to quit."""
+        try:
+            conn.send(("state", self.state()))
+            while True:
+                if conn.poll(self.timeout()):
+                    while True:  # Everything already queued, before reporting back
+                        message = conn.recv()
+                        if message[0] == "shutdown": return True
+                        self.handle(message)
+                        if not conn.poll(): break
+                for event in self.poll():
+                    conn.send(event)
+        except (EOFError, OSError):
+            return False
+
+    def shutdown(self):
+        self.stop_all()
+        self.loader.shutdown()
+        self.warmer.close()
+
+
+def no_delay(conn):
+    """
+    Send small messages at once on a TCP connection: with Nagle's algorithm
+    a command written while the previous one is unacknowledged waits for
+    the peer's delayed ACK, up to ~40 ms on a pad press.
+    """
+    try:
+        with socket.fromfd(conn.fileno(), socket.AF_INET, socket.SOCK_STREAM) as sock:  # A dup of the same socket
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    except OSError:
+        pass
+    return conn
+
+
+def serve_engine(address=ENGINE_ADDRESS):
+    """
+    Main loop of the engine process (`OppodcastStudio.py --engine`). Sound
+    keeps playing if the UI hangs or dies; a restarted UI reconnects and is
+    sent the voices still on air. With no UI and nothing playing for
+    ENGINE_ORPHAN_TIMEOUT seconds, the engine exits.
+    """
+    engine = AudioEngine()
+    listener = Listener(address, authkey=engine_key())
+    connections = queue.Queue()
+
+    def accept():
+        while True:
+            try:
+                connections.put(no_delay(listener.accept()))
+            except AuthenticationError:
+                continue
+            except OSError:
+                break
+
+    threading.Thread(target=accept, daemon=True, name="engine-accept").start()
+    idle_since = time.monotonic()
+    while True:
+        try:
+            conn = connections.get(timeout=engine.timeout())
+        except queue.Empty:
+            engine.poll()  # Nobody to tell, but voices still have to be retired
+            if len(engine.voices) or engine.loader.is_busy():
+                idle_since = time.monotonic()
+            elif time.monotonic() - idle_since > ENGINE_ORPHAN_TIMEOUT:
+                break
+            continue
+        quit_requested = engine.run(conn)
+        conn.close()
+        if quit_requested: break
+        idle_since = time.monotonic()
+    engine.shutdown()
+    listener.close()
+
+
+class RemoteSound:
+    """UI-side stand-in for a slot's sound inside the engine."""
+    def __init__(self, client, slot_id, duration, streamed):
+        self.client = client
+        self.slot_id = slot_id
+        self.duration = duration
+        self.streamed = streamed
+
+    def get_length(self):
+        return self.duration
+
+    def set_volume(self, value):
+        self.client.send("set_volume", self.slot_id, value)
+
+
+class RemoteChannel:
+    """UI-side handle on one play of a slot; busy until the engine reports its end."""
+    def __init__(self, client, slot_id, token):
+        self.client = client
+        self.slot_id = slot_id
+        self.token = token
+        self.busy = True
+
+    def get_busy(self):
+        return self.busy
+
+    def stop(self):
+        if self.busy:
+            self.busy = False
+            self.client.send("stop", self.slot_id)
+
+
+class EngineClient:
+    """
+    The UI's end of the engine connection. Commands are fire-and-forget
+    pipe writes, so a trigger never waits on the engine; events are read
+    without blocking from the UI's own timers. The remote control sends
+    from its own thread, hence the lock around writes and the voice table.
+    """
+    def __init__(self, conn, thread=None, remote=False):
+        self.conn = conn
+        self.thread = thread
+        self.remote = remote
+        self.pending = set()  # Slots with a load in flight
+        self.sounds = {}  # slot_id -> RemoteSound
+        self.channels = {}  # slot_id -> RemoteChannel of its latest voice
+        self.modes = {}  # slot_id -> play mode other than "toggle"
+        self.next_token = 0
+        self.inbox = []  # Events read during connect, handed over on the next drain
+        self.backlog = []  # Commands sent before the engine was reached
+        self.lost = False
+        self.closed = False
+        self.lock = threading.RLock()
+
+    @classmethod
+    def start_in_background(cls, process=True):
+        """
+        A client to use at once while the engine is reached (or spawned) on
+        a thread: commands wait in it and go out in order once it answers.
+        """
+        client = cls(None)
+        threading.Thread(target=lambda: client.attach(cls.start(process)), daemon=True, name="engine-start").start()
+        return client
+
+    def attach(self, other):
+        """Take over the connection `other` was started with."""
+        with self.lock:
+            if self.closed:
+                other.close()  # The window closed first
+                return
+            self.conn, self.thread, self.remote = other.conn, other.thread, other.remote
+            self.inbox = other.inbox + self.inbox
+            backlog, self.backlog = self.backlog, []
+            for message in backlog:
+                self.send(*message)
+
+    def is_connected(self):
+        return self.conn is not None
+
+    @classmethod
+    def start(cls, process=True):
+        """Connect to (or spawn) the engine process; fall back to a thread if that fails or `process` is False."""
+        if process and os.environ.get("OPPODCAST_ENGINE") != "thread":
+            client = cls.connect() or (spawn_engine() and cls.connect(wait=ENGINE_SPAWN_TIMEOUT))
+            if client:
+                # This process still decodes for analysis and waveforms, but never plays
+                os.environ["SDL_AUDIODRIVER"] = "dummy"
+                init_mixer()
+                return client
+        return cls.in_thread()
+
+    @classmethod
+    def connect(cls, wait=0, address=ENGINE_ADDRESS):
+        deadline = time.monotonic() + wait
+        while True:
+            try:
+                conn = no_delay(Client(address, authkey=engine_key()))
+                break
+            except (OSError, AuthenticationError):
+                if time.monotonic() >= deadline: return None
+                time.sleep(0.1)
+        try:
+            if not conn.poll(ENGINE_SPAWN_TIMEOUT): raise EOFError  # Busy serving another UI
+            state = conn.recv()  # The state snapshot
+        except (OSError, EOFError):  # ...or shutting down
+            conn.close()
+            return None
+        client = cls(conn, remote=True)
+        client.inbox.append(state)
+        return client
+
+    @classmethod
+    def in_thread(cls):
+        """Same protocol with the engine on a thread of this process."""
+        if os.environ.get("SDL_AUDIODRIVER") != AUDIO_DRIVER:
+            # The mixer was opened silent while an engine process played: reopen it on the real output
+            if AUDIO_DRIVER is None:
+                os.environ.pop("SDL_AUDIODRIVER", None)
+            else:
+                os.environ["SDL_AUDIODRIVER"] = AUDIO_DRIVER
+            MIXER_READY.clear()
+            pygame.mixer.quit()
+        ours, theirs = Pipe()
+        engine = AudioEngine()
+
+        def run():
+            engine.run(theirs)
+            engine.shutdown()
+        thread = threading.Thread(target=run, daemon=True, name="engine")
+        thread.start()
+        return cls(ours, thread=thread)
+
+    def send(self, *message):
+        with self.lock:
+            if self.conn is None:
+                self.backlog.append(message)
+                return
+            try:
+                self.conn.send(message)
+            except (OSError, EOFError, ValueError):
+                self.lost = True
+
+    # --- Commands ---
+    def load(self, slot_id, path, stream=None, cue=None):
+        self.pending.add(slot_id)
+        self.send("load", slot_id, path, stream, cue)
+
+    def unload(self, slot_id):
+        with self.lock:
+            self.pending.discard(slot_id)
+            self.sounds.pop(slot_id, None)
+            self.send("unload", slot_id)
+
+    def cancel_all(self):
+        self.pending.clear()
+        self.send("cancel_all")
+
+    def warm(self, items):
+        self.send("warm", items)
+
+    def cue_list(self, items, crossfade=0.0, follow=True):
+        self.send("cue_list", items, crossfade, follow)
+
+    def cue_go(self):
+        self.send("cue_go")
+
+    def cue_seek(self, index):
+        self.send("cue_seek", index)
+
+    def set_mode(self, slot_id, mode):
+        with self.lock:
+            if mode in (None, "toggle"):
+                self.modes.pop(slot_id, None)
+            else:
+                self.modes[slot_id] = mode
+
+    def play(self, slot_id):
+        with self.lock:
+            self.next_token += 1
+            channel = self.channels[slot_id] = RemoteChannel(self, slot_id, self.next_token)
+            self.send("play", slot_id, self.next_token, self.modes.get(slot_id))
+            return channel
+
+    def trigger(self, slot_id):
+        """
+        A pad press, following the slot's play mode: ("started", channel),
+        ("stopped", None), or None if it does nothing (not loaded, or a
+        one-shot still playing). Toggle and loop stop a voice on air,
+        retrigger starts over, overlap adds another voice.
+        """
+        with self.lock:
+            if slot_id not in self.sounds: return None
+            mode = self.modes.get(slot_id, "toggle")
+            if self.is_playing(slot_id):
+                if mode in ("toggle", "loop"):
+                    self.stop(slot_id)
+                    return ("stopped", None)
+                if mode == "one_shot": return None
+            return ("started", self.play(slot_id))
+
+    def play_loaded(self, slot_id):
+        """`play` for callers that don't know the slot: None if nothing is loaded there."""
+        with self.lock:
+            return self.play(slot_id) if slot_id in self.sounds else None
+
+    def is_playing(self, slot_id):
+        channel = self.channels.get(slot_id)
+        return channel is not None and channel.busy
+
+    def stop(self, slot_id):
+        """Stop the slot's voice, if any; True if there was one."""
+        with self.lock:
+            channel = self.channels.get(slot_id)
+            if channel is None or not channel.busy: return False
+            channel.stop()
+            return True
+
+    def adopt(self, slot_id, token):
+        """Handle on a voice that was already playing when this UI connected."""
+        with self.lock:
+            channel = self.channels[slot_id] = RemoteChannel(self, slot_id, token)
+            return channel
+
+    def stop_all(self):
+        with self.lock:
+            for channel in self.channels.values():
+                channel.busy = False
+            self.channels.clear()
+            self.send("stop_all")
+
+    def pause(self):
+        self.send("pause")
+
+    def resume(self):
+        self.send("resume")
+
+    def swap(self, a, b):
+        with self.lock:
+            self.pending.discard(a)
+            self.pending.discard(b)
+            for table in (self.sounds, self.channels):
+                va, vb = table.pop(a, None), table.pop(b, None)
+                if va: va.slot_id, table[b] = b, va
+                if vb: vb.slot_id, table[a] = a, vb
+            mode_a, mode_b = self.modes.get(a), self.modes.get(b)
+            self.set_mode(a, mode_b)
+            self.set_mode(b, mode_a)
+            self.send("swap", a, b)
+
+    # --- Events ---
+    def drain(self):
+        """
+        Events that concern the UI: ("loaded", slot, path, cue, RemoteSound),
+        ("failed", slot, path, cue, message), ("started", slot, start),
+        ("cued", slot, RemoteChannel, start), ("ended", slot), ("cue", position)
+        and ("state", snapshot). Stale ones are dropped here.
+        """
+        with self.lock:
+            events, self.inbox = self.inbox, []
+            conn = self.conn
+        try:
+            while conn is not None and conn.poll():
+                events.append(conn.recv())
+        except (OSError, EOFError):
+            self.lost = True
+        done = []
+        with self.lock:
+            done.extend(self.sort_events(events))
+        return done
+
+    def sort_events(self, events):
+        for event in events:
+            kind, slot_id = event[0], event[1]
+            if kind in ("loaded", "failed") and slot_id not in self.pending:
+                continue  # Unloaded or cancelled since: the engine dropped it too
+            if kind == "loaded":
+                self.pending.discard(slot_id)
+                _, _, path, cue, duration, streamed = event
+                sound = self.sounds[slot_id] = RemoteSound(self, slot_id, duration, streamed)
+                yield ("loaded", slot_id, path, cue, sound)
+            elif kind == "failed":
+                self.pending.discard(slot_id)
+                yield event
+            elif kind in ("started", "ended"):
+                channel = self.channels.get(slot_id)
+                if channel is None or channel.token != event[2]: continue  # An earlier play
+                if kind == "ended":
+                    channel.busy = False
+                    del self.channels[slot_id]
+                    yield ("ended", slot_id)
+                else:
+                    yield ("started", slot_id, event[3])
+            elif kind == "cued":  # Started by the engine's cue list
+                channel = self.channels[slot_id] = RemoteChannel(self, slot_id, event[2])
+                yield ("cued", slot_id, channel, event[3])
+            elif kind in ("state", "cue"):
+                yield event
+
+    def is_busy(self):
+        return bool(self.pending) and not self.lost
+
+    def close(self):
+        """Stop the engine: the UI is closing on purpose."""
+        with self.lock:
+            self.closed = True
+            if self.conn is None: return  # Stopped as soon as it answers
+        self.send("shutdown")
+        self.conn.close()
+        if self.thread:
+            self.thread.join(timeout=2)
+
+
+def spawn_engine():
+    """Start a detached engine process; it outlives this UI if the UI dies."""
+    if getattr(sys, "frozen", False):  # PyInstaller build: the exe is the script
+        cmd = [sys.executable, "--engine"]
+    else:
+        cmd = [sys.executable, os.path.abspath(__file__), "--engine"]
+    kwargs = {"cwd": os.getcwd(), "stdin": subprocess.DEVNULL}
+    if os.name == "nt":
+        kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(ENGINE_LOG_FILE, "ab") as log:  # Not our console: the engine may outlive it
+            subprocess.Popen(cmd, stdout=log, stderr=subprocess.STDOUT, **kwargs)
+        return True
+    except OSError as e:
+        print(f"Audio engine spawn failed: {e}")
+        return False
+
+
+def _osc_string(data, pos):
+    end = data.index(b"\0", pos)
+    return data[pos:end].decode("utf-8", "replace"), (end + 4) & ~3
+
+
+def osc_parse(data):
+    """
+    [(address, args)] for an OSC packet; bundles are flattened, unknown tags
+    end the args. Raises ValueError (or struct.error) on a malformed packet,
+    including bundles nested deeper than OSC_MAX_DEPTH.
+    """
+    messages = []
+    stack = [(data, 0)]  # (packet, bundle depth), walked in order without recursion
+    while stack:
+        packet, depth = stack.pop()
+        if not packet.startswith(b"#bundle\0"):
+            messages.append(_osc_parse_message(packet))
+            continue
+        if depth >= OSC_MAX_DEPTH:
+            raise ValueError("OSC bundles nested too deep")
+        elements, pos = [], 16  # Tag + time tag
+        while pos + 4 <= len(packet):
+            size = struct.unpack(">i", packet[pos:pos + 4])[0]
+            if size <= 0 or pos + 4 + size > len(packet):
+                raise ValueError("OSC bundle element size out of range")
+            elements.append(packet[pos + 4:pos + 4 + size])
+            pos += 4 + size
+        stack.extend((element, depth + 1) for element in reversed(elements))
+    return messages
+
+
+def _osc_parse_message(data):
+    address, pos = _osc_string(data, 0)
+    args = []
+    if pos < len(data):
+        tags, pos = _osc_string(data, pos)
+        for tag in tags[1:]:
+            if tag in "if":
+                args.append(struct.unpack(">" + tag, data[pos:pos + 4])[0])
+                pos += 4
+            elif tag == "s":
+                value, pos = _osc_string(data, pos)
+                args.append(value)
+            elif tag in "TF":
+                args.append(tag == "T")
+            else:
+                break
+    return address, args
+
+
+def osc_message(address, *args):
+    def pad(raw):
+        return raw + b"\0" * (4 - len(raw) % 4)
+    tags, payload = ",", b""
+    for arg in args:
+        if isinstance(arg, bool):
+            tags += "T" if arg else "F"
+        elif isinstance(arg, int):
+            tags, payload = tags + "i", payload + struct.pack(">i", arg)
+        elif isinstance(arg, float):
+            tags, payload = tags + "f", payload + struct.pack(">f", arg)
+        else:
+            tags, payload = tags + "s", payload + pad(str(arg).encode("utf-8"))
+    return pad(address.encode("utf-8")) + pad(tags.encode("ascii")) + payload
+
+
+def ws_frame(payload, opcode=0x1):
+    """Unmasked server-to-client WebSocket frame."""
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    length = len(payload)
+    if length < 126:
+        head = struct.pack(">BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        head = struct.pack(">BBH", 0x80 | opcode, 126, length)
+    else:
+        head = struct.pack(">BBQ", 0x80 | opcode, 127, length)
+    return head + payload
+
+
+async def ws_read(reader):
+    """(opcode, payload) of the next client frame. Control messages are tiny, so fragments aren't joined."""
+    head = await reader.readexactly(2)
+    opcode, length = head[0] & 0x0F, head[1] & 0x7F
+    if length == 126:
+        length = struct.unpack(">H", await reader.readexactly(2))[0]
+    elif length == 127:
+        length = struct.unpack(">Q", await reader.readexactly(8))[0]
+    if length > REMOTE_MAX_MESSAGE:
+        raise ValueError("WebSocket message too large")
+    if not head[1] & 0x80:
+        raise ValueError("unmasked client frame")  # RFC 6455 5.1: the server must close the connection
+    mask = await reader.readexactly(4)
+    payload = await reader.readexactly(length)
+    return opcode, bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+
+class _OscProtocol:
+    """asyncio datagram protocol (duck-typed, so asyncio is only imported with the remote control)."""
+    def __init__(self, remote):
+        self.remote = remote
+
+    def error_received(self, exc):
+        pass
+
+    def connection_lost(self, exc):
+        pass
+
+    def connection_made(self, transport):
+        self.remote.osc_transport = transport
+
+    def datagram_received(self, data, addr):
+        try:
+            messages = osc_parse(data)
+        except (ValueError, struct.error):
+            return
+        for address, args in messages:
+            self.remote.on_osc(address, args, addr)
+
+
+class RemoteControl:
+    """
+    Optional control server for other machines and control surfaces: OSC
+    over UDP and JSON over WebSocket, on an asyncio loop in its own thread.
+    Pad commands go from that thread straight to the audio engine; the
+    window only catches up on the visuals through `drain`. Every client is
+    rate limited, and a pad hit twice within REMOTE_DEBOUNCE_MS (two
+    surfaces, a bouncing button) only fires once.
+
+    OSC: /oppodcast/trigger s, /oppodcast/trigger/A1, /play, /stop,
+    /stop_all, /pause_all, /volume f, /preset s, /go, /subscribe [s],
+    /unsubscribe.
+    WebSocket: {"cmd": "trigger", "slot": "A1"}, {"cmd": "volume", "value": 0.5}...
+    State changes are pushed to WebSocket clients and OSC subscribers.
+
+    Bound beyond loopback, clients must know the shared token: WebSocket
+    in the URL (ws://host:9001/?token=...), OSC as the argument of
+    /subscribe, which trusts the sending host for its commands. Browsers
+    are only let in from localhost pages or REMOTE_ORIGINS, so a web page
+    can't drive the pads through the operator's own browser.
+    """
+    PAD_COMMANDS = ("trigger", "play", "stop")
+
+    def __init__(self, engine, state, host=REMOTE_HOST, osc_port=REMOTE_OSC_PORT, ws_port=REMOTE_WS_PORT, token=None):
+        self.engine = engine
+        self.state = state  # Mirror of what the window shows, only touched on the loop thread
+        self.host = host
+        self.token = token or (None if is_loopback(host) else remote_token())
+        self.trusted = set()  # OSC source hosts that sent the token
+        self.osc_port = osc_port
+        self.ws_port = ws_port
+        self.ui = queue.Queue()  # Things the window has to reflect
+        self.loop = None
+        self.thread = None
+        self.stopped = None
+        self.ready = threading.Event()
+        self.error = None
+        self.osc_transport = None
+        self.ws_clients = set()
+        self.ws_tasks = set()
+        self.osc_subscribers = set()
+        self.buckets = {}  # client -> [tokens, last refill]
+        self.last_hit = {}  # slot_id -> monotonic time of the last trigger/play
+
+    def start(self):
+        """Bind both sockets; raises OSError if they can't be."""
+        import asyncio  # Slow to import and only needed here: not at startup
+        self.thread = threading.Thread(target=asyncio.run, args=(self.serve(),), daemon=True, name="remote")
+        self.thread.start()
+        self.ready.wait(5)
+        if self.error: raise self.error
+
+    def stop(self):
+        if self.loop and self.stopped:
+            self.loop.call_soon_threadsafe(self.stopped.set)
+        if self.thread:
+            self.thread.join(timeout=2)
+
+    async def serve(self):
+        import asyncio
+        self.loop = asyncio.get_running_loop()
+        self.stopped = asyncio.Event()
+        try:
+            transport, _ = await self.loop.create_datagram_endpoint(
+                lambda: _OscProtocol(self), local_addr=(self.host, self.osc_port))
+            server = await asyncio.start_server(self.serve_ws, self.host, self.ws_port)
+        except OSError as e:
+            self.error = e
+            self.ready.set()
+            return
+        self.ready.set()
+        await self.stopped.wait()
+        transport.close()
+        server.close()
+        for writer in list(self.ws_clients):
+            writer.close()
+        await asyncio.gather(*self.ws_tasks, return_exceptions=True)  # Closed sockets end them
+        await server.wait_closed()
+
+    # --- Commands (loop thread) ---
+    def check_token(self, value):
+        if self.token is None: return True
+        return isinstance(value, str) and hmac.compare_digest(value.encode("utf-8"), self.token.encode("utf-8"))
+
+    def check_origin(self, origin):
+        """Browsers send Origin: only pages served from this computer or listed in REMOTE_ORIGINS get in."""
+        if origin is None: return True  # Not a browser
+        return origin in REMOTE_ORIGINS or is_loopback(urlsplit(origin).hostname or "")
+
+    def allow(self, client):
+        """Token bucket per client: REMOTE_RATE commands/s, bursts of REMOTE_BURST."""
+        now = time.monotonic()
+        bucket = self.buckets.setdefault(client, [REMOTE_BURST, now])
+        bucket[0] = min(REMOTE_BURST, bucket[0] + (now - bucket[1]) * REMOTE_RATE)
+        bucket[1] = now
+        if bucket[0] < 1: return False
+        bucket[0] -= 1
+        return True
+
+    def dispatch(self, client, command, arg=None):
+        if not self.allow(client): return
+        if command in self.PAD_COMMANDS:
+            if not isinstance(arg, str): return
+            slot_id = slot_engine_id(self.state["preset"], arg.upper())
+            now = time.monotonic()
+            if command != "stop":
+                if now - self.last_hit.get(slot_id, 0) < REMOTE_DEBOUNCE_MS / 1000: return
+                self.last_hit[slot_id] = now
+            if command == "stop":
+                result = ("stopped", None) if self.engine.stop(slot_id) else None
+            elif command == "trigger":
+                result = self.engine.trigger(slot_id)
+            else:
+                channel = self.engine.play_loaded(slot_id)
+                result = ("started", channel) if channel else None
+            if result:
+                self.ui.put((result[0], slot_id, result[1]))
+        elif command == "stop_all":
+            self.engine.stop_all()
+            self.ui.put(("stop_all",))
+        elif command == "pause_all":
+            paused = not self.state["paused"]
+            self.engine.pause() if paused else self.engine.resume()
+            self.state["paused"] = paused
+            self.ui.put(("paused", paused))
+        elif command == "volume":
+            try:
+                self.ui.put(("volume", min(max(float(arg), 0.0), 1.0)))
+            except (TypeError, ValueError):
+                pass
+        elif command == "preset" and isinstance(arg, str):
+            self.ui.put(("preset", arg))
+        elif command == "go":
+            self.engine.cue_go()
+            self.ui.put(("go",))
+
+    def on_osc(self, address, args, addr):
+        parts = address.strip("/").split("/")
+        if len(parts) < 2 or parts[0] != "oppodcast": return
+        command = parts[1]
+        if command == "subscribe":
+            # UDP sources can be spoofed: without the token this would reflect state onto any address
+            if not self.check_token(args[0] if args else None): return
+            if self.token:
+                self.trusted.add(addr[0])
+            if len(self.osc_subscribers) < REMOTE_MAX_CLIENTS:
+                self.osc_subscribers.add(addr)
+                self.osc_transport.sendto(osc_message("/oppodcast/state", json.dumps(self.state)), addr)
+            return
+        if command == "unsubscribe":
+            self.osc_subscribers.discard(addr)
+            return
+        if self.token and addr[0] not in self.trusted: return
+        if len(parts) > 2:  # Slot in the address, as sent by surface buttons
+            if args and args[-1] in (0, 0.0, False): return  # Button release
+            args = [parts[2]]
+        self.dispatch(addr, command, args[0] if args else None)
+
+    async def serve_ws(self, reader, writer):
+        import asyncio
+        task = asyncio.current_task()
+        self.ws_tasks.add(task)
+        try:
+            request = await reader.readuntil(b"\r\n\r\n")
+            lines = request.decode("latin-1").split("\r\n")
+            headers = {}
+            for line in lines[1:]:
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            target = lines[0].split(" ")[1] if lines[0].count(" ") >= 2 else "/"
+            token = parse_qs(urlsplit(target).query).get("token", [None])[0]
+            if not self.check_origin(headers.get("origin")) or not self.check_token(token):
+                writer.write(b"HTTP/1.1 403 Forbidden\r\nContent-Length: 0\r\n\r\n")
+                return
+            key = headers.get("sec-websocket-key")
+            if not key or "websocket" not in headers.get("upgrade", "").lower() or len(self.ws_clients) >= REMOTE_MAX_CLIENTS:
+                writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+                return
+            accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode("ascii")).digest()).decode("ascii")
+            writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                          f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode("ascii"))
+            writer.write(ws_frame(json.dumps({"event": "state", **self.state})))
+            self.ws_clients.add(writer)
+            while True:
+                opcode, payload = await ws_read(reader)
+                if opcode == 0x8:  # Close
+                    writer.write(ws_frame(payload[:2], 0x8))
+                    break
+                if opcode == 0x9:  # Ping
+                    writer.write(ws_frame(payload, 0xA))
+                elif opcode == 0x1:
+                    try:
+                        message = json.loads(payload)
+                        command = message["cmd"]
+                    except (ValueError, KeyError, TypeError):
+                        continue
+                    self.dispatch(id(writer), command, message.get("slot", message.get("value", message.get("name"))))
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError):
+            pass
+        finally:
+            self.ws_tasks.discard(task)
+            self.ws_clients.discard(writer)
+            self.buckets.pop(id(writer), None)
+            writer.close()
+
+    # --- State push ---
+    def publish(self, event, **fields):
+        """Thread-safe: push a state change to every client."""
+        if self.loop:
+            self.loop.call_soon_threadsafe(self.broadcast, event, fields)
+
+    def broadcast(self, event, fields):
+        slot_id = fields.get("slot")
+        if event == "started":
+            self.state["playing"] = sorted(set(self.state["playing"]) | {slot_id})
+        elif event == "ended":
+            self.state["playing"] = [s for s in self.state["playing"] if s != slot_id]
+        elif event == "stopped_all":
+            self.state["playing"] = []
+        elif event == "swapped":
+            a, b = fields["slots"]
+            swap = {a: b, b: a}
+            self.state["playing"] = sorted(swap.get(s, s) for s in self.state["playing"])
+        elif event in ("paused", "volume", "preset"):
+            self.state[event] = fields["value"]
+        frame = ws_frame(json.dumps({"event": event, **fields}))
+        for writer in list(self.ws_clients):
+            if writer.transport.get_write_buffer_size() > REMOTE_MAX_BACKLOG:
+                writer.close()  # Not reading: don't let it hold memory
+                self.ws_clients.discard(writer)
+            else:
+                writer.write(frame)
+        if self.osc_subscribers:
+            message = osc_message(f"/oppodcast/{event}", *fields.values())
+            for addr in self.osc_subscribers:
+                self.osc_transport.sendto(message, addr)
+
+    def drain(self):
+        done = []
+        while True:
+            try:
+                done.append(self.ui.get_nowait())
+            except queue.Empty:
+                return done
+
+
+class NotesWriter:
+    """
+    Write-behind persistence for the Notes tab. The UI hands over the latest
+    text and returns immediately; a background thread writes it atomically.
+    Only the newest pending text is kept, so bursts collapse into one write.
+    A few timestamped snapshots are kept as a safety net.
+    """
+    def __init__(self, path, backup_dir=NOTES_BACKUP_DIR, keep_snapshots=5, snapshot_every=300):
+        self.path = path
+        self.backup_dir = backup_dir
+        self.keep_snapshots = keep_snapshots
+        self.snapshot_every = snapshot_every
+        self.last_snapshot = 0
+        self.pending = None
+        self.closed = False
+        self.cond = threading.Condition()
+        self.thread = threading.Thread(target=self._run, name="notes-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, text):
+        with self.cond:
+            self.pending = text
+            self.cond.notify()
+
+    def close(self, timeout=5):
+        """Flush whatever is pending and stop the thread."""
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+        self.thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while self.pending is None and not self.closed:
+                    self.cond.wait()
+                text, self.pending = self.pending, None
+                if text is None: return
+            try:
+                atomic_write_text(self.path, text)
+                self._snapshot(text)
+            except OSError as e:
+                print(f"Notes save error: {e}")
+
+    def _snapshot(self, text):
+        now = time.monotonic()
+        if self.keep_snapshots <= 0 or (self.last_snapshot and now - self.last_snapshot < self.snapshot_every): return
+        self.last_snapshot = now
+        os.makedirs(self.backup_dir, exist_ok=True)
+        name = datetime.now().strftime("notes-%Y%m%d-%H%M%S.txt")
+        atomic_write_text(os.path.join(self.backup_dir, name), text)
+        snapshots = sorted(f for f in os.listdir(self.backup_dir) if f.startswith("notes-"))
+        for old in snapshots[:-self.keep_snapshots]:
+            os.remove(os.path.join(self.backup_dir, old))
+
+
+class AsRunLog:
+    """
+    What went to air, for compliance and royalty reports. record() only
+    stores a tuple in a preallocated ring, so it is cheap enough for the
+    trigger path; a background thread appends new entries to the log file
+    in batches, one JSON array per line, and rotates the file once it is
+    max_bytes. If the writer ever falls a whole ring behind (a hung disk),
+    the oldest unwritten entries are dropped and counted, never waited on.
+    """
+    FIELDS = ("start", "stop", "preset", "slot", "file", "interrupted", "volume")
+
+    def __init__(self, path=ASRUN_FILE, capacity=ASRUN_BUFFER, max_bytes=ASRUN_MAX_BYTES, keep=ASRUN_KEEP,
+                 flush_every=ASRUN_FLUSH_S):
+        self.path = path
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.keep = keep  # Rotated files kept; 0 keeps them all
+        self.flush_every = flush_every
+        self.ring = [None] * capacity
+        self.recorded = 0  # Entries ever recorded...
+        self.taken = 0  # ...and handed to the writer
+        self.dropped = 0
+        self.closed = False
+        self.cond = threading.Condition(threading.Lock())
+        self.io_lock = threading.Lock()
+        self.thread = threading.Thread(target=self._run, name="asrun-writer", daemon=True)
+        self.thread.start()
+
+    def record(self, start, stop, preset, slot, path, interrupted, volume):
+        """One play, start and stop in epoch seconds. No I/O."""
+        with self.cond:
+            self.ring[self.recorded % self.capacity] = (round(start, 3), round(stop, 3), preset, slot, path, interrupted, volume)
+            self.recorded += 1
+            if self.recorded - self.taken > self.capacity:  # Overwrote one the writer never got
+                self.taken += 1
+                self.dropped += 1
+            if self.recorded - self.taken == ASRUN_BATCH:
+                self.cond.notify()
+
+    def flush(self):
+        """Write everything recorded so far, e.g. before an export."""
+        with self.io_lock:
+            with self.cond:
+                batch = [self.ring[i % self.capacity] for i in range(self.taken, self.recorded)]
+                self.taken = self.recorded
+            if batch:
+                self._write(batch)
+
+    def close(self, timeout=5):
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+        self.thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self.cond:
+                if not self.closed and self.recorded - self.taken < ASRUN_BATCH:
+                    self.cond.wait(self.flush_every)
+                closed = self.closed
+            self.flush()
+            if closed: return
+
+    def _write(self, batch):
+        text = "".join(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n" for entry in batch)
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(text)
+                size = f.tell()
+            if size >= self.max_bytes:
+                self._rotate()
+        except OSError as e:
+            print(f"As-run log error: {e}")
+
+    def _rotate(self):
+        """Move the full file aside under the time it was closed, which no entry in it is later than."""
+        base, ext = os.path.splitext(self.path)
+        os.replace(self.path, f"{base}-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}{ext}")
+        if self.keep:
+            for _, old in self.files()[:-1][:-self.keep]:
+                os.remove(old)
+
+    def files(self):
+        """[(rotated at, path)] oldest first; the current file comes last, rotated at None."""
+        directory = os.path.dirname(self.path) or "."
+        base, ext = os.path.splitext(os.path.basename(self.path))
+        rotated = []
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            names = []
+        for name in names:
+            if not (name.startswith(base + "-") and name.endswith(ext)): continue
+            try:
+                stamp = datetime.strptime(name[len(base) + 1:-len(ext)], "%Y%m%d-%H%M%S-%f").timestamp()
+            except ValueError:
+                continue
+            rotated.append((stamp, os.path.join(directory, name)))
+        rotated.sort()
+        return rotated + [(None, self.path)]
+
+    def entries(self, start=None, end=None):
+        """Plays on air at some point between start and end (epoch seconds, None = open)."""
+        self.flush()
+        for rotated_at, path in self.files():
+            if start is not None and rotated_at is not None and rotated_at < start: continue  # All over before
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            # Lines start with "[start,stop,": filter on those before parsing the rest
+                            began, stopped = line[1:line.index(",", line.index(",") + 1)].split(",")
+                            if (start is not None and float(stopped) < start) or (end is not None and float(began) > end):
+                                continue
+                            yield json.loads(line)
+                        except ValueError:
+                            continue  # Line torn by a crash
+            except OSError:
+                continue
+
+    def export(self, path, start=None, end=None):
+        """Write the plays in a time range to `path`: JSON for .json, CSV otherwise. Returns how many."""
+        rows = sorted(self.entries(start, end))
+        stamp = lambda t: datetime.fromtimestamp(t).isoformat(sep=" ", timespec="milliseconds")
+        rows = [(stamp(row[0]), stamp(row[1]), *row[2:]) for row in rows]
+        if path.lower().endswith(".json"):
+            text = json.dumps([dict(zip(self.FIELDS, row)) for row in rows], ensure_ascii=False, indent=1)
+        else:
+            out = io.StringIO()
+            writer = csv.writer(out, lineterminator="\n")
+            writer.writerow(self.FIELDS)
+            writer.writerows(rows)
+            text = out.getvalue()
+        atomic_write_text(path, text)
+        return len(rows)
+
+
+def parse_time_range(text, now=None):
+    """
+    (start, end) epoch seconds from "2026-10-17", "2026-10-17 09:00" or
+    "2026-10-17 09:00 / 2026-10-17 12:00"; a bare date covers the whole day,
+    empty text today. None if it can't be read.
+    """
+    now = now or datetime.now()
+    parts = [part.strip() for part in (text or "").split("/")]
+    try:
+        if not parts[0]:
+            day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+            return day.timestamp(), (day + timedelta(days=1)).timestamp()
+        first = datetime.fromisoformat(parts[0])
+        if len(parts) > 1:
+            last = datetime.fromisoformat(parts[1])
+            if ":" not in parts[1]: last += timedelta(days=1)
+        else:
+            last = first + timedelta(days=1) if ":" not in parts[0] else now
+    except ValueError:
+        return None
+    return first.timestamp(), last.timestamp()
+
+
+class LibraryIndex:
+    """
+    Persistent library of audio files (SQLite, next to the presets).
+    Sorting, counting and search all run as queries, so the sidebar
+    never needs the whole list in memory.
+    """
+    MIGRATIONS = [
+        """
+        CREATE TABLE files (path TEXT PRIMARY KEY, name TEXT NOT NULL, added REAL NOT NULL);
+        CREATE INDEX files_name ON files (name COLLATE NOCASE);
+        """,
+        """
+        ALTER TABLE files ADD COLUMN duration REAL;
+        ALTER TABLE files ADD COLUMN sample_rate INTEGER;
+        ALTER TABLE files ADD COLUMN channels INTEGER;
+        ALTER TABLE files ADD COLUMN codec TEXT;
+        ALTER TABLE files ADD COLUMN size INTEGER;
+        ALTER TABLE files ADD COLUMN mtime_ns INTEGER;
+        ALTER TABLE files ADD COLUMN status TEXT;
+        ALTER TABLE files ADD COLUMN error TEXT;
+        """,
+        """
+        CREATE TABLE roots (path TEXT PRIMARY KEY, added REAL NOT NULL);
+        """,
+        """
+        CREATE TABLE analysis (path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER,
+                               lufs REAL, true_peak REAL);
+        """,
+        """
+        ALTER TABLE analysis ADD COLUMN cue_start REAL;
+        ALTER TABLE analysis ADD COLUMN cue_end REAL;
+        """,
+    ]
+
+    def __init__(self, path=LIBRARY_DB):
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self._migrate()
+
+    def _migrate(self):
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        for step, script in enumerate(self.MIGRATIONS[version:], start=version + 1):
+            self.db.executescript(script)
+            self.db.execute(f"PRAGMA user_version = {step}")
+        self.db.commit()
+
+    @staticmethod
+    def _where(query):
+        if not query: return "", ()
+        pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        return " WHERE name LIKE ? ESCAPE '\\'", (pattern,)
+
+    def add(self, paths):
+        """Insert paths that are not indexed yet; returns the ones actually added."""
+        now = time.time()
+        added = []
+        with self.lock:
+            for path in paths:
+                cur = self.db.execute("INSERT OR IGNORE INTO files (path, name, added) VALUES (?, ?, ?)",
+                                      (path, os.path.basename(path), now))
+                if cur.rowcount:
+                    added.append(path)
+            self.db.commit()
+        return added
+
+    def put(self, path, info):
+        """Insert or update a file together with its probed metadata."""
+        with self.lock:
+            self.db.execute(
+                """INSERT INTO files (path, name, added, duration, sample_rate, channels, codec, size, mtime_ns, status, error)
+                   VALUES (:path, :name, :added, :duration, :sample_rate, :channels, :codec, :size, :mtime_ns, :status, :error)
+                   ON CONFLICT (path) DO UPDATE SET duration = excluded.duration, sample_rate = excluded.sample_rate,
+                   channels = excluded.channels, codec = excluded.codec, size = excluded.size,
+                   mtime_ns = excluded.mtime_ns, status = excluded.status, error = excluded.error""",
+                {"duration": None, "sample_rate": None, "channels": None, "codec": None, "size": None,
+                 "mtime_ns": None, "error": None, **info,
+                 "path": path, "name": os.path.basename(path), "added": time.time()})
+            self.db.commit()
+
+    def paths(self):
+        with self.lock:
+            return [row[0] for row in self.db.execute("SELECT path FROM files")]
+
+    def files_under(self, root):
+        """{path: (mtime_ns, size)} for indexed files inside `root`, via a primary-key range scan."""
+        prefix = os.path.join(root, "")
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        with self.lock:
+            rows = self.db.execute("SELECT path, mtime_ns, size FROM files WHERE path >= ? AND path < ?", (prefix, upper))
+            return {path: (mtime_ns, size) for path, mtime_ns, size in rows}
+
+    def get_analysis(self, path, identity):
+        """Stored analysis for `path`, if it was made from this exact file version."""
+        with self.lock:
+            cur = self.db.execute("SELECT * FROM analysis WHERE path = ?", (path,))
+            row = cur.fetchone()
+            if row is None: return None
+            result = dict(zip([c[0] for c in cur.description], row))
+        if (result.pop("mtime_ns"), result.pop("size")) != identity[1:]: return None
+        del result["path"]
+        return result
+
+    def put_analysis(self, path, identity, result):
+        row = {**result, "path": path, "mtime_ns": identity[1], "size": identity[2]}
+        columns = ", ".join(row)
+        with self.lock:
+            self.db.execute(f"INSERT OR REPLACE INTO analysis ({columns}) VALUES ({', '.join('?' * len(row))})",
+                            tuple(row.values()))
+            self.db.commit()
+
+    def add_root(self, path):
+        with self.lock:
+            self.db.execute("INSERT OR IGNORE INTO roots (path, added) VALUES (?, ?)", (path, time.time()))
+            self.db.commit()
+
+    def remove_root(self, path):
+        with self.lock:
+            self.db.execute("DELETE FROM roots WHERE path = ?", (path,))
+            self.db.commit()
+
+    def roots(self):
+        with self.lock:
+            return [row[0] for row in self.db.execute("SELECT path FROM roots ORDER BY path")]
+
+    def remove(self, path):
+        with self.lock:
+            self.db.execute("DELETE FROM files WHERE path = ?", (path,))
+            self.db.commit()
+
+    def __contains__(self, path):
+        with self.lock:
+            return self.db.execute("SELECT 1 FROM files WHERE path = ?", (path,)).fetchone() is not None
+
+    def count(self, query=""):
+        where, args = self._where(query)
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM files" + where, args).fetchone()[0]
+
+    def page(self, query="", offset=0, limit=50):
+        """(path, duration, status) rows of one window of the (filtered) list, sorted by file name."""
+        where, args = self._where(query)
+        sql = "SELECT path, duration, status FROM files" + where + " ORDER BY name COLLATE NOCASE, path LIMIT ? OFFSET ?"
+        with self.lock:
+            return self.db.execute(sql, args + (limit, offset)).fetchall()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+def probe_file(path, pcm_cache=None):
+    """
+    Full metadata for the library: header info plus a decodability check.
+    Short files are decoded once through the PCM cache, which also makes
+    their first load into a slot instant; long ones will stream and are
+    only checked through their headers.
+    """
+    st = None
+    try:
+        st = os.stat(path)
+        info = probe_audio(path) or {}
+        recognised = bool(info)
+        info.update(size=st.st_size, mtime_ns=st.st_mtime_ns, status="ok")
+        if pcm_cache and info.get("duration", 0) < STREAM_THRESHOLD:
+            sound = pcm_cache.decode(path)
+            info.setdefault("duration", sound.get_length())
+        elif not recognised:
+            raise ValueError("unrecognised audio format")
+    except Exception as e:
+        info = {"status": "broken", "error": str(e)}
+        if st is not None:  # Keep the identity so the watcher only retries it once it changes
+            info.update(size=st.st_size, mtime_ns=st.st_mtime_ns)
+    return info
+
+
+def _biquad_power(b, a, freqs, rate):
+    """|H(f)|^2 of a biquad at the given frequencies, evaluated directly instead of filtering."""
+    z = np.exp(-2j * np.pi * freqs / rate)
+    h = (b[0] + b[1] * z + b[2] * z * z) / (a[0] + a[1] * z + a[2] * z * z)
+    return np.abs(h) ** 2
+
+
+def k_weighting_power(freqs, rate):
+    """
+    BS.1770 K-weighting (pre-filter shelf + RLB high-pass) power response,
+    with the filters re-derived for `rate` the way libebur128 does it.
+    """
+    k = np.tan(np.pi * 1681.974450955533 / rate)
+    q = 0.7071752369554196
+    vh = 10 ** (3.999843853973347 / 20)
+    vb = vh ** 0.4996667741545416
+    shelf_b = (vh + vb * k / q + k * k, 2 * (k * k - vh), vh - vb * k / q + k * k)
+    shelf_a = (1 + k / q + k * k, 2 * (k * k - 1), 1 - k / q + k * k)
+
+    k = np.tan(np.pi * 38.13547087602444 / rate)
+    q = 0.5003270373238773
+    a0 = 1 + k / q + k * k
+    hp_b = (1, -2, 1)  # Left unnormalised, as in the reference 48 kHz coefficients
+    hp_a = (1, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0)
+    return _biquad_power(shelf_b, shelf_a, freqs, rate) * _biquad_power(hp_b, hp_a, freqs, rate)
+
+
+def true_peak_filter(oversample=4, taps_per_phase=12):
+    """Polyphase windowed-sinc interpolator, shape (oversample, taps_per_phase)."""
+    n = np.arange(oversample * taps_per_phase) - (oversample * taps_per_phase - 1) / 2
+    h = np.sinc(n / oversample) * np.kaiser(len(n), 8.0)
+    h = h.reshape(taps_per_phase, oversample).T
+    return h / h.sum(axis=1, keepdims=True)
+
+
+def analyze_loudness(samples, rate, chunk_seconds=30):
+    """
+    Integrated loudness (LUFS, BS.1770 gating) and true peak (dBTP, 4x
+    oversampled) of (frames, channels) int16 samples. The K-weighted power
+    of each 100 ms block is taken from its spectrum, so the whole pass is
+    a handful of vectorised FFTs per chunk with no per-sample Python.
+    """
+    sub = int(rate * 0.1)
+    weight = k_weighting_power(np.fft.rfftfreq(sub, 1 / rate), rate)
+    weight[1:-1] *= 2  # rfft folds the negative frequencies
+    phases = true_peak_filter()
+    chunk = sub * int(chunk_seconds * 10)
+    powers, peak = [], 0.0
+    tail = np.zeros((phases.shape[1] - 1, samples.shape[1]), np.float32)
+
+    for start in range(0, len(samples), chunk):
+        x = samples[start:start + chunk].astype(np.float32) / 32768
+        blocks = len(x) // sub
+        if blocks:
+            spectra = np.fft.rfft(x[:blocks * sub].reshape(blocks, sub, -1), axis=1)
+            powers.append((np.abs(spectra) ** 2 * weight[None, :, None]).sum(axis=1) / sub ** 2)
+        padded = np.concatenate([tail, x])
+        for ch in range(x.shape[1]):
+            for phase in phases:
+                peak = max(peak, float(np.abs(np.convolve(padded[:, ch], phase, mode="valid")).max(initial=0)))
+        tail = padded[len(padded) - len(tail):]
+
+    true_peak = 20 * np.log10(peak) if peak > 0 else -120.0
+    if not powers:
+        return {"lufs": -70.0, "true_peak": true_peak}
+    sub_power = np.concatenate(powers).sum(axis=1)  # Channel weights are 1.0 for L/R
+    # 400 ms gating blocks with 75 % overlap = running mean of four 100 ms blocks
+    if len(sub_power) >= 4:
+        block_power = np.convolve(sub_power, np.ones(4) / 4, mode="valid")
+    else:
+        block_power = np.array([sub_power.mean()])
+    with np.errstate(divide="ignore"):
+        block_lufs = -0.691 + 10 * np.log10(block_power)
+    gated = block_power[block_lufs > -70]
+    if not len(gated):
+        return {"lufs": -70.0, "true_peak": true_peak}
+    relative = -0.691 + 10 * np.log10(gated.mean()) - 10
+    gated = block_power[(block_lufs > -70) & (block_lufs > relative)]
+    return {"lufs": float(-0.691 + 10 * np.log10(gated.mean())), "true_peak": float(true_peak)}
+
+
+def detect_silence(samples, rate, threshold_db=SILENCE_THRESHOLD_DB, chunk=1 << 16):
+    """
+    (cue_start, cue_end) in seconds around the audible part of (frames,
+    channels) int16 samples. Each end is scanned in chunks with a vectorised
+    threshold test, so a file is only read until its first/last loud sample.
+    """
+    threshold = int(32768 * 10 ** (threshold_db / 20))
+
+    def loud(block):
+        # Two comparisons rather than abs(): abs(-32768) overflows int16
+        return np.flatnonzero(((block > threshold) | (block < -threshold)).any(axis=1))
+
+    frames = len(samples)
+    first = last = None
+    for start in range(0, frames, chunk):
+        hits = loud(samples[start:start + chunk])
+        if len(hits):
+            first = start + hits[0]
+            break
+    if first is None:
+        return 0.0, None  # Silent file: leave it untouched
+    for end in range(frames, first, -chunk):
+        start = max(end - chunk, first)
+        hits = loud(samples[start:end])
+        if len(hits):
+            last = start + hits[-1]
+            break
+    cue_start = max(float(first) / rate - CUE_PREROLL, 0.0)
+    cue_end = min(float(last + 1) / rate + CUE_PREROLL, frames / rate)
+    return cue_start, (None if cue_end >= frames / rate else cue_end)
+
+
+class AudioAnalyzer:
+    """
+    Offline analysis of each file (loudness, true peak, silent head and
+    tail) on a background
+    worker, from the memory-mapped PCM cache. Results are kept in the
+    library database keyed by file identity, so every preset reuses them.
+    """
+    def __init__(self, index, pcm_cache):
+        self.index = index
+        self.pcm_cache = pcm_cache
+        self.memory = {}  # path key -> result
+        self.pending = set()
+        self.results = queue.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="analysis")
+
+    def request(self, path):
+        """Analysis for `path` if known; otherwise schedule it and return None."""
+        if np is None: return None
+        key = path_key(path)
+        if key in self.memory: return self.memory[key]
+        if key not in self.pending:
+            self.pending.add(key)
+            self.executor.submit(self._run, key, path)
+        return None
+
+    def cached(self, path):
+        """Analysis already in memory, without scheduling anything."""
+        return self.memory.get(path_key(path))
+
+    def _run(self, key, path):
+        result = None
+        try:
+            identity = file_identity(path)
+            result = self.index.get_analysis(key, identity)
+            if result is None or result.get("cue_start") is None:
+                samples = self.pcm_cache.samples(path)
+                if samples is None:
+                    self.pcm_cache.decode(path)
+                    samples = self.pcm_cache.samples(path)
+                if samples is not None:
+                    result = self.analyze(samples)
+                    self.index.put_analysis(key, identity, result)
+        except Exception as e:
+            print(f"Analysis error: {e}")
+        self.results.put((key, path, result))
+
+    def analyze(self, samples):
+        rate = pygame.mixer.get_init()[0]
+        cue_start, cue_end = detect_silence(samples, rate)
+        return {**analyze_loudness(samples, rate), "cue_start": cue_start, "cue_end": cue_end}
+
+    def drain(self):
+        done = []
+        while True:
+            try:
+                key, path, result = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending.discard(key)
+            if result is not None:
+                self.memory[key] = result
+                done.append((path, result))
+        return done
+
+    def is_busy(self):
+        return bool(self.pending)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def normalization_gain(result, target=LOUDNESS_TARGET, ceiling=TRUE_PEAK_CEILING):
+    """Linear gain that brings a file to `target` LUFS without its true peak passing `ceiling`."""
+    if not result: return 1.0
+    gain_db = min(target - result["lufs"], ceiling - result["true_peak"])
+    return 10 ** (gain_db / 20)
+
+
+def cue_points(result):
+    """Automatic (cue_start, cue_end) from an analysis result, or None."""
+    if not result or result.get("cue_start") is None: return None
+    return result["cue_start"], result["cue_end"]
+
+
+def merge_cues(manual, auto):
+    """(start, end) to play, manual points overriding the automatic ones; None = whole file."""
+    manual = manual or (None, None)
+    auto = auto or (0.0, None)
+    start = manual[0] if manual[0] is not None else auto[0]
+    end = manual[1] if manual[1] is not None else auto[1]
+    if not start and end is None:
+        return None
+    return (start, end)
+
+
+class LibraryImporter:
+    """
+    Probes imported files on a worker pool and files them into the index as
+    they finish. Paths already known are dropped with a set lookup.
+    """
+    def __init__(self, index, pcm_cache, max_workers=2):
+        self.index = index
+        self.pcm_cache = pcm_cache
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="probe")
+        self.known = {path_key(p) for p in index.paths()}
+        self.lock = threading.Lock()  # The folder watcher submits from its own thread
+        self.finished = queue.Queue()
+        self.total = 0
+        self.done = 0
+
+    def submit(self, paths, force=False):
+        """
+        Queue files for probing; returns how many were queued. Known files are
+        skipped unless `force` is set (used when a rescan saw them change).
+        """
+        queued = 0
+        with self.lock:
+            for path in paths:
+                path = os.path.normpath(os.path.abspath(path))
+                key = path_key(path)
+                if key in self.known and not force: continue
+                self.known.add(key)
+                self.executor.submit(self._probe, path)
+                queued += 1
+            if not self.is_busy():
+                self.total = self.done = 0
+            self.total += queued
+        return queued
+
+    def _probe(self, path):
+        try:
+            self.index.put(path, probe_file(path, self.pcm_cache))
+        finally:
+            self.finished.put(path)
+
+    def forget(self, path):
+        with self.lock:
+            self.known.discard(path_key(path))
+
+    def drain(self):
+        """Number of files that finished since the last call."""
+        count = 0
+        while True:
+            try:
+                self.finished.get_nowait()
+            except queue.Empty:
+                break
+            count += 1
+        with self.lock:
+            self.done += count
+        return count
+
+    def is_busy(self):
+        return self.done < self.total
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class LibraryWatcher:
+    """
+    Rescans the watched library folders on a background thread. Stored
+    mtime/size tell which files were added, changed or removed, so only
+    those are probed again; the changes are queued for the UI.
+    """
+    def __init__(self, index, importer, interval=WATCH_INTERVAL):
+        self.index = index
+        self.importer = importer
+        self.interval = interval
+        self.changes = queue.Queue()
+        self.wake = threading.Event()
+        self.stopped = False
+        self.thread = threading.Thread(target=self._run, name="library-watcher", daemon=True)
+        self.thread.start()
+
+    def rescan(self):
+        self.wake.set()
+
+    def stop(self):
+        self.stopped = True
+        self.wake.set()
+
+    def _run(self):
+        while not self.stopped:
+            for root in self.index.roots():
+                if self.stopped: return
+                try:
+                    self.scan(root)
+                except Exception as e:
+                    print(f"Library scan error ({root}): {e}")
+            self.wake.wait(self.interval)
+            self.wake.clear()
+
+    def scan(self, root):
+        """
+        Compare `root` on disk with the index. An unreachable root (unplugged
+        drive, offline share) or a folder that can't be listed leaves the
+        index alone rather than reporting everything under it as removed.
+        """
+        if not os.path.isdir(root): return
+        stored = self.index.files_under(root)
+        seen = {}
+        listed = set()
+
+        def fail(error):
+            raise error
+
+        for dirpath, _, filenames in os.walk(root, onerror=fail):
+            listed.add(dirpath)
+            for name in filenames:
+                if not name.lower().endswith(AUDIO_EXTENSIONS): continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                seen[path] = (st.st_mtime_ns, st.st_size)
+
+        added = [p for p in seen if p not in stored]
+        changed = [p for p, sig in seen.items() if p in stored and stored[p] != sig]
+        removed = [p for p in stored if p not in seen and self._gone(p, listed)]
+        for path in removed:
+            self.index.remove(path)
+            self.importer.forget(path)
+        self.importer.submit(added)
+        self.importer.submit(changed, force=True)
+        if added or changed or removed:
+            self.changes.put((added, changed, removed))
+
+    @staticmethod
+    def _gone(path, listed):
+        """
+        True if the walk proved `path` is gone: its folder was listed, or the
+        nearest folder above it that still exists was (a deleted subfolder).
+        Files under folders the walk never entered, like symlinked ones, stay.
+        """
+        folder = os.path.dirname(path)
+        while folder not in listed:
+            parent = os.path.dirname(folder)
+            if parent == folder or os.path.lexists(folder): return False
+            folder = parent
+        return True
+
+    def drain(self):
+        """Merge everything reported since the last call into (added, changed, removed) sets of path keys."""
+        added, changed, removed = set(), set(), set()
+        while True:
+            try:
+                a, c, r = self.changes.get_nowait()
+            except queue.Empty:
+                break
+            added.update(map(path_key, a))
+            changed.update(map(path_key, c))
+            removed.update(map(path_key, r))
+        return added, changed, removed
+
+
+class LatencyHistogram:
+    """
+    Fixed log-spaced buckets (LATENCY_BUCKETS_MS plus one overflow). Only
+    ever touched from the Tk main thread, so recording is a few integer
+    increments with no lock.
+    """
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, ms):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max: self.max = ms
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile, capped at the max seen."""
+        if not self.count: return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(LATENCY_BUCKETS_MS[i], self.max) if i < len(LATENCY_BUCKETS_MS) else self.max
+        return self.max
+
+    def snapshot(self):
+        labels = [f"<={b}" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"]
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count if self.count else 0.0,
+            "max_ms": self.max,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "buckets": {label: n for label, n in zip(labels, self.counts) if n},
+        }
+
+
+class Diagnostics:
+    """
+    In-memory timing of trigger paths, slow UI-thread calls and event-loop
+    stalls. Everything is recorded from the main thread; `dump` writes a
+    JSON snapshot for offline comparison between machines.
+    """
+    def __init__(self, keep_stalls=100):
+        self.histograms = {}
+        self.stalls = deque(maxlen=keep_stalls)  # (wall time, lag ms), most recent last
+        self.stall_count = 0
+        self.started = time.time()
+        self.startup = []  # (step, ms since launch), kept across resets
+
+    def mark(self, step):
+        """Startup timeline: `step` was reached now."""
+        self.startup.append((step, (time.perf_counter() - LAUNCHED) * 1000))
+
+    def record(self, name, ms):
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = self.histograms[name] = LatencyHistogram()
+        hist.record(ms)
+
+    def since(self, name, t0):
+        """Record the time elapsed since perf_counter() value `t0`."""
+        self.record(name, (time.perf_counter() - t0) * 1000)
+
+    @contextmanager
+    def span(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.since(name, t0)
+
+    def stall(self, lag_ms):
+        self.stall_count += 1
+        self.stalls.append((time.time(), lag_ms))
+
+    def reset(self):
+        self.histograms.clear()
+        self.stalls.clear()
+        self.stall_count = 0
+        self.started = time.time()
+
+    def snapshot(self):
+        return {
+            "started": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+            "taken": datetime.now().isoformat(timespec="seconds"),
+            "histograms": {name: hist.snapshot() for name, hist in sorted(self.histograms.items())},
+            "startup": [{"step": step, "ms": round(ms, 1)} for step, ms in self.startup],
+            "stall_count": self.stall_count,
+            "stalls": [{"at": datetime.fromtimestamp(at).isoformat(timespec="milliseconds"), "lag_ms": round(lag, 2)}
+                       for at, lag in self.stalls],
+        }
+
+    def report(self):
+        """Fixed-width text table for the diagnostics panel."""
+        lines = [f"{'':24}{'n':>7}{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}"]
+        for name, hist in sorted(self.histograms.items()):
+            snap = hist.snapshot()
+            lines.append(f"{name:24}{snap['count']:>7}" + "".join(
+                f"{snap[k]:>9.2f}" for k in ("mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms")))
+        lines.append("")
+        lines.append("startup (ms since launch):")
+        for step, ms in self.startup:
+            lines.append(f"  {step:22}{ms:>9.1f}")
+        lines.append("")
+        lines.append(f"stalls > {STALL_THRESHOLD_MS} ms: {self.stall_count}")
+        for at, lag in list(self.stalls)[-10:]:
+            lines.append(f"  {datetime.fromtimestamp(at).strftime('%H:%M:%S.%f')[:-3]}  {lag:8.1f} ms")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        atomic_write_text(path, json.dumps(self.snapshot(), indent=2))
+
+
+def traced(name):
+    """Time a method of the app into its diagnostics under `name`."""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with self.diagnostics.span(name):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorate
+
+
+class LibraryItem(ctk.CTkFrame):
+    """
+    Represents a single audio file in the library list (Sidebar).
+    """
+    def __init__(self, master, filepath, parent_app, **kwargs):
+        super().__init__(master, fg_color="transparent", corner_radius=6, **kwargs)
+        self.filepath = filepath
+        self.parent_app = parent_app
+        self.broken = False
+        self.grid_columnconfigure(0, weight=1)
+
+        # File Name Label
+        self.lbl_name = ctk.CTkLabel(self, text=os.path.basename(filepath), anchor="w", cursor="hand2")
+        self.lbl_name.grid(row=0, column=0, sticky="ew", padx=5, pady=5)
+        self.lbl_name.bind("<Button-1>", self.on_select)
+
+        # Delete Button (x)
+        self.btn_del = ctk.CTkButton(
+            self, text="×", width=25, height=25, 
+            fg_color="transparent", hover_color="#550000", 
+            text_color="#FF4444", command=self.on_delete
+        )
+        self.btn_del.grid(row=0, column=1, padx=2, pady=2)
+        
+        # Bind click on frame background as well
+        self.bind("<Button-1>", self.on_select)
+
+    def set_path(self, filepath, duration=None, status=None):
+        """Re-bind this row to another file (rows are recycled while scrolling)."""
+        text = os.path.basename(filepath)
+        if duration:
+            mins, secs = divmod(int(duration), 60)
+            text += f"  {mins}:{secs:02}"
+        self.broken = status == "broken"
+        if self.broken:
+            text = "⚠ " + text
+        self.filepath = filepath
+        if text != self.lbl_name.cget("text"):
+            self.lbl_name.configure(text=text)
+
+    def on_select(self, event=None):
+        self.parent_app.select_library_item(self.filepath, self)
+
+    def on_delete(self):
+        self.parent_app.remove_from_library(self.filepath)
+
+    def set_selected(self, is_selected):
+        if is_selected:
+            self.configure(fg_color="#1f538d")
+            self.lbl_name.configure(text_color="white", font=("Arial", 12, "bold"))
+        else:
+            self.configure(fg_color="transparent")
+            self.lbl_name.configure(text_color="#FF6666" if self.broken else "gray90", font=("Arial", 12))
+
+
+class LibraryList(ctk.CTkFrame):
+    """
+    Virtualized view over the LibraryIndex: only the rows that fit on screen
+    exist as widgets, and they are re-bound to other files as the list
+    scrolls or the search changes.
+    """
+    def __init__(self, master, parent_app, index, **kwargs):
+        super().__init__(master, **kwargs)
+        self.parent_app = parent_app
+        self.index = index
+        self.query = ""
+        self.offset = 0
+        self.total = 0
+        self.visible = 1
+        self.row_height = 36
+        self.rows = []
+        self.search_id = None
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(2, weight=1)
+
+        self.lbl_title = ctk.CTkLabel(self, text=parent_app.t("imported_files"), font=("Arial", 12, "bold"))
+        self.lbl_title.grid(row=0, column=0, columnspan=2, pady=(5, 0))
+        self.entry_search = ctk.CTkEntry(self, placeholder_text=parent_app.t("search"), height=26)
+        self.entry_search.grid(row=1, column=0, columnspan=2, sticky="ew", padx=5, pady=5)
+        self.entry_search.bind("<KeyRelease>", self.on_search)
+
+        self.body = ctk.CTkFrame(self, fg_color="transparent", height=200)
+        self.body.grid(row=2, column=0, sticky="nsew")
+        self.body.pack_propagate(False)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.on_scrollbar)
+        self.scrollbar.grid(row=2, column=1, sticky="ns")
+        self.body.bind("<Configure>", self.on_resize)
+        self.bind_wheel(self.body)
+
+    def bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1))
+        widget.bind("<Button-4>", lambda e: self.scroll(-1))
+        widget.bind("<Button-5>", lambda e: self.scroll(1))
+
+    def set_texts(self):
+        self.lbl_title.configure(text=self.parent_app.t("imported_files"))
+        self.entry_search.configure(placeholder_text=self.parent_app.t("search"))
+
+    def on_resize(self, event):
+        visible = max(1, event.height // self.row_height)
+        if visible != self.visible:
+            self.visible = visible
+            self.render()
+
+    def on_search(self, event=None):
+        if self.search_id:
+            self.after_cancel(self.search_id)
+        self.search_id = self.after(120, self.apply_search)
+
+    def apply_search(self):
+        self.search_id = None
+        query = self.entry_search.get().strip()
+        if query != self.query:
+            self.query = query
+            self.offset = 0
+            self.refresh()
+
+    def on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * self.total)
+        elif args[0] == "scroll":
+            step = self.visible if args[2] == "pages" else 1
+            self.offset += int(args[1]) * step
+        self.render()
+
+    def scroll(self, rows):
+        self.offset += rows
+        self.render()
+
+    def refresh(self):
+        """Re-count after the index changed, then redraw the visible window."""
+        self.total = self.index.count(self.query)
+        self.render()
+
+    def render(self):
+        self.offset = max(0, min(self.offset, self.total - self.visible))
+        entries = self.index.page(self.query, self.offset, self.visible) if self.total else []
+
+        while len(self.rows) < len(entries):
+            row = LibraryItem(self.body, entries[len(self.rows)][0], self.parent_app)
+            for widget in (row, row.lbl_name):
+                self.bind_wheel(widget)
+            self.rows.append(row)
+
+        edit = self.parent_app.is_edit_mode
+        selected = self.parent_app.selected_library_path
+        for i, row in enumerate(self.rows):
+            if i < len(entries):
+                row.set_path(*entries[i])
+                row.set_selected(entries[i][0] == selected)
+                row.btn_del.configure(state="normal" if edit else "disabled")
+                if not row.winfo_manager():
+                    row.pack(fill="x", pady=2, padx=2)
+            elif row.winfo_manager():
+                row.pack_forget()
+
+        if self.rows and self.rows[0].winfo_reqheight() > 1:
+            self.row_height = self.rows[0].winfo_reqheight() + 4
+        if self.total > self.visible:
+            self.scrollbar.set(self.offset / self.total, (self.offset + self.visible) / self.total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def update_selection(self):
+        selected = self.parent_app.selected_library_path
+        for row in self.rows:
+            if row.winfo_manager():
+                row.set_selected(row.filepath == selected)
+
+
+def slot_key(bank, label):
+    """Remote-control id of a pad: "A1" on the first bank, "2:A1" on the second..."""
+    return label if bank == 0 else f"{bank + 1}:{label}"
+
+
+def slot_engine_id(preset, slot_id):
+    """Engine id of a pad. Namespaced by preset so a switch never reuses an id still on air."""
+    return f"{preset}/{slot_id}"
+
+
+class Slot:
+    """
+    One pad's assignment and sound, whether or not its bank is on screen.
+    Widgets only exist for the visible bank and are re-bound when banks
+    change, so `view` is the SoundButton currently showing this slot, or None.
+    """
+    def __init__(self, parent_app, deck, bank, label):
+        self.parent_app = parent_app
+        self.deck = deck
+        self.bank = bank  # Index
+        self.label = label  # Position within the bank
+        self.slot_id = slot_key(bank, label)
+        self.engine_id = slot_engine_id(deck.name, self.slot_id)
+        self.view = None
+        self.file_path = None
+        self.sound = None
+        self.channel = None
+        self.duration = 0
+        self.stream_mode = None  # None = auto by duration, True/False = forced
+        self.play_mode = "toggle"  # One of PLAY_MODES
+        self.missing = False
+        self.failed = False
+        self.peaks = None
+        self.gain = 1.0  # Loudness normalisation, multiplied by the master volume
+        self.cue = None  # Manual (start, end) in seconds; None entries fall back to auto
+        self.auto_cue = None  # Silence trim found by the analysis
+        self.loaded_cue = None  # Cue the current sound was cut with
+
+    def refresh(self):
+        if self.view:
+            self.view.refresh_visuals()
+
+    def load_sound(self, path, defer=False):
+        """Assign a file to the slot. Decoding happens in the background, or later if `defer`."""
+        self.file_path = path
+        self.sound = None
+        self.duration = 0
+        self.failed = False
+        self.set_peaks(None)
+        self.missing = not os.path.exists(path)
+        self.auto_cue = cue_points(self.parent_app.analyzer.cached(path))
+
+        self.parent_app.save_current_preset()
+        if self.missing:
+            # Keep the assignment (the file may come back), but show it can't play
+            self.parent_app.engine.unload(self.engine_id)
+        elif defer:
+            self.parent_app.prefetch_slot(self)
+        else:
+            self.request()
+        self.refresh()
+
+    def request(self):
+        self.parent_app.engine.set_mode(self.engine_id, self.play_mode)
+        self.parent_app.request_sound(self, self.file_path, self.stream_mode, self.effective_cue())
+
+    def needs_load(self):
+        return (self.file_path and self.sound is None and not self.missing and not self.failed
+                and self.engine_id not in self.parent_app.engine.pending)
+
+    def unload(self):
+        """Give the decoded sound back; the assignment stays and reloads on demand."""
+        if self.sound is None or self in self.parent_app.voices: return
+        self.parent_app.engine.unload(self.engine_id)
+        self.sound = None
+        self.loaded_cue = None
+        self.refresh()
+
+    def effective_cue(self):
+        return merge_cues(self.cue, self.auto_cue)
+
+    def preset_entry(self):
+        """What the preset JSON stores for this slot: the path, plus options if any."""
+        if self.stream_mode is None and self.cue is None and self.play_mode == "toggle":
+            return self.file_path
+        entry = {"path": self.file_path}
+        if self.stream_mode is not None: entry["stream"] = self.stream_mode
+        if self.cue is not None: entry["cue"] = list(self.cue)
+        if self.play_mode != "toggle": entry["mode"] = self.play_mode
+        return entry
+
+    def apply_preset_entry(self, entry, defer=False, previous=None):
+        """`previous` is the slot that held our engine id before (same preset staged again)."""
+        if isinstance(entry, dict):
+            self.stream_mode = entry.get("stream")
+            self.cue = tuple(entry["cue"]) if entry.get("cue") else None
+            self.play_mode = entry.get("mode") if entry.get("mode") in PLAY_MODES else "toggle"
+            entry = entry.get("path")
+        if not entry: return
+        if (previous and previous.sound and not previous.missing
+                and (previous.file_path, previous.stream_mode, previous.cue) == (entry, self.stream_mode, self.cue)):
+            self.share_sound(previous)
+        else:
+            self.load_sound(entry, defer)
+
+    def share_sound(self, other):
+        """Use the sound `other` already has loaded under the same engine id."""
+        self.file_path = other.file_path
+        self.sound, self.duration, self.gain = other.sound, other.duration, other.gain
+        self.auto_cue, self.loaded_cue = other.auto_cue, other.loaded_cue
+        self.set_peaks(other.peaks)
+        self.parent_app.engine.set_mode(self.engine_id, self.play_mode)
+        self.refresh()
+
+    def set_stream_mode(self, mode):
+        if mode is self.stream_mode: return
+        self.stream_mode = mode
+        self.load_sound(self.file_path)
+
+    def set_play_mode(self, mode):
+        """How a press behaves; takes effect from the next press, a voice on air plays on."""
+        if mode == self.play_mode: return
+        self.play_mode = mode
+        self.parent_app.engine.set_mode(self.engine_id, mode)
+        self.parent_app.save_current_preset()
+
+    def set_cue(self, cue):
+        if cue == self.cue: return
+        self.cue = cue
+        self.parent_app.save_current_preset()
+        self.reload_cue()
+
+    def reload_cue(self):
+        """Re-cut the sound if its cue changed. The old one stays playable meanwhile."""
+        if self.sound is None or self.missing: return
+        if self.effective_cue() != self.loaded_cue:
+            self.request()
+
+    def on_sound_loaded(self, sound, cue=None):
+        """Called on the main thread once the decoder delivered our sound."""
+        self.sound = sound
+        self.loaded_cue = cue
+        self.duration = sound.get_length()
+        self.gain = 1.0
+        self.refresh()
+        if not sound.streamed:  # Long streamed files are never decoded whole
+            self.set_peaks(self.parent_app.request_waveform(self.file_path))
+            result = self.parent_app.request_analysis(self.file_path)
+            self.gain = normalization_gain(result)
+            self.auto_cue = cue_points(result) or self.auto_cue
+        self.apply_volume()
+        self.reload_cue()
+
+    def on_load_failed(self, error):
+        print(f"Error loading sound: {error}")
+        self.failed = True
+        self.refresh()
+
+    def volume(self):
+        """Level the sound plays at: master volume times its normalization gain."""
+        gain = self.gain if self.parent_app.normalize else 1.0
+        return min(self.parent_app.global_volume * gain, 1.0)
+
+    def apply_volume(self):
+        if self.sound:
+            self.sound.set_volume(self.volume())
+
+    def set_peaks(self, peaks):
+        """Attach a waveform overview ({resolution: (2, n) int8}) or None to hide it."""
+        self.peaks = peaks
+        if self.view:
+            self.view.show_peaks()
+
+    def shown_peaks(self, resolution):
+        """The overview cut to the cue the loaded sound was trimmed to."""
+        return cue_peaks(self.peaks, resolution, self.loaded_cue)
+
+    def export_slot(self):
+        return (self.file_path, self.sound, self.duration, self.stream_mode, self.channel, self.missing, self.peaks, self.gain,
+                self.cue, self.auto_cue, self.loaded_cue, self.play_mode)
+
+    def import_slot(self, state):
+        """Take over another slot's already decoded sound, without touching the disk."""
+        (self.file_path, self.sound, self.duration, self.stream_mode, self.channel, self.missing, peaks, self.gain,
+         self.cue, self.auto_cue, self.loaded_cue, self.play_mode) = state
+        self.failed = False
+        self.set_peaks(peaks)
+        if self.file_path and self.sound is None and not self.missing:
+            self.load_sound(self.file_path)  # It was still decoding: restart for this slot
+            return
+        if self.view:
+            self.view.hide_progress()
+        self.refresh()
+        self.parent_app.save_current_preset()
+
+    def clear_slot(self):
+        # Channels are shared: only stop ours if it is still playing our voice
+        if self in self.parent_app.voices:
+            self.channel.stop()
+            self.parent_app.end_voice(self)
+        self.parent_app.engine.unload(self.engine_id)
+        self.parent_app.engine.set_mode(self.engine_id, None)
+        self.file_path = None
+        self.stream_mode = None
+        self.play_mode = "toggle"
+        self.cue = self.auto_cue = self.loaded_cue = None
+        self.missing = self.failed = False
+        self.sound = None
+        self.duration = 0
+        self.set_peaks(None)
+        if self in self.deck.cues:
+            self.deck.cues.remove(self)
+            self.parent_app.send_cues()
+        self.refresh()
+        self.parent_app.save_current_preset()
+
+    def show_started(self, channel):
+        """Track a play already sent to the engine, from a pad or the remote control."""
+        if self.sound.streamed:
+            # The music stream has been taken over
+            for slot in [s for s, _ in self.parent_app.voices.items() if s is not self and s.sound and s.sound.streamed]:
+                slot.on_playback_finished()
+        self.channel = channel
+        if self.view:
+            self.view.set_color(self.view.col_playing)
+
+        # Update Global Player Bar
+        self.parent_app.current_playing_slot = self
+        self.parent_app.start_voice(self, channel)
+
+    def show_stopped(self):
+        self.parent_app.end_voice(self)
+        if self.view:
+            self.view.set_color(self.view.col_loaded)
+
+    def on_playback_finished(self):
+        self.parent_app.end_voice(self)
+        self.refresh()
+
+
+class Bank:
+    """A page of rows × cols pads, labelled A1, A2... within the bank."""
+    def __init__(self, parent_app, deck, index, rows=BANK_ROWS, cols=BANK_COLS):
+        self.index = index
+        self.rows = min(max(rows, 1), MAX_BANK_ROWS)
+        self.cols = min(max(cols, 1), MAX_BANK_COLS)
+        labels = [f"{chr(ord('A') + r)}{c + 1}" for r in range(self.rows) for c in range(self.cols)]
+        self.slots = [Slot(parent_app, deck, index, label) for label in labels]
+
+    def layout(self):
+        """The bank as stored in a preset."""
+        return {"rows": self.rows, "cols": self.cols,
+                "slots": {slot.label: slot.preset_entry() for slot in self.slots if slot.file_path}}
+
+
+class Deck:
     """
-    Represents a single audio file in the library list (Sidebar).
+    Every bank of one preset. The app shows one deck and may stage the
+    next in the background, so a preset switch is a single swap once the
+    new deck's first bank is loaded.
     """
-    def __init__(self, master, filepath, parent_app, **kwargs):
-        super().__init__(master, fg_color="transparent", corner_radius=6, **kwargs)
-        self.filepath = filepath
+    def __init__(self, parent_app, name):
         self.parent_app = parent_app
-        self.grid_columnconfigure(0, weight=1)
-
-        # File Name Label
-        self.lbl_name = ctk.CTkLabel(self, text=os.path.basename(filepath), anchor="w", cursor="hand2")
-        self.lbl_name.grid(row=0, column=0, sticky="ew", padx=5, pady=5)
-        self.lbl_name.bind("<Button-1>", self.on_select)
-
-        # Delete Button (x)
-        self.btn_del = ctk.CTkButton(
-            self, text="×", width=25, height=25, 
-            fg_color="transparent", hover_color="#550000", 
-            text_color="#FF4444", command=self.on_delete
-        )
-        self.btn_del.grid(row=0, column=1, padx=2, pady=2)
-        
-        # Bind click on frame background as well
-        self.bind("<Button-1>", self.on_select)
+        self.name = name
+        self.bank_index = 0  # Bank shown (or shown first, while staged)
+        self.banks = []
+        self.slots = {}  # slot_id -> Slot, every bank
+        self.cues = []  # Cue list, in order
+        self.crossfade = 0.0  # Seconds between cue list items; 0 = gapless
+        self.follow = True  # Cue list items run on by themselves
 
-    def on_select(self, event=None):
-        self.parent_app.select_library_item(self.filepath, self)
+    def add_bank(self, rows=BANK_ROWS, cols=BANK_COLS):
+        bank = Bank(self.parent_app, self, len(self.banks), rows, cols)
+        self.banks.append(bank)
+        self.slots.update((slot.slot_id, slot) for slot in bank.slots)
+        return bank
 
-    def on_delete(self):
-        self.parent_app.remove_from_library(self.filepath)
+    def cue_layout(self):
+        """The cue list as stored in a preset, or None if empty."""
+        if not self.cues: return None
+        return {"items": [slot.slot_id for slot in self.cues], "crossfade": self.crossfade, "follow": self.follow}
 
-    def set_selected(self, is_selected):
-        if is_selected:
-            self.configure(fg_color="#1f538d")
-            self.lbl_name.configure(text_color="white", font=("Arial", 12, "bold"))
-        else:
-            self.configure(fg_color="transparent")
-            self.lbl_name.configure(text_color="gray90", font=("Arial", 12))
+    def is_ready(self):
+        """Whether the first bank shown has everything it can load."""
+        return all(slot.sound is not None or not slot.file_path or slot.missing or slot.failed
+                   for slot in self.banks[self.bank_index].slots)
 
 
 class SoundButton(ctk.CTkFrame):
     """
-    Represents a slot in the grid. Can hold a sound, play it, or be moved.
+    A pad on screen. Pads are pooled: switching banks re-binds them to
+    other slots (see `bind_slot`) instead of building new widgets.
     """
-    def __init__(self, master, slot_id, parent_app, **kwargs):
+    def __init__(self, master, parent_app, **kwargs):
         super().__init__(master, corner_radius=8, border_width=2, border_color="#333", **kwargs)
-        self.slot_id = slot_id
         self.parent_app = parent_app
-        self.file_path = None
-        self.sound = None
-        self.channel = None
-        self.duration = 0 
-        
+        self.slot = None
+
         # Visual States
         self.col_empty = "#1c1c1c"
         self.col_loaded = "#1f538d"
+        self.col_loading = "#2a2a2a"
+        self.col_missing = "#5a1c1c"
         self.col_playing = "#2CC985"
-        
+
         self.configure(fg_color=self.col_empty)
         self.grid_rowconfigure(0, weight=1)
         self.grid_columnconfigure(0, weight=1)
 
         # Main Label acts as the button area
-        self.label = ctk.CTkLabel(self, text=slot_id, font=("Arial", 12, "bold"))
+        self.label = ctk.CTkLabel(self, text="", font=("Arial", 12, "bold"))
         self.label.grid(row=0, column=0, sticky="nsew", padx=2, pady=2)
         self.label.bind("<Button-1>", self.on_click)
-        
+        self.label.bind("<Button-3>", self.show_menu)
+
+        # Waveform strip, shown once the overview has been computed
+        self.wave = tk.Canvas(self, height=16, bg=self.col_empty, highlightthickness=0)
+        self.wave.bind("<Button-1>", self.on_click)
+        self.wave.bind("<Button-3>", self.show_menu)
+        self.wave.bind("<Configure>", lambda e: self.draw_peaks())
+
+        # Thin progress bar, shown while the pad is on air
+        self.progress = ctk.CTkProgressBar(self, height=4, corner_radius=2, progress_color="white")
+        self.progress_value = -1
+
         # Remove Button (only visible in edit mode)
         self.btn_remove = ctk.CTkButton(
-            self, text="×", width=20, height=20, 
-            fg_color="#CC3333", text_color="white", 
-            command=self.clear_slot
+            self, text="×", width=20, height=20,
+            fg_color="#CC3333", text_color="white",
+            command=lambda: self.slot.clear_slot()
         )
 
-    def load_sound(self, path):
-        if not os.path.exists(path): return
+    def bind_slot(self, slot):
+        """Show another slot (rows of the library are recycled the same way)."""
+        if self.slot is not None and self.slot.view is self:
+            self.slot.view = None
+        self.slot = slot
+        slot.view = self
+        self.hide_progress()  # The next progress refresh puts it back if the slot is on air
+        self.show_peaks()
+        self.refresh_visuals()
+
+    def unbind_slot(self):
+        if self.slot is not None and self.slot.view is self:
+            self.slot.view = None
+        self.slot = None
+
+    def show_menu(self, event):
+        """Per-slot options, only in edit mode."""
+        slot = self.slot
+        if not self.parent_app.is_edit_mode or not slot.file_path: return
+        menu = Menu(self, tearoff=0)
+        menu.add_command(label=self.parent_app.t("play_from"), state="disabled")
+        for key, mode in (("mode_auto", None), ("mode_memory", False), ("mode_stream", True)):
+            mark = "● " if slot.stream_mode is mode else "   "
+            menu.add_command(label=mark + self.parent_app.t(key), command=lambda m=mode: slot.set_stream_mode(m))
+        menu.add_separator()
+        menu.add_command(label=self.parent_app.t("play_mode"), state="disabled")
+        for mode in PLAY_MODES:
+            mark = "● " if slot.play_mode == mode else "   "
+            menu.add_command(label=mark + self.parent_app.t(f"mode_{mode}"), command=lambda m=mode: slot.set_play_mode(m))
+        menu.add_separator()
+        menu.add_command(label=self.parent_app.t("cue_start"), command=lambda: self.ask_cue(0))
+        menu.add_command(label=self.parent_app.t("cue_end"), command=lambda: self.ask_cue(1))
+        menu.add_command(label=self.parent_app.t("cue_reset"), command=lambda: slot.set_cue(None),
+                         state="normal" if slot.cue else "disabled")
+        menu.add_separator()
+        listed = slot in slot.deck.cues
+        menu.add_command(label=self.parent_app.t("cuelist_remove" if listed else "cuelist_add"),
+                         command=lambda: self.parent_app.toggle_cue(slot))
+        menu.tk_popup(event.x_root, event.y_root)
+
+    def ask_cue(self, index):
+        """Prompt for one cue point in seconds; an empty answer goes back to automatic."""
+        slot = self.slot
+        key = "cue_start" if index == 0 else "cue_end"
+        dialog = ctk.CTkInputDialog(text=self.parent_app.t("cue_prompt"), title=self.parent_app.t(key))
+        value = dialog.get_input()
+        if value is None: return  # Cancelled
+        value = value.strip().replace(",", ".")
         try:
-            self.file_path = path
-            self.sound = pygame.mixer.Sound(path)
-            self.duration = self.sound.get_length()
-            self.sound.set_volume(self.parent_app.global_volume)
-            
-            # Format display name
-            name = os.path.splitext(os.path.basename(path))[0]
+            seconds = max(float(value), 0.0) if value else None
+        except ValueError:
+            return
+        cue = list(slot.cue or (None, None))
+        cue[index] = seconds
+        if None not in cue and cue[1] <= cue[0]: return
+        slot.set_cue(None if cue == [None, None] else tuple(cue))
+
+    def refresh_visuals(self):
+        slot = self.slot
+        if not slot.file_path or slot.failed:
+            self.label.configure(text=slot.label)
+            self.set_color(self.col_empty)
+        else:
+            name = os.path.splitext(os.path.basename(slot.file_path))[0]
             display = name[:12] + ".." if len(name) > 12 else name
-            
-            self.label.configure(text=f"{self.slot_id}\n{display}")
-            self.configure(fg_color=self.col_loaded)
-            
-            self.parent_app.save_current_preset()
-            self.update_edit_visuals()
-        except Exception as e:
-            print(f"Error loading sound: {e}")
+            if slot.missing or slot.sound is None:
+                state = self.parent_app.t("missing" if slot.missing else "loading")
+                self.label.configure(text=f"{slot.label}\n{display}\n{state}")
+                self.set_color(self.col_missing if slot.missing else self.col_loading)
+            else:
+                tag = f"  ▶{slot.deck.cues.index(slot) + 1}" if slot in slot.deck.cues else ""
+                self.label.configure(text=f"{slot.label}{tag}\n{display}")
+                self.set_color(self.col_playing if slot in self.parent_app.voices else self.col_loaded)
+        self.update_edit_visuals()
 
-    def clear_slot(self):
-        if self.channel: 
-            self.channel.stop()
-        self.file_path = None
-        self.sound = None
-        self.duration = 0
-        self.label.configure(text=f"{self.slot_id}")
-        self.configure(fg_color=self.col_empty, border_color="#333")
-        self.btn_remove.place_forget()
-        self.parent_app.save_current_preset()
+    def set_color(self, color):
+        self.configure(fg_color=color)
+        self.wave.configure(bg=color)
+
+    def show_peaks(self):
+        if self.slot.peaks is None:
+            self.wave.delete("wave")
+            self.wave.grid_remove()
+        else:
+            self.wave.grid(row=1, column=0, sticky="ew", padx=8, pady=(0, 8))
+            self.draw_peaks()
+
+    def draw_peaks(self):
+        if self.slot is None or self.slot.peaks is None: return
+        width = self.wave.winfo_width()
+        if width > 1:
+            draw_waveform(self.wave, self.slot.shown_peaks(WAVEFORM_RESOLUTIONS[0]), width, 16, "#9fc3ee")
 
     def update_edit_visuals(self):
         """Show/Hide delete button based on Edit Mode."""
-        if self.parent_app.is_edit_mode and self.file_path:
+        if self.parent_app.is_edit_mode and self.slot.file_path:
             self.btn_remove.place(relx=0.85, rely=0.15, anchor="center")
-            self.configure(border_color="#555")
+            self.configure(border_color="#E0A500" if self.parent_app.move_source is self.slot else "#555")
         else:
             self.btn_remove.place_forget()
             self.configure(border_color="#333")
 
     def on_click(self, event=None):
+        slot = self.slot
         # --- EDIT MODE LOGIC ---
         if self.parent_app.is_edit_mode:
             # 1. Assign from Library
             if self.parent_app.selected_library_path:
-                self.load_sound(self.parent_app.selected_library_path)
+                with self.parent_app.edit_transaction():
+                    slot.load_sound(self.parent_app.selected_library_path)
                 self.parent_app.deselect_library()
                 return
-            
+
             # 2. Move / Swap
-            if self.parent_app.move_source_btn:
-                source = self.parent_app.move_source_btn
-                if source == self:
+            if self.parent_app.move_source:
+                source = self.parent_app.move_source
+                self.parent_app.move_source = None
+                if source == slot:
                     # Cancel move
-                    source.configure(border_color="#555")
-                    self.parent_app.move_source_btn = None
+                    self.update_edit_visuals()
                 else:
                     # Execute Swap
-                    path_source = source.file_path
-                    path_target = self.file_path
-                    source.clear_slot()
-                    self.clear_slot()
-                    if path_target: source.load_sound(path_target)
-                    if path_source: self.load_sound(path_source)
-                    self.parent_app.move_source_btn = None
+                    self.parent_app.swap_slots(source, slot)
             else:
                 # Select as Source
-                if self.file_path:
-                    self.parent_app.move_source_btn = self
-                    self.configure(border_color="#E0A500")
+                if slot.file_path:
+                    self.parent_app.move_source = slot
+                    self.update_edit_visuals()
             return
 
         # --- LIVE MODE LOGIC ---
-        if not self.sound: return
+        if not slot.sound: return
+        diag = self.parent_app.diagnostics
+        t0 = time.perf_counter()
 
-        if self.channel and self.channel.get_busy():
-            self.channel.stop()
-            self.configure(fg_color=self.col_loaded)
-            if self.parent_app.current_playing_btn == self:
-                self.parent_app.current_playing_btn = None
-        else:
-            self.channel = pygame.mixer.find_channel()
-            if self.channel:
-                self.channel.play(self.sound)
-                self.configure(fg_color=self.col_playing)
-                
-                # Update Global Player Bar
-                self.parent_app.current_playing_btn = self
-                self.parent_app.current_start_time = time.time()
-                
-                self.after(100, self.check_playback)
-
-    def check_playback(self):
-        if self.channel and self.channel.get_busy():
-            self.after(100, self.check_playback)
-        else:
-            if self.file_path: 
-                self.configure(fg_color=self.col_loaded)
-            if self.parent_app.current_playing_btn == self:
-                self.parent_app.current_playing_btn = None
+        result = self.parent_app.engine.trigger(slot.engine_id)
+        if result is None: return  # One-shot already playing
+        if result[0] == "stopped":
+            slot.show_stopped()
+            diag.since("trigger.stop", t0)
+        else:
+            diag.since("trigger.send", t0)
+            slot.show_started(result[1])
+            diag.since("trigger.ui", t0)
+            # Idle callbacks run after Tk's pending redraws: the pad is on screen by then
+            self.after_idle(diag.since, "trigger.paint", t0)
+
+    def show_progress(self, value):
+        """Called from the app's batched refresh; only touches Tk when the bar visibly moves."""
+        value = round(value, 2)
+        if value == self.progress_value: return
+        if self.progress_value < 0:
+            self.progress.place(relx=0.5, rely=0.9, relwidth=0.86, anchor="center")
+        self.progress_value = value
+        self.progress.set(value)
+
+    def hide_progress(self):
+        if self.progress_value >= 0:
+            self.progress.place_forget()
+            self.progress_value = -1
+
+
+class DiagnosticsPanel(ctk.CTkToplevel):
+    """Hidden window (Ctrl+Shift+D) showing the live latency histograms."""
+    def __init__(self, parent_app):
+        super().__init__(parent_app)
+        self.parent_app = parent_app
+        self.title(parent_app.t("diagnostics"))
+        self.geometry("640x420")
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+
+        self.txt = ctk.CTkTextbox(self, font=("Consolas", 12), wrap="none")
+        self.txt.grid(row=0, column=0, columnspan=2, sticky="nsew", padx=10, pady=10)
+        ctk.CTkButton(self, text=parent_app.t("diag_reset"), fg_color="#444",
+                      command=parent_app.diagnostics.reset).grid(row=1, column=0, sticky="w", padx=10, pady=(0, 10))
+        ctk.CTkButton(self, text=parent_app.t("diag_dump"),
+                      command=self.dump).grid(row=1, column=1, sticky="e", padx=10, pady=(0, 10))
+        self.refresh()
+
+    def refresh(self):
+        if not self.winfo_exists(): return
+        self.txt.configure(state="normal")
+        self.txt.delete("0.0", "end")
+        self.txt.insert("0.0", self.parent_app.diagnostics.report())
+        self.txt.configure(state="disabled")
+        self.after(500, self.refresh)
+
+    def dump(self):
+        name = f"diagnostics-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+        path = filedialog.asksaveasfilename(parent=self, initialfile=name, defaultextension=".json",
+                                            filetypes=[("JSON", "*.json")])
+        if path:
+            try:
+                self.parent_app.diagnostics.dump(path)
+            except OSError as e:
+                print(f"Diagnostics dump error: {e}")
 
 
 class OppodcastDesktop(ctk.CTk):
     def __init__(self):
         super().__init__()
-        
+        self.diagnostics = Diagnostics()
+        self.diagnostics.mark("imports")
+
         # --- Audio Engine ---
-        pygame.mixer.init(frequency=44100, size=-16, channels=2, buffer=512)
-        pygame.mixer.set_num_channels(32)
-        
+        # Mixer, decoding and voices run in their own process whenever possible,
+        # so a busy Tk main loop can't hold up or cut off the sound. It is reached
+        # (or spawned) in the background; commands wait in the client meanwhile.
+        self.engine = EngineClient.start_in_background()
+        self.engine_deaths = []  # Monotonic times the engine was lost, for the respawn limit
+        self.pcm_cache = PcmCache()
+        self.waveforms = WaveformCache(self.pcm_cache)
+        self.library = LibraryIndex()
+        self.analyzer = AudioAnalyzer(self.library, self.pcm_cache)
+        self.importer = LibraryImporter(self.library, self.pcm_cache)
+        self.watcher = LibraryWatcher(self.library, self.importer)
+        self.loader_pump_active = False
+        self.voices = VoiceTracker()
+        self.overlapped = VoiceTracker()  # (slot, token) -> earlier voices of an overlap pad, still on air
+        self.voice_check_id = None
+        self.diagnostics_panel = None
+        self.stall_probe_due = None
+        self.remote = None  # RemoteControl while the switch is on
+
         # --- State Variables ---
         self.lang = "fr"  # Default Language
         self.global_volume = 0.8
+        self.normalize = True
         self.selected_library_path = None
-        self.library_widgets = []
+        self.import_pump_active = False
         self.is_edit_mode = False
-        self.move_source_btn = None
+        self.move_source = None  # Slot picked first for a move
         self.is_loading_preset = False
-        self.current_playing_btn = None
-        self.current_start_time = 0
+        self.edit_depth = 0
+        self.preset_dirty = False
+        self.preset_save_id = None
+        self.current_playing_slot = None
+        self.is_paused = False
+        self.progress_tick_id = None
+        self.rundown = self.read_rundown()
+        self.rundown_pos = 0
+        self.preset_history = self.read_history()
+        self.predicted = None  # Presets the engine was last asked to decode ahead
         
         # Chrono State
         self.chrono_start_time = 0
@@ -274,15 +3866,97 @@ class OppodcastDesktop(ctk.CTk):
         # --- UI Construction ---
         self.create_sidebar()
         self.create_main_area()
-        
+        self.update_clock()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.diagnostics.mark("window")
+
         # --- Initialization ---
-        self.library_files = []
+        # Everything else once the window is on screen, a step per main loop turn
+        self.startup_steps = self.initialize()
+        self.after_idle(self.run_startup_step)
+
+    def initialize(self):
+        """Startup after the first frame. Yields a timeline step name, or None, between chunks of work."""
+        yield "first_frame"
+        while len(self.pads) < BANK_ROWS * BANK_COLS:  # The pad pool, a row at a time
+            self.pads.extend(SoundButton(self.grid_frame, self) for _ in range(BANK_COLS))
+            yield None
+        yield "pads"
         self.refresh_presets_list()
-        self.load_preset("Default")
-        
-        # Start Loops
-        self.update_clock()
-        self.update_player_bar()
+        if self.deck is None and self.next_deck is None:  # Unless one was picked already
+            self.load_preset("Default")
+        yield "preset"
+        self.load_notes()
+        yield "notes"
+        self.refresh_progress()
+        self.pump_watcher()
+        self.probe_stalls()
+        self.watch_engine()
+        self.bind_all("<Control-D>", self.toggle_diagnostics)  # Ctrl+Shift+D
+        self.bind_all("<Control-Prior>", lambda e: self.step_bank(-1))  # Ctrl+PageUp
+        self.bind_all("<Control-Next>", lambda e: self.step_bank(1))
+        self.bind_all("<Control-g>", lambda e: self.cue_go())
+        yield "loops"
+
+    def run_startup_step(self):
+        step = next(self.startup_steps, False)
+        if step is False:
+            self.pump_startup()
+            return
+        if step:
+            self.diagnostics.mark(step)
+        self.after_idle(self.after, 0, self.run_startup_step)  # Tk paints in between
+
+    def pump_startup(self, connected=False):
+        """Until the engine has answered and the first bank is loaded, the end of the startup timeline."""
+        if not connected and self.engine.is_connected():
+            connected = True
+            self.diagnostics.mark("engine")
+            self.drain_engine()  # Voices still on air from before a UI restart
+        if connected and self.deck is not None and self.deck.is_ready():
+            self.diagnostics.mark("interactive")
+            return
+        self.after(STARTUP_POLL_MS, self.pump_startup, connected)
+
+    def on_close(self):
+        if self.notes_save_id:
+            self.after_cancel(self.notes_save_id)
+            self.save_notes()
+        self.notes_writer.close()
+        # The engine goes down with us: whatever is still on air is cut
+        self.retire_overlapped(everything=True)
+        for slot, voice in self.voices.items():
+            self.log_play(slot, voice, cut=True)
+        self.asrun.close()
+        self.flush_preset_save()
+        if self.remote:
+            self.remote.stop()
+        self.engine.close()
+        self.watcher.stop()
+        self.waveforms.shutdown()
+        self.analyzer.shutdown()
+        self.importer.shutdown()
+        self.library.close()
+        self.destroy()
+
+    # --- DIAGNOSTICS ---
+    def probe_stalls(self):
+        """Heartbeat: how late it fires is how long the main loop was blocked."""
+        now = time.perf_counter()
+        if self.stall_probe_due is not None:
+            lag = max((now - self.stall_probe_due) * 1000, 0.0)
+            self.diagnostics.record("loop.lag", lag)
+            if lag > STALL_THRESHOLD_MS:
+                self.diagnostics.stall(lag)
+        self.stall_probe_due = now + STALL_PROBE_MS / 1000
+        self.after(STALL_PROBE_MS, self.probe_stalls)
+
+    def toggle_diagnostics(self, event=None):
+        if self.diagnostics_panel and self.diagnostics_panel.winfo_exists():
+            self.diagnostics_panel.destroy()
+            self.diagnostics_panel = None
+        else:
+            self.diagnostics_panel = DiagnosticsPanel(self)
 
     def t(self, key):
         """Helper for translation."""
@@ -326,8 +4000,9 @@ class OppodcastDesktop(ctk.CTk):
         self.frm_player_bar.grid(row=3, column=0, sticky="ew", padx=10, pady=10)
         self.lbl_track_name = ctk.CTkLabel(self.frm_player_bar, text="--", font=("Arial", 11, "bold"), text_color="white")
         self.lbl_track_name.pack(pady=(5,0))
-        self.progress_bar = ctk.CTkProgressBar(self.frm_player_bar, width=220, height=8, progress_color="#2CC985")
+        self.progress_bar = WaveformBar(self.frm_player_bar)
         self.progress_bar.set(0)
+        self.player_bar_slot = None  # Whose waveform the bar currently shows
         self.progress_bar.pack(pady=5)
         self.lbl_track_time = ctk.CTkLabel(self.frm_player_bar, text="00:00 / 00:00", font=("Consolas", 11), text_color="gray")
         self.lbl_track_time.pack(pady=(0,5))
@@ -337,9 +4012,16 @@ class OppodcastDesktop(ctk.CTk):
         self.slider.set(0.8)
         self.slider.grid(row=4, column=0, pady=5, sticky="ew", padx=20)
         
-        self.switch_top = ctk.CTkSwitch(self.sidebar, text=self.t("always_top"), command=self.toggle_topmost)
-        self.switch_top.grid(row=5, column=0, pady=5)
-        
+        frm_switches = ctk.CTkFrame(self.sidebar, fg_color="transparent")
+        frm_switches.grid(row=5, column=0, pady=5)
+        self.switch_top = ctk.CTkSwitch(frm_switches, text=self.t("always_top"), command=self.toggle_topmost)
+        self.switch_top.pack(anchor="w", pady=2)
+        self.switch_norm = ctk.CTkSwitch(frm_switches, text=self.t("normalize"), command=self.toggle_normalize)
+        self.switch_norm.select()
+        self.switch_norm.pack(anchor="w", pady=2)
+        self.switch_remote = ctk.CTkSwitch(frm_switches, text=self.t("remote"), command=self.toggle_remote)
+        self.switch_remote.pack(anchor="w", pady=2)
+
         # 5. Language Switch
         self.btn_lang = ctk.CTkButton(self.sidebar, text="Language: FR", width=100, fg_color="#333", command=self.toggle_language)
         self.btn_lang.grid(row=6, column=0, pady=5)
@@ -348,15 +4030,24 @@ class OppodcastDesktop(ctk.CTk):
         self.lbl_lib = ctk.CTkLabel(self.sidebar, text=self.t("library"), font=("Arial", 12, "bold"), text_color="gray")
         self.lbl_lib.grid(row=7, column=0, pady=(20, 5))
         
-        self.scroll_frame = ctk.CTkScrollableFrame(self.sidebar, label_text=self.t("imported_files"))
-        self.scroll_frame.grid(row=8, column=0, sticky="nsew", padx=10, pady=5)
+        self.library_view = LibraryList(self.sidebar, self, self.library)
+        self.library_view.grid(row=8, column=0, sticky="nsew", padx=10, pady=5)
+        self.library_view.refresh()
         
-        self.btn_import = ctk.CTkButton(self.sidebar, text=self.t("import_btn"), command=self.import_mass)
-        self.btn_import.grid(row=9, column=0, pady=10, padx=20, sticky="ew")
+        frm_import = ctk.CTkFrame(self.sidebar, fg_color="transparent")
+        frm_import.grid(row=9, column=0, pady=10, padx=20, sticky="ew")
+        frm_import.grid_columnconfigure((0, 1), weight=1)
+        self.btn_import = ctk.CTkButton(frm_import, text=self.t("import_btn"), command=self.import_mass)
+        self.btn_import.grid(row=0, column=0, padx=(0, 2), sticky="ew")
+        self.btn_folder = ctk.CTkButton(frm_import, text=self.t("folder_btn"), fg_color="#333", command=self.add_library_folder)
+        self.btn_folder.grid(row=0, column=1, padx=2, sticky="ew")
+        ctk.CTkButton(frm_import, text="⟳", width=30, fg_color="#333", command=self.rescan_library).grid(row=0, column=2, padx=(2, 0))
+        self.import_progress = ctk.CTkProgressBar(self.sidebar, height=6, progress_color="#1f538d")
+        self.import_progress.set(0)
 
         # 7. Status Label (Bottom)
         self.lbl_status = ctk.CTkLabel(self.sidebar, text=self.t("status_live"), text_color="gray", height=30)
-        self.lbl_status.grid(row=10, column=0, sticky="ew", pady=5)
+        self.lbl_status.grid(row=11, column=0, sticky="ew", pady=5)
 
 
     def create_main_area(self):
@@ -376,25 +4067,59 @@ class OppodcastDesktop(ctk.CTk):
         
         ctk.CTkButton(frm_top, text="+", width=30, command=self.create_preset).pack(side="left")
         ctk.CTkButton(frm_top, text="Del", width=30, fg_color="#550000", command=self.delete_preset).pack(side="left", padx=5)
+        self.btn_rundown = ctk.CTkButton(frm_top, text=self.t("rundown"), width=90, fg_color="gray30", command=self.edit_rundown)
+        self.btn_rundown.pack(side="left", padx=5)
+        self.btn_asrun = ctk.CTkButton(frm_top, text=self.t("asrun"), width=90, fg_color="gray30", command=self.export_asrun)
+        self.btn_asrun.pack(side="left")
         
         self.switch_edit = ctk.CTkSwitch(frm_top, text=self.t("edit_switch"), command=self.toggle_edit_mode)
         self.switch_edit.pack(side="right", padx=10)
 
-        # Grid Container
+        # Bank Bar
+        frm_banks = ctk.CTkFrame(self.tab_jingles, fg_color="transparent")
+        frm_banks.pack(fill="x", pady=(0, 10))
+        self.lbl_bank = ctk.CTkLabel(frm_banks, text=self.t("bank"), text_color="gray")
+        self.lbl_bank.pack(side="left", padx=5)
+        self.bank_selector = ctk.CTkSegmentedButton(frm_banks, values=["1"], command=self.change_bank)
+        self.bank_selector.pack(side="left", padx=5)
+        self.btn_add_bank = ctk.CTkButton(frm_banks, text="+", width=30, command=self.add_bank)
+        self.btn_del_bank = ctk.CTkButton(frm_banks, text="−", width=30, fg_color="#550000", command=self.remove_bank)
+
+        # Cue List Bar
+        frm_cues = ctk.CTkFrame(self.tab_jingles, fg_color="transparent")
+        frm_cues.pack(fill="x", pady=(0, 10))
+        self.btn_go = ctk.CTkButton(frm_cues, text="GO", width=60, fg_color="#2CC985", hover_color="#229A65",
+                                    text_color="black", font=("Arial", 14, "bold"), command=self.cue_go)
+        self.btn_go.pack(side="left", padx=5)
+        ctk.CTkButton(frm_cues, text="⏮", width=30, fg_color="gray30", command=self.cue_rewind).pack(side="left")
+        self.lbl_cue = ctk.CTkLabel(frm_cues, text=self.t("cuelist_empty"), text_color="gray", anchor="w")
+        self.lbl_cue.pack(side="left", padx=10, fill="x", expand=True)
+        self.switch_follow = ctk.CTkSwitch(frm_cues, text=self.t("cuelist_follow"), command=self.toggle_cue_follow)
+        self.switch_follow.pack(side="right", padx=10)
+        self.btn_cue_fade = ctk.CTkButton(frm_cues, text=self.t("cuelist_fade"), width=70, fg_color="gray30", command=self.ask_crossfade)
+        self.btn_cue_clear = ctk.CTkButton(frm_cues, text=self.t("cuelist_clear"), width=60, fg_color="#550000", command=self.clear_cues)
+        self.cue_position = -1  # Item the engine last started, as it reported
+        self.cue_watch_until = 0.0  # Poll the engine at least until then (monotonic)
+        self.cue_pump_active = False
+
+        # Grid Container: pads are built for the visible bank only and reused across banks
         self.grid_frame = ctk.CTkFrame(self.tab_jingles)
         self.grid_frame.pack(expand=True, fill="both")
-        self.buttons_map = {}
-        self.create_grid()
+        self.pads = []  # SoundButton pool
+        self.grid_shape = (0, 0)
+        self.deck = None  # Preset on screen
+        self.next_deck = None  # Preset being prepared to replace it
+        self.engine_slots = {}  # engine_id -> Slot, on screen, staged or retired but still on air
+        self.switch_started = None  # Monotonic time the staged preset was asked for
+        self.prefetch_queue = deque()
+        self.prefetch_active = False
 
         # --- Notes Tab ---
-        self.txt_notes = ctk.CTkTextbox(self.tab_notes, font=("Arial", 14))
+        self.txt_notes = ctk.CTkTextbox(self.tab_notes, font=("Arial", 14), state="disabled")  # Until load_notes
         self.txt_notes.pack(expand=True, fill="both", padx=5, pady=5)
-        
-        if os.path.exists(NOTES_FILE):
-            with open(NOTES_FILE, "r", encoding="utf-8") as f: 
-                self.txt_notes.insert("0.0", f.read())
-                
-        self.txt_notes.bind("<KeyRelease>", self.save_notes)
+        self.notes_writer = NotesWriter(NOTES_FILE)
+        self.asrun = AsRunLog()
+        self.notes_save_id = None
 
     def toggle_language(self):
         self.lang = "en" if self.lang == "fr" else "fr"
@@ -405,14 +4130,24 @@ class OppodcastDesktop(ctk.CTk):
         """Refreshes all labels and buttons with current language."""
         self.lbl_commands.configure(text=self.t("commands"))
         self.lbl_lib.configure(text=self.t("library"))
-        self.scroll_frame.configure(label_text=self.t("imported_files"))
+        self.library_view.set_texts()
         self.btn_import.configure(text=self.t("import_btn"))
-        self.btn_pause.configure(text=self.t("btn_pause"))
+        self.btn_folder.configure(text=self.t("folder_btn"))
+        self.btn_pause.configure(text=self.t("btn_resume") if self.is_paused else self.t("btn_pause"))
         self.btn_stop.configure(text=self.t("btn_stop"))
         self.btn_chrono_start.configure(text=self.t("btn_start") if not self.chrono_running else self.t("btn_pause"))
         self.btn_chrono_reset.configure(text=self.t("btn_reset"))
         self.switch_top.configure(text=self.t("always_top"))
+        self.switch_norm.configure(text=self.t("normalize"))
+        self.switch_remote.configure(text=self.t("remote"))
         self.switch_edit.configure(text=self.t("edit_switch"))
+        self.lbl_bank.configure(text=self.t("bank"))
+        self.btn_rundown.configure(text=self.t("rundown"))
+        self.btn_asrun.configure(text=self.t("asrun"))
+        self.switch_follow.configure(text=self.t("cuelist_follow"))
+        self.btn_cue_fade.configure(text=self.t("cuelist_fade"))
+        self.btn_cue_clear.configure(text=self.t("cuelist_clear"))
+        self.refresh_cue_label()
         
         # Note: Updating Tab names in CTk is tricky, usually requires recreation. 
         # We will skip tab rename to avoid complexity, but new windows would use new lang.
@@ -427,7 +4162,7 @@ class OppodcastDesktop(ctk.CTk):
         now = datetime.now().strftime("%H:%M:%S")
         self.lbl_clock.configure(text=now)
         if self.chrono_running:
-            diff = time.time() - self.chrono_start_time + self.chrono_elapsed
+            diff = time.monotonic() - self.chrono_start_time + self.chrono_elapsed
             mins = int(diff // 60)
             secs = int(diff % 60)
             self.lbl_chrono.configure(text=f"{mins:02}:{secs:02}")
@@ -435,11 +4170,11 @@ class OppodcastDesktop(ctk.CTk):
 
     def toggle_chrono(self):
         if self.chrono_running:
-            self.chrono_elapsed += time.time() - self.chrono_start_time
+            self.chrono_elapsed += time.monotonic() - self.chrono_start_time
             self.chrono_running = False
             self.btn_chrono_start.configure(text=self.t("btn_resume"), fg_color="#2CC985")
         else:
-            self.chrono_start_time = time.time()
+            self.chrono_start_time = time.monotonic()
             self.chrono_running = True
             self.btn_chrono_start.configure(text=self.t("btn_pause"), fg_color="#E0A500")
 
@@ -453,35 +4188,56 @@ class OppodcastDesktop(ctk.CTk):
         self.attributes('-topmost', self.switch_top.get())
 
     # --- PLAYER BAR LOGIC ---
-    def update_player_bar(self):
-        if self.current_playing_btn and self.current_playing_btn.sound:
-            elapsed = time.time() - self.current_start_time
-            total = self.current_playing_btn.duration
+    def refresh_progress(self):
+        """
+        Single batched redraw of the player bar and every pad's progress.
+        Runs only while voices are active; start_voice wakes it up again.
+        """
+        self.progress_tick_id = None
+        now = time.monotonic()
+        for slot, voice in self.voices.items():
+            if slot.view:
+                slot.view.show_progress(voice.progress(now))
+
+        if self.player_bar_slot is not self.current_playing_slot:
+            self.player_bar_slot = self.current_playing_slot
+            slot = self.player_bar_slot
+            self.progress_bar.set_peaks(slot.shown_peaks(WAVEFORM_RESOLUTIONS[1]) if slot and slot.peaks else None)
+
+        voice = self.voices.get(self.current_playing_slot)
+        if voice and voice.duration > 0:
+            elapsed, total = voice.elapsed(now), voice.duration
+            self.progress_bar.set(voice.progress(now))
+            
+            el_min, el_sec = divmod(int(elapsed), 60)
+            to_min, to_sec = divmod(int(total), 60)
+            rem_min, rem_sec = divmod(int(voice.remaining(now)), 60)
             
-            if total > 0:
-                percent = min(elapsed / total, 1.0)
-                self.progress_bar.set(percent)
-                
-                el_min, el_sec = divmod(int(elapsed), 60)
-                to_min, to_sec = divmod(int(total), 60)
-                rem_min, rem_sec = divmod(int(total - elapsed), 60)
-                
-                name = os.path.basename(self.current_playing_btn.file_path)
-                display_name = name[:20]+".." if len(name)>20 else name
-                
-                self.lbl_track_name.configure(text=display_name)
-                self.lbl_track_time.configure(text=f"{el_min:02}:{el_sec:02} / {to_min:02}:{to_sec:02} (-{rem_min:02}:{rem_sec:02})")
+            name = os.path.basename(self.current_playing_slot.file_path)
+            display_name = name[:20]+".." if len(name)>20 else name
+            
+            self.lbl_track_name.configure(text=display_name)
+            self.lbl_track_time.configure(text=f"{el_min:02}:{el_sec:02} / {to_min:02}:{to_sec:02} (-{rem_min:02}:{rem_sec:02})")
         else:
             self.progress_bar.set(0)
             self.lbl_track_name.configure(text="--")
             self.lbl_track_time.configure(text="00:00 / 00:00")
-            
-        self.after(100, self.update_player_bar)
+        
+        if self.voices.next_deadline() is not None:  # Something is still running
+            self.progress_tick_id = self.after(100, self.progress_tick)
+
+    def progress_tick(self):
+        self.drain_engine()  # The tick id is still set, so ends found here don't re-enter
+        self.refresh_progress()
+
+    def wake_progress(self):
+        if self.progress_tick_id is None:
+            self.refresh_progress()
 
     # --- MAIN FEATURES ---
     def toggle_edit_mode(self):
         self.is_edit_mode = self.switch_edit.get()
-        self.move_source_btn = None
+        self.move_source = None
         if self.is_edit_mode:
             self.grid_frame.configure(border_width=2, border_color="#E0A500")
             self.lbl_status.configure(text=self.t("status_edit"), text_color="#E0A500")
@@ -490,8 +4246,10 @@ class OppodcastDesktop(ctk.CTk):
             self.deselect_library()
             self.lbl_status.configure(text=self.t("status_live"), text_color="#2CC985")
             
-        for btn in self.buttons_map.values(): 
-            btn.update_edit_visuals()
+        for pad in self.visible_pads():
+            pad.update_edit_visuals()
+        self.bank_edit_controls(self.is_edit_mode)
+        self.library_view.render()
 
     def import_mass(self):
         if not self.is_edit_mode:
@@ -503,78 +4261,612 @@ class OppodcastDesktop(ctk.CTk):
             
         files = filedialog.askopenfilenames(filetypes=[("Audio", "*.mp3 *.wav *.ogg")])
         if files:
-            for f in files:
-                if f not in self.library_files: 
-                    self.library_files.append(f)
-            self.refresh_library_ui()
+            if self.importer.submit(files):
+                self.start_import_pump()
+
+    def add_library_folder(self):
+        """Watch a folder: it is scanned recursively now and rescanned in the background."""
+        if not self.is_edit_mode:
+            tmp = ctk.CTkLabel(self, text=self.t("warn_edit"), text_color="#FF4444", font=("Arial", 16, "bold"))
+            tmp.place(relx=0.5, rely=0.5, anchor="center")
+            self.after(1500, tmp.destroy)
+            return
+        folder = filedialog.askdirectory()
+        if folder:
+            self.library.add_root(os.path.normpath(os.path.abspath(folder)))
+            self.rescan_library()
+
+    def rescan_library(self):
+        self.watcher.rescan()
+
+    def start_import_pump(self):
+        self.import_progress.grid(row=10, column=0, padx=20, sticky="ew")
+        if not self.import_pump_active:
+            self.import_pump_active = True
+            self.after(50, self.pump_importer)
+
+    def pump_watcher(self):
+        """Apply folder changes to the sidebar and to any slot using those files."""
+        added, changed, removed = self.watcher.drain()
+        if added or changed or removed:
+            self.is_loading_preset = True  # Reloads don't change the preset itself
+            for slot in [s for s in self.engine_slots.values() if s.deck in (self.deck, self.next_deck)]:
+                if not slot.file_path: continue
+                key = path_key(slot.file_path)
+                defer = slot.bank != slot.deck.bank_index
+                if key in removed and key not in added:
+                    slot.load_sound(slot.file_path, defer)  # Shows the slot as missing
+                elif key in changed or (key in added and slot.sound is None):
+                    slot.load_sound(slot.file_path, defer)
+            self.is_loading_preset = False
+            self.library_view.refresh()
+            if self.importer.is_busy():
+                self.start_import_pump()
+        self.after(500, self.pump_watcher)
+
+    def pump_importer(self):
+        """Show probed files as they land in the index; one list redraw per tick."""
+        if self.importer.drain():
+            self.library_view.refresh()
+        if self.importer.total:
+            self.import_progress.set(self.importer.done / self.importer.total)
+        if self.importer.is_busy():
+            self.after(100, self.pump_importer)
+        else:
+            self.import_pump_active = False
+            self.import_progress.grid_forget()
 
     def remove_from_library(self, path):
         if not self.is_edit_mode: return
-        if path in self.library_files:
-            self.library_files.remove(path)
-            if self.selected_library_path == path: 
-                self.deselect_library()
-            self.refresh_library_ui()
-
-    def refresh_library_ui(self):
-        for widget in self.scroll_frame.winfo_children(): 
-            widget.destroy()
-        
-        self.library_widgets = []
-        for path in self.library_files:
-            item = LibraryItem(self.scroll_frame, path, self)
-            item.pack(fill="x", pady=2, padx=2)
-            self.library_widgets.append(item)
-            if not self.is_edit_mode: 
-                item.btn_del.configure(state="disabled")
+        self.library.remove(path)
+        self.importer.forget(path)
+        if self.selected_library_path == path: 
+            self.selected_library_path = None
+        self.library_view.refresh()
 
     def select_library_item(self, path, widget_ref):
         if not self.is_edit_mode: return
         self.selected_library_path = path
-        for w in self.library_widgets: 
-            w.set_selected(w == widget_ref)
+        self.library_view.update_selection()
 
     def deselect_library(self):
         self.selected_library_path = None
-        for w in self.library_widgets: 
-            w.set_selected(False)
+        self.library_view.update_selection()
 
-    def create_grid(self):
-        rows, cols = ["A", "B", "C", "D", "E"], 6
-        for i in range(5): self.grid_frame.grid_rowconfigure(i, weight=1)
-        for i in range(cols): self.grid_frame.grid_columnconfigure(i, weight=1)
-        
-        for r, row_char in enumerate(rows):
-            for c in range(cols):
-                slot_id = f"{row_char}{c+1}"
-                btn = SoundButton(self.grid_frame, slot_id, self)
-                btn.grid(row=r, column=c, padx=4, pady=4, sticky="nsew")
-                self.buttons_map[slot_id] = btn
+    # --- BANKS ---
+    def show_bank(self, index):
+        """Bind the pad pool to another bank. Slots elsewhere keep loading and playing."""
+        if self.deck is None: return  # Still starting up: no preset on screen yet
+        bank = self.deck.banks[index]
+        self.deck.bank_index = index
+        if self.move_source:
+            self.move_source = None
+        count = bank.rows * bank.cols
+        while len(self.pads) < count:
+            self.pads.append(SoundButton(self.grid_frame, self))
+        rows, cols = max(self.grid_shape[0], bank.rows), max(self.grid_shape[1], bank.cols)
+        for r in range(rows): self.grid_frame.grid_rowconfigure(r, weight=1 if r < bank.rows else 0)
+        for c in range(cols): self.grid_frame.grid_columnconfigure(c, weight=1 if c < bank.cols else 0)
+        self.grid_shape = (bank.rows, bank.cols)
+
+        for i, pad in enumerate(self.pads):
+            if i < count:
+                pad.bind_slot(bank.slots[i])
+                pad.grid(row=i // bank.cols, column=i % bank.cols, padx=4, pady=4, sticky="nsew")
+            elif pad.slot is not None:
+                pad.unbind_slot()
+                pad.grid_remove()
+
+        # Keep the neighbouring banks ready and let the far ones go
+        for other in self.deck.banks:
+            near = abs(other.index - index) <= PREFETCH_BANKS
+            for slot in other.slots:
+                if not near and slot not in self.deck.cues:
+                    slot.unload()
+                elif slot.needs_load() and other is bank:
+                    slot.request()
+                elif slot.needs_load():
+                    self.prefetch_slot(slot)
+        self.bank_selector.configure(values=[str(b.index + 1) for b in self.deck.banks])
+        self.bank_selector.set(str(index + 1))
+        self.wake_progress()
+
+    def visible_pads(self):
+        return [pad for pad in self.pads if pad.slot is not None]
+
+    def should_load(self, slot):
+        """Whether `slot` is on the visible (or first staged) bank, one kept loaded next to it, or in the cue list."""
+        if slot.deck not in (self.deck, self.next_deck): return False
+        return abs(slot.bank - slot.deck.bank_index) <= PREFETCH_BANKS or slot in slot.deck.cues
+
+    def change_bank(self, value):
+        self.show_bank(int(value) - 1)
+
+    def step_bank(self, step):
+        if self.deck is None: return
+        index = self.deck.bank_index + step
+        if 0 <= index < len(self.deck.banks):
+            self.show_bank(index)
+
+    def bank_edit_controls(self, visible):
+        for widget in (self.btn_add_bank, self.btn_del_bank):
+            if visible:
+                widget.pack(side="left", padx=2)
+            else:
+                widget.pack_forget()
+        for widget in (self.btn_cue_clear, self.btn_cue_fade):
+            if visible:
+                widget.pack(side="right", padx=2)
+            else:
+                widget.pack_forget()
+
+    def add_bank(self):
+        if self.deck is None: return
+        dialog = ctk.CTkInputDialog(text=self.t("bank_prompt"), title=self.t("new_bank"))
+        value = dialog.get_input()
+        if value is None: return
+        match = re.fullmatch(r"\s*(\d+)\s*[x×*]\s*(\d+)\s*", value) if value.strip() else None
+        rows, cols = (int(match[1]), int(match[2])) if match else (BANK_ROWS, BANK_COLS)
+        bank = self.deck.add_bank(rows, cols)
+        self.engine_slots.update((slot.engine_id, slot) for slot in bank.slots)
+        self.save_current_preset()
+        self.show_bank(bank.index)
+
+    def remove_bank(self):
+        """Drop the last bank (removing one in the middle would renumber the others' pads)."""
+        deck = self.deck
+        if deck is None or len(deck.banks) < 2: return
+        bank = deck.banks[-1]
+        with self.edit_transaction():
+            for slot in bank.slots:
+                if slot.file_path:
+                    slot.clear_slot()
+                del deck.slots[slot.slot_id]
+                self.release_slot(slot)
+            deck.banks.pop()
+            self.save_current_preset()
+        self.show_bank(min(deck.bank_index, len(deck.banks) - 1))
+
+    def prefetch_slot(self, slot):
+        if not self.should_load(slot): return  # Loaded once its bank comes close
+        self.prefetch_queue.append(slot)
+        if not self.prefetch_active:
+            self.prefetch_active = True
+            self.after(PREFETCH_INTERVAL_MS, self.pump_prefetch)
+
+    def pump_prefetch(self):
+        """Load other banks' sounds a couple at a time, behind whatever the visible bank waits for."""
+        while self.prefetch_queue and len(self.engine.pending) < PREFETCH_DEPTH:
+            slot = self.prefetch_queue.popleft()
+            if slot.needs_load() and self.engine_slots.get(slot.engine_id) is slot and self.should_load(slot):
+                slot.request()
+        if self.prefetch_queue:
+            self.after(PREFETCH_INTERVAL_MS, self.pump_prefetch)
+        else:
+            self.prefetch_active = False
+
+    # --- CUE LIST ---
+    def send_cues(self):
+        """Hand the visible preset's cue list to the engine, which plays it."""
+        deck = self.deck
+        if deck is None: return
+        self.engine.cue_list([slot.engine_id for slot in deck.cues], deck.crossfade, deck.follow)
+        self.switch_follow.select() if deck.follow else self.switch_follow.deselect()
+        self.refresh_cue_label()
+
+    def refresh_cue_label(self):
+        cues, index = self.deck.cues if self.deck else [], self.cue_position + 1
+        if not cues:
+            text = self.t("cuelist_empty")
+        elif index < len(cues):
+            name = os.path.splitext(os.path.basename(cues[index].file_path or ""))[0]
+            text = f"{self.t('cuelist_next')} {index + 1}/{len(cues)}: {name}"
+        else:
+            text = f"{self.t('cuelist_next')} —"
+        self.lbl_cue.configure(text=text)
+
+    def cue_go(self):
+        t0 = time.perf_counter()
+        self.engine.cue_go()
+        self.diagnostics.since("cue.go", t0)
+        self.watch_cues()
+
+    def cue_rewind(self):
+        self.engine.cue_seek(0)
+        self.watch_cues()
+
+    def watch_cues(self):
+        """Follow the engine while it runs the cue list: its items start without the window asking."""
+        self.cue_watch_until = time.monotonic() + 1.0
+        if not self.cue_pump_active:
+            self.cue_pump_active = True
+            self.after(CUE_POLL_MS, self.pump_cues)
+
+    def pump_cues(self):
+        self.drain_engine()
+        cues = self.deck.cues if self.deck else []
+        if time.monotonic() < self.cue_watch_until or any(slot in cues for slot, _ in self.voices.items()):
+            self.after(CUE_POLL_MS, self.pump_cues)
+        else:
+            self.cue_pump_active = False
+
+    def toggle_cue(self, slot):
+        cues = self.deck.cues
+        if slot in cues:
+            cues.remove(slot)
+        else:
+            cues.append(slot)
+            if slot.needs_load():
+                slot.request()  # Cue items stay loaded wherever their bank is
+        self.after_cue_edit()
+
+    def clear_cues(self):
+        if self.deck is None: return
+        self.deck.cues = []
+        self.after_cue_edit()
+
+    def ask_crossfade(self):
+        if self.deck is None: return
+        dialog = ctk.CTkInputDialog(text=self.t("cuelist_fade_prompt"), title=self.t("cuelist_fade"))
+        value = dialog.get_input()
+        if value is None: return
+        try:
+            self.deck.crossfade = max(float(value.strip().replace(",", ".") or 0), 0.0)
+        except ValueError:
+            return
+        self.after_cue_edit()
+
+    def toggle_cue_follow(self):
+        if self.deck is None: return  # send_cues sets the switch from the preset once it is on screen
+        self.deck.follow = bool(self.switch_follow.get())
+        self.after_cue_edit()
+
+    def after_cue_edit(self):
+        self.send_cues()
+        for pad in self.visible_pads():
+            pad.refresh_visuals()  # Cue numbers
+        self.save_current_preset()
+
+    # --- VOICE SCHEDULER ---
+    def start_voice(self, slot, channel):
+        previous = self.voices.get(slot)
+        if previous and slot.play_mode == "overlap":
+            self.overlapped.keep((slot, previous.channel.token), previous)  # Still playing under the new one
+        elif previous:
+            self.log_play(slot, previous)  # Retriggered: the engine cut it
+        self.retire_overlapped()
+        self.voices.add(slot, channel, slot.duration, loop=slot.play_mode == "loop")
+        self.schedule_voice_check()
+        self.wake_progress()
+        self.publish("started", slot=slot.slot_id)
+
+    def end_voice(self, slot):
+        voice = self.voices.get(slot)
+        if voice:
+            self.log_play(slot, voice)
+            self.publish("ended", slot=slot.slot_id)
+        self.voices.remove(slot)
+        self.retire_overlapped(cut={slot})  # The engine stops every voice of a pad at once
+        if slot.deck not in (self.deck, self.next_deck):
+            self.release_slot(slot)  # Kept alive by its voice since its preset was switched away
+        if slot.view:
+            slot.view.hide_progress()
+        if self.current_playing_slot == slot:
+            self.current_playing_slot = None
+            self.wake_progress()
+
+    def log_play(self, slot, voice, stopped=None, cut=False):
+        """
+        As-run entry for a voice that is over; it counts as interrupted if it
+        stopped well before its end. A loop stopped by the operator ended
+        normally, one `cut` by the engine going down did not.
+        """
+        now = time.monotonic()
+        stopped = stopped or voice.paused_at or now
+        interrupted = (cut or not voice.loop) and voice.duration > 0 and stopped < voice.end - ASRUN_END_TOLERANCE
+        offset = time.time() - now  # Monotonic to wall clock
+        self.asrun.record(voice.start + offset, stopped + offset, slot.deck.name, slot.slot_id, slot.file_path,
+                          interrupted, round(slot.volume(), 3))
+
+    def retire_overlapped(self, cut=(), everything=False):
+        """Log the overlapped voices that have played out, and those just stopped with their pad in `cut`."""
+        now = time.monotonic()
+        for key, voice in list(self.overlapped.items()):
+            slot = key[0]
+            if voice.paused_at is None and voice.end <= now:
+                self.log_play(slot, voice, stopped=voice.end)
+            elif everything or slot in cut:
+                self.log_play(slot, voice)
+            else:
+                continue
+            self.overlapped.remove(key)
+
+    def schedule_voice_check(self):
+        """Sleep until the next voice is due to end instead of polling every pad."""
+        if self.voice_check_id:
+            self.after_cancel(self.voice_check_id)
+            self.voice_check_id = None
+        deadline = self.voices.next_deadline()
+        if deadline is None: return
+        delay = max(int((deadline - time.monotonic()) * 1000), FRAME_MS)
+        self.voice_check_id = self.after(delay, self.check_voices)
+
+    def check_voices(self):
+        self.voice_check_id = None
+        self.drain_engine()
+        for slot in self.voices.pop_finished():
+            slot.on_playback_finished()
+        self.retire_overlapped()
+        self.schedule_voice_check()
+
+    def adopt_voices(self, state):
+        """Show the voices an engine was already playing when this UI connected."""
+        for engine_id, (token, start, duration, paused_at, loop) in state["voices"].items():
+            slot = self.engine_slots.get(engine_id)
+            if not slot or not slot.file_path: continue
+            slot.channel = self.engine.adopt(engine_id, token)
+            voice = self.voices.add(slot, slot.channel, duration, loop=loop)
+            voice.start, voice.end, voice.paused_at = start, voice.end - voice.start + start, paused_at
+            slot.refresh()
+            self.current_playing_slot = slot
+        if state["paused"]:
+            self.is_paused = True
+            self.btn_pause.configure(text=self.t("btn_resume"))
+        self.schedule_voice_check()
+        self.wake_progress()
+
+    # --- AUDIO ENGINE EVENTS ---
+    def drain_engine(self):
+        """Apply what the audio engine reported: finished loads, voice starts and ends."""
+        for kind, *args in self.engine.drain():
+            if kind == "state":
+                self.adopt_voices(args[0])
+                continue
+            if kind == "cue":
+                self.cue_position = args[0]
+                self.refresh_cue_label()
+                continue
+            # Loads go to whoever holds the id now; voices to whoever is playing it
+            slot = self.engine_slots.get(args[0]) if kind in ("loaded", "failed", "cued") else self.voice_slot(args[0])
+            if not slot: continue
+            if kind in ("loaded", "failed"):
+                _, path, cue, result = args
+                if slot.file_path != path: continue
+                if kind == "failed":
+                    slot.on_load_failed(result)
+                else:
+                    slot.on_sound_loaded(result, cue)
+            elif kind in ("started", "cued"):
+                if kind == "cued":  # Started by the engine's cue list
+                    if not slot.sound: continue
+                    slot.show_started(args[1])
+                # Align on the engine's clock (same monotonic clock, other process)
+                start = args[-1]
+                voice = self.voices.get(slot)
+                if voice and voice.paused_at is None:
+                    voice.end += start - voice.start
+                    voice.start = start
+            elif kind == "ended":
+                slot.on_playback_finished()
+        if self.engine.lost and not self.engine.closed:
+            self.recover_engine()
+
+    def watch_engine(self):
+        """Notice an engine that died while nothing was loading or playing, before the next pad press."""
+        self.drain_engine()
+        self.after(ENGINE_WATCH_MS, self.watch_engine)
+
+    def recover_engine(self):
+        """
+        The engine died (crashed, killed, connection lost) and every sound
+        and voice went with it. Log what was on air as cut, start another
+        one the way startup does, and load again what the decks need. An
+        engine that keeps dying is replaced by one on a thread of the window.
+        """
+        now = time.monotonic()
+        self.engine_deaths = [t for t in self.engine_deaths if now - t < 60] + [now]
+        process = len(self.engine_deaths) < ENGINE_MAX_RESPAWNS
+        print(f"Audio engine lost: starting {'another' if process else 'one inside the window'}")
+        self.stop_all(cut=True)
+        self.engine = EngineClient.start_in_background(process)
+        if self.remote:
+            self.remote.engine = self.engine
+        for slot in self.engine_slots.values():
+            slot.sound = slot.loaded_cue = slot.channel = None
+            slot.refresh()
+        for slot in self.engine_slots.values():
+            if not (slot.needs_load() and self.should_load(slot)): continue
+            if slot.bank == slot.deck.bank_index:
+                slot.request()
+            else:
+                self.prefetch_slot(slot)
+        self.send_cues()
+        self.predict_presets()
+        self.lbl_status.configure(text=self.t("status_engine_lost"), text_color="#E04040")
+
+    def voice_slot(self, engine_id):
+        """The slot on air with `engine_id`, possibly from a preset switched away since."""
+        return next((slot for slot, _ in self.voices.items() if slot.engine_id == engine_id), None)
+
+    # --- BACKGROUND LOADING ---
+    def request_sound(self, slot, path, stream=None, cue=None):
+        self.engine.load(slot.engine_id, path, stream, cue)
+        self.start_loader_pump()
+
+    def start_loader_pump(self):
+        if not self.loader_pump_active:
+            self.loader_pump_active = True
+            self.after(20, self.pump_loader)
+
+    def pump_loader(self):
+        """Hand loaded sounds to their slots while loads are pending."""
+        self.drain_engine()
+
+        # Waveforms computed in the background
+        for path, peaks in self.waveforms.drain():
+            key = path_key(path)
+            for slot in self.engine_slots.values():
+                if slot.file_path and slot.sound and path_key(slot.file_path) == key:
+                    slot.set_peaks(peaks)
+                    if slot is self.player_bar_slot:
+                        self.player_bar_slot = None  # Picked up by the next progress refresh
+                        self.wake_progress()
+
+        # Loudness and silence analysis: adjust every slot holding that file
+        for path, result in self.analyzer.drain():
+            key = path_key(path)
+            for slot in self.engine_slots.values():
+                if slot.file_path and slot.sound and path_key(slot.file_path) == key:
+                    slot.gain = normalization_gain(result)
+                    slot.apply_volume()
+                    slot.auto_cue = cue_points(result)
+                    slot.reload_cue()
+
+        if self.engine.is_busy() or self.waveforms.is_busy() or self.analyzer.is_busy():
+            self.after(20, self.pump_loader)
+        else:
+            self.loader_pump_active = False
+
+    def request_analysis(self, path):
+        """Cached loudness analysis for `path`, or None while it runs in the background."""
+        result = self.analyzer.request(path)
+        if result is None and self.analyzer.is_busy():
+            self.start_loader_pump()
+        return result
+
+    def request_waveform(self, path):
+        """Cached peaks for `path`, or None while they are computed in the background."""
+        peaks = self.waveforms.request(path)
+        if peaks is None and self.waveforms.is_busy():
+            self.start_loader_pump()
+        return peaks
 
     def set_volume(self, val):
         self.global_volume = float(val)
-        for btn in self.buttons_map.values():
-            if btn.sound: 
-                btn.sound.set_volume(self.global_volume)
+        for slot in self.engine_slots.values():
+            slot.apply_volume()
+        self.publish("volume", value=self.global_volume)
 
-    def stop_all(self):
-        pygame.mixer.stop()
-        self.current_playing_btn = None
-        for btn in self.buttons_map.values():
-            if btn.file_path: 
-                btn.configure(fg_color=btn.col_loaded)
+    def toggle_normalize(self):
+        self.normalize = bool(self.switch_norm.get())
+        for slot in self.engine_slots.values():
+            slot.apply_volume()
+
+    def stop_all(self, cut=False):
+        """Silence everything; `cut` when the engine already went down with the voices."""
+        self.engine.stop_all()
+        self.retire_overlapped(everything=True)
+        for slot, voice in self.voices.items():
+            self.log_play(slot, voice, cut=cut)
+            if slot.view:
+                slot.view.hide_progress()
+        self.voices.clear()
+        self.schedule_voice_check()
+        if self.is_paused:
+            self.is_paused = False
+            self.btn_pause.configure(text=self.t("btn_pause"))
+        self.wake_progress()
+        self.current_playing_slot = None
+        for pad in self.visible_pads():
+            if pad.slot.file_path:
+                pad.refresh_visuals()
+        for slot in [s for s in self.engine_slots.values() if s.deck not in (self.deck, self.next_deck)]:
+            self.release_slot(slot)
+        self.publish("stopped_all")
 
     def pause_all(self):
-        if pygame.mixer.get_busy():
-            pygame.mixer.pause()
+        if not self.is_paused and len(self.voices):
+            self.is_paused = True
+            self.engine.pause()
+            self.voices.pause()
+            self.overlapped.pause()
             self.btn_pause.configure(text=self.t("btn_resume"))
         else:
-            pygame.mixer.unpause()
+            self.is_paused = False
+            self.engine.resume()
+            self.voices.resume()
+            self.overlapped.resume()
             self.btn_pause.configure(text=self.t("btn_pause"))
+        self.schedule_voice_check()
+        self.wake_progress()
+        self.publish("paused", value=self.is_paused)
+
+    # --- REMOTE CONTROL ---
+    def toggle_remote(self):
+        if self.switch_remote.get():
+            remote = RemoteControl(self.engine, self.remote_state())
+            try:
+                remote.start()
+            except OSError as e:
+                print(f"Remote control unavailable: {e}")
+                self.switch_remote.deselect()
+                return
+            if remote.token:
+                print(f"Remote control open to the network: clients need the token from {REMOTE_TOKEN_FILE} or OPPODCAST_REMOTE_TOKEN")
+            self.remote = remote
+            self.pump_remote()
+        elif self.remote:
+            self.remote.stop()
+            self.remote = None
 
-    def save_notes(self, event=None):
-        with open(NOTES_FILE, "w", encoding="utf-8") as f: 
-            f.write(self.txt_notes.get("0.0", "end"))
+    def remote_state(self):
+        return {
+            "playing": sorted(slot.slot_id for slot, _ in self.voices.items()),
+            "paused": self.is_paused,
+            "volume": self.global_volume,
+            "preset": getattr(self, "current_preset_name", None),
+        }
+
+    def publish(self, event, **fields):
+        if self.remote:
+            self.remote.publish(event, **fields)
+
+    def pump_remote(self):
+        """Catch the window up on what remote clients already did to the engine."""
+        if not self.remote: return
+        for kind, *args in self.remote.drain():
+            if kind in ("started", "stopped"):
+                slot = self.engine_slots.get(args[0]) if kind == "started" else self.voice_slot(args[0])
+                if not slot or not slot.sound: continue
+                if kind == "started":
+                    slot.show_started(args[1])
+                elif slot in self.voices:
+                    slot.show_stopped()
+            elif kind == "stop_all":
+                self.stop_all()
+            elif kind == "paused":
+                if args[0] != self.is_paused:
+                    self.pause_all()
+                else:
+                    self.publish("paused", value=self.is_paused)  # Nothing to pause: undo the remote's guess
+            elif kind == "volume":
+                self.slider.set(args[0])
+                self.set_volume(args[0])
+            elif kind == "preset":
+                if args[0] in self.palette_selector.cget("values"):
+                    self.change_preset(args[0])
+            elif kind == "go":
+                self.watch_cues()  # Started by the engine: the window follows from its events
+        self.after(REMOTE_POLL_MS, self.pump_remote)
+
+    def load_notes(self):
+        """Fill the Notes tab. Typing (and so saving) only starts once the file is in."""
+        self.txt_notes.configure(state="normal")
+        if os.path.exists(NOTES_FILE):
+            with open(NOTES_FILE, "r", encoding="utf-8") as f:
+                self.txt_notes.insert("0.0", f.read())
+        self.txt_notes.bind("<KeyRelease>", self.schedule_notes_save)
+
+    def schedule_notes_save(self, event=None):
+        """Debounce keystrokes: only save once typing pauses."""
+        if self.notes_save_id:
+            self.after_cancel(self.notes_save_id)
+        self.notes_save_id = self.after(NOTES_DEBOUNCE_MS, self.save_notes)
+
+    @traced("save_notes")
+    def save_notes(self):
+        self.notes_save_id = None
+        self.notes_writer.submit(self.txt_notes.get("0.0", "end-1c"))
 
     # --- PRESET MANAGEMENT (ROBUST) ---
     def refresh_presets_list(self):
@@ -582,70 +4874,307 @@ class OppodcastDesktop(ctk.CTk):
         if not presets: presets = ["Default"]
         self.palette_selector.configure(values=presets)
 
+    @traced("load_preset")
     def load_preset(self, name):
-        self.is_loading_preset = True
-        self.current_preset_name = name
+        """Switch to `name` at once, e.g. on startup; its first bank keeps loading on screen."""
+        self.flush_preset_save()
+        self.commit_deck(self.prepare_deck(name))
+
+    def change_preset(self, val):
+        """Switch on air: prepare `val` behind the current grid and swap once its first bank is loaded."""
+        self.flush_preset_save()
+        self.prepare_deck(val)
+        self.lbl_status.configure(text=self.t("status_preparing"))
+        if self.switch_started is None:
+            self.after(PRESET_SWITCH_POLL_MS, self.pump_switch)
+        self.switch_started = time.monotonic()
+
+    def pump_switch(self):
+        deck = self.next_deck
+        if deck is None:
+            self.switch_started = None
+            return
+        if deck.is_ready() or time.monotonic() - self.switch_started > PRESET_SWITCH_TIMEOUT_MS / 1000:
+            self.switch_started = None
+            self.flush_preset_save()  # Edits made to the old grid meanwhile
+            self.commit_deck(deck)
+        else:
+            self.after(PRESET_SWITCH_POLL_MS, self.pump_switch)
+
+    def read_preset(self, name):
+        """([(rows, cols, {label: entry})], cue list) stored for `name`; (None, None) for an empty grid."""
         path = os.path.join(CONFIG_DIR, f"{name}.json")
-        
-        # Clear grid first
-        for btn in self.buttons_map.values(): 
-            btn.clear_slot()
-        
+        layout = cues = None
         if os.path.exists(path):
             try:
                 with open(path, "r") as f:
                     content = f.read().strip()
                     if content:
                         data = json.loads(content)
-                        for slot, filepath in data.items():
-                            if slot in self.buttons_map: 
-                                self.buttons_map[slot].load_sound(filepath)
+                        # Presets from before banks are a single bank of slots
+                        banks = data["banks"] if "banks" in data else [{"slots": data}]
+                        layout = [(int(b.get("rows", BANK_ROWS)), int(b.get("cols", BANK_COLS)), dict(b.get("slots") or {}))
+                                  for b in banks]
+                        cues = data.get("cues") if "banks" in data else None
             except json.JSONDecodeError:
                 print(f"Warning: Preset '{name}' is corrupted or empty. Loading empty grid.")
             except Exception as e:
                 print(f"Read error: {e}")
+        return layout, cues
 
-        self.palette_selector.set(name)
-        for btn in self.buttons_map.values(): 
-            btn.update_edit_visuals()
-        
+    def prepare_deck(self, name, empty=False):
+        """Build `name`'s grid off screen and start loading it. Replaces any deck already staged."""
+        self.discard_next_deck()
+        layout, cues = (None, None) if empty else self.read_preset(name)
+        layout = layout or [(BANK_ROWS, BANK_COLS, {})]
+        deck = self.next_deck = Deck(self, name)
+        for rows, cols, _ in layout:
+            deck.add_bank(rows, cols)
+        if cues:
+            deck.cues = [deck.slots[s] for s in cues.get("items", []) if s in deck.slots]
+            deck.crossfade = float(cues.get("crossfade", 0.0))
+            deck.follow = bool(cues.get("follow", True))
+        self.is_loading_preset = True
+        for bank, (_, _, entries) in zip(deck.banks, layout):
+            for slot in bank.slots:
+                previous = self.engine_slots.get(slot.engine_id)
+                self.engine_slots[slot.engine_id] = slot
+                if slot.label in entries:
+                    # Only the first bank decodes now; the others follow in the background
+                    slot.apply_preset_entry(entries[slot.label], defer=bank.index != deck.bank_index, previous=previous)
         self.is_loading_preset = False
+        return deck
+
+    def discard_next_deck(self):
+        deck, self.next_deck = self.next_deck, None
+        if deck is None: return
+        for slot in deck.slots.values():
+            self.release_slot(slot)
+
+    def commit_deck(self, deck):
+        """Put a prepared deck on screen. Voices of the old one play on and stay tracked."""
+        old, self.deck, self.next_deck = self.deck, deck, None
+        self.current_preset_name = deck.name
+        if old is not None and old.name != deck.name:
+            self.record_switch(old.name, deck.name)
+        for slot in [s for s, _ in self.voices.items() if s.deck is not deck]:
+            heir = deck.slots.get(slot.slot_id)
+            if heir is not None and heir.engine_id == slot.engine_id and heir.file_path == slot.file_path:
+                # Back on the preset it was started from: the new pad takes the voice over
+                self.voices.swap(slot, heir)
+                heir.channel = slot.channel
+                if self.current_playing_slot is slot:
+                    self.current_playing_slot = heir
+        if old is not None:
+            for slot in old.slots.values():
+                self.release_slot(slot)
+        self.show_bank(deck.bank_index)
+        self.send_cues()
+        self.palette_selector.set(deck.name)
+        self.lbl_status.configure(text=self.t("status_edit" if self.is_edit_mode else "status_live"))
+        self.wake_progress()
+        self.publish("preset", value=deck.name)
+        self.predict_presets()
+
+    def export_asrun(self):
+        """Save what went to air in a time range as CSV or JSON."""
+        dialog = ctk.CTkInputDialog(text=self.t("asrun_prompt"), title=self.t("asrun"))
+        value = dialog.get_input()
+        if value is None: return
+        span = parse_time_range(value)
+        if span is None: return
+        path = filedialog.asksaveasfilename(defaultextension=".csv", initialfile="asrun.csv",
+                                            filetypes=[("CSV", "*.csv"), ("JSON", "*.json")])
+        if not path: return
+        try:
+            self.asrun.export(path, *span)
+        except OSError as e:
+            print(f"As-run export error: {e}")
+
+    # --- PREDICTIVE PREFETCH ---
+    def read_rundown(self):
+        try:
+            with open(RUNDOWN_FILE, "r", encoding="utf-8") as f:
+                return [line.strip() for line in f if line.strip()]
+        except OSError:
+            return []
+
+    def read_history(self):
+        try:
+            with open(HISTORY_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def edit_rundown(self):
+        dialog = ctk.CTkInputDialog(text=self.t("rundown_prompt"), title=self.t("rundown"))
+        value = dialog.get_input()
+        if value is None: return
+        self.rundown = [name.strip() for name in value.split(",") if name.strip()]
+        self.rundown_pos = 0
+        try:
+            atomic_write_text(RUNDOWN_FILE, "".join(f"{name}\n" for name in self.rundown))
+        except OSError as e:
+            print(f"Rundown save error: {e}")
+        self.predict_presets()
+
+    def record_switch(self, old, new):
+        successors = self.preset_history.setdefault(old, {})
+        successors[new] = successors.get(new, 0) + 1
+        try:
+            atomic_write_text(HISTORY_FILE, json.dumps(self.preset_history))
+        except OSError as e:
+            print(f"History save error: {e}")
+
+    def predict_presets(self):
+        """
+        Have the engine decode ahead the presets most likely to follow this
+        one: the next in the rundown, then the most frequent switches so far.
+        """
+        if self.deck is None: return  # Runs again once the first preset is on screen
+        name = self.current_preset_name
+        if name in self.rundown[self.rundown_pos:]:  # A preset can come back later in the show
+            self.rundown_pos = self.rundown.index(name, self.rundown_pos)
+        elif name in self.rundown:
+            self.rundown_pos = self.rundown.index(name)
+        candidates = self.rundown[self.rundown_pos + 1:self.rundown_pos + 2] if name in self.rundown else []
+        history = self.preset_history.get(name, {})
+        candidates += sorted(history, key=history.get, reverse=True)
+        available = self.palette_selector.cget("values")
+        predicted = []
+        for candidate in candidates:
+            if candidate != name and candidate in available and candidate not in predicted:
+                predicted.append(candidate)
+        predicted = predicted[:PREDICT_PRESETS]
+        if predicted == self.predicted: return
+        self.predicted = predicted
 
+        # First banks first (what a switch waits for), then their neighbours
+        layouts = [self.read_preset(preset)[0] or [] for preset in predicted]
+        items = []
+        for index in range(PREFETCH_BANKS + 1):
+            for layout in layouts:
+                if index >= len(layout): continue
+                for entry in layout[index][2].values():
+                    stream, cue = None, None
+                    if isinstance(entry, dict):
+                        stream, cue = entry.get("stream"), tuple(entry["cue"]) if entry.get("cue") else None
+                        entry = entry.get("path")
+                    if entry:
+                        items.append((entry, stream, merge_cues(cue, cue_points(self.analyzer.cached(entry)))))
+        self.engine.warm(items)
+
+    def release_slot(self, slot):
+        """Give up a slot's engine id once it is off screen and off air."""
+        if slot in self.voices or self.engine_slots.get(slot.engine_id) is not slot: return
+        heir = next((d.slots.get(slot.slot_id) for d in (self.deck, self.next_deck)
+                     if d is not None and d is not slot.deck and d.name == slot.deck.name), None)
+        if heir is not None:
+            self.engine_slots[slot.engine_id] = heir  # Same preset staged again; shared sounds stay
+            if heir.sound is slot.sound: return
+        else:
+            del self.engine_slots[slot.engine_id]
+        self.engine.unload(slot.engine_id)
+        if heir is not None and heir.sound is not None:
+            heir.sound = heir.loaded_cue = None  # It was replaced under the shared id: load it again
+            heir.refresh()
+            if self.should_load(heir):
+                heir.request()
+
+    @contextmanager
+    def edit_transaction(self):
+        """Group slot edits so they end in a single preset write."""
+        self.edit_depth += 1
+        try:
+            yield
+        finally:
+            self.edit_depth -= 1
+            if self.edit_depth == 0 and self.preset_dirty:
+                self.schedule_preset_save()
+
+    def swap_slots(self, a, b):
+        """Exchange two slots in memory: sounds, options and voices on air move along."""
+        with self.edit_transaction():
+            state_a, state_b = a.export_slot(), b.export_slot()
+            self.engine.swap(a.engine_id, b.engine_id)
+            self.voices.swap(a, b)
+            if self.current_playing_slot in (a, b):
+                self.current_playing_slot = b if self.current_playing_slot == a else a
+            a.import_slot(state_b)
+            b.import_slot(state_a)
+            cues = self.deck.cues
+            if a in cues or b in cues:  # The cue list follows the sounds
+                self.deck.cues = [b if s is a else a if s is b else s for s in cues]
+                self.send_cues()
+        self.wake_progress()
+        self.publish("swapped", slots=[a.slot_id, b.slot_id])
+
+    @traced("save_current_preset")
     def save_current_preset(self):
+        """Mark the preset as changed. The write itself is coalesced."""
         if self.is_loading_preset: return
         if not hasattr(self, 'current_preset_name'): return
-        
-        data = {s: b.file_path for s, b in self.buttons_map.items() if b.file_path}
+        self.preset_dirty = True
+        if self.edit_depth == 0:
+            self.schedule_preset_save()
+
+    def schedule_preset_save(self):
+        if self.preset_save_id:
+            self.after_cancel(self.preset_save_id)
+        self.preset_save_id = self.after(PRESET_SAVE_DELAY_MS, self.write_preset)
+
+    def flush_preset_save(self):
+        """Write now if a save is pending, e.g. before switching presets."""
+        if self.preset_save_id:
+            self.after_cancel(self.preset_save_id)
+            self.write_preset()
+
+    def cancel_preset_save(self):
+        if self.preset_save_id:
+            self.after_cancel(self.preset_save_id)
+            self.preset_save_id = None
+        self.preset_dirty = False
+
+    @traced("write_preset")
+    def write_preset(self):
+        self.preset_save_id = None
+        self.preset_dirty = False
+        banks = [bank.layout() for bank in self.deck.banks]
+        cues = self.deck.cue_layout()
+        if len(banks) == 1 and (banks[0]["rows"], banks[0]["cols"]) == (BANK_ROWS, BANK_COLS) and not cues:
+            data = banks[0]["slots"]  # Same file as before banks existed
+        else:
+            data = {"banks": banks}
+            if cues: data["cues"] = cues
         path = os.path.join(CONFIG_DIR, f"{self.current_preset_name}.json")
-        
-        with open(path, "w") as f: 
-            json.dump(data, f, indent=4)
+        try:
+            atomic_write_text(path, json.dumps(data, indent=4))
+        except OSError as e:
+            print(f"Preset save error: {e}")
 
     def create_preset(self):
         dialog = ctk.CTkInputDialog(text=self.t("name_prompt"), title=self.t("new_preset"))
         name = dialog.get_input()
         if name:
             safe = "".join(c for c in name if c.isalnum()).strip()
-            self.current_preset_name = safe
-            self.is_loading_preset = True 
-            for btn in self.buttons_map.values(): 
-                btn.clear_slot()
-            self.is_loading_preset = False 
-            self.save_current_preset()
+            self.flush_preset_save()
+            self.commit_deck(self.prepare_deck(safe, empty=True))
+            self.write_preset()  # Right away, so the list below picks it up
             self.refresh_presets_list()
             self.palette_selector.set(safe)
 
     def delete_preset(self):
         curr = self.palette_selector.get()
         if curr != "Default":
+            self.cancel_preset_save()
             os.remove(os.path.join(CONFIG_DIR, f"{curr}.json"))
             self.refresh_presets_list()
             self.load_preset("Default")
-    
-    def change_preset(self, val):
-        self.load_preset(val)
 
 
 if __name__ == "__main__":
-    app = OppodcastDesktop()
-    app.mainloop()
+    if "--engine" in sys.argv:
+        serve_engine()
+    else:
+        app = OppodcastDesktop()
+        app.mainloop()
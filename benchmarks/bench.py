@@ -0,0 +1,516 @@
+"""
+Headless benchmarks for the hot paths of Oppodcast Studio.
+
+    python benchmarks/bench.py                      # full run, JSON on stdout
+    python benchmarks/bench.py --quick -o run.json  # fewer repeats, written to a file
+    python benchmarks/bench.py --compare run.json   # exit 1 if a median got slower
+
+Audio runs on SDL's dummy driver, so no sound card is needed. The engine and
+persistence benchmarks use the app's classes directly; the UI benchmarks
+(cold start, presets, swap, volume, triggers, library view, notes) need a
+display and start a private Xvfb when there is none but Xvfb is installed.
+Otherwise they are listed under "skipped".
+
+Everything runs inside a temporary directory with generated fixture audio,
+so the real presets, library and caches are never touched.
+"""
+import os
+import sys
+import json
+import math
+import time
+import wave
+import shutil
+import socket
+import struct
+import random
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+# Keep the app's engine on a thread: its process listens on a fixed port and
+# could pick up (or be) the engine of a studio running on this machine. The
+# process path is timed separately, on a port of its own.
+os.environ.setdefault("OPPODCAST_ENGINE", "thread")
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SLOTS = 30
+BANKS = 10
+LIBRARY_SIZE = 5000
+NOTES_SIZE = 2 * 1024 * 1024  # Characters in the "large script" notes benchmarks
+ASRUN_PLAYS = 17280  # One play every 5 s for a day
+FIXTURE_SECONDS = (2, 30, 240)  # Jingle, song, bed (the bed is streamed from disk)
+
+
+# --- FIXTURES ---
+def write_wav(path, seconds, rate=44100, channels=2):
+    """Tone bursts with silent gaps, so analysis and trimming have real work."""
+    # 440 Hz fits a whole number of cycles in a second, so one second repeats exactly
+    second = []
+    for i in range(rate):
+        value = int(9000 * math.sin(2 * math.pi * 440 * i / rate)) if i < rate * 0.8 else 0
+        second.extend([value] * channels)
+    block = struct.pack(f"<{len(second)}h", *second)
+    frames = int(seconds * rate)
+    with wave.open(path, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        for start in range(0, frames, rate):
+            n = min(rate, frames - start)
+            w.writeframes(block[:n * channels * 2])
+
+
+def make_fixtures(root):
+    """Generated WAVs in several rates/layouts/lengths, plus pygame's own OGG/MP3 samples if installed."""
+    fixtures = {}
+    for seconds in FIXTURE_SECONDS:
+        for rate, channels in ((44100, 2), (48000, 1)):
+            name = f"tone_{seconds}s_{rate // 1000}k_{channels}ch.wav"
+            path = os.path.join(root, name)
+            write_wav(path, seconds, rate, channels)
+            fixtures[name] = path
+
+    import pygame
+    examples = os.path.join(os.path.dirname(pygame.__file__), "examples", "data")
+    for name in ("house_lo.ogg", "house_lo.mp3"):
+        if os.path.exists(os.path.join(examples, name)):
+            fixtures[name] = shutil.copy(os.path.join(examples, name), root)
+    return fixtures
+
+
+# --- MEASUREMENT ---
+class Results:
+    def __init__(self, repeat):
+        self.repeat = repeat
+        self.results = {}
+        self.skipped = {}
+
+    def add(self, name, samples_ms, **extra):
+        samples_ms = sorted(samples_ms)
+        self.results[name] = {
+            "unit": "ms",
+            "runs": len(samples_ms),
+            "min": samples_ms[0],
+            "median": statistics.median(samples_ms),
+            "mean": statistics.fmean(samples_ms),
+            "p95": samples_ms[min(int(len(samples_ms) * 0.95), len(samples_ms) - 1)],
+            **extra,
+        }
+        print(f"  {name:40} {self.results[name]['median']:10.3f} ms", file=sys.stderr)
+
+    def time(self, name, func, setup=None, repeat=None, **extra):
+        """Median-friendly timing: `setup` runs untimed before every call."""
+        samples = []
+        for _ in range(repeat or self.repeat):
+            state = setup() if setup else None
+            t0 = time.perf_counter()
+            func(state) if setup else func()
+            samples.append((time.perf_counter() - t0) * 1000)
+        self.add(name, samples, **extra)
+
+    def skip(self, name, reason):
+        self.skipped[name] = reason
+        print(f"  {name:40} skipped: {reason}", file=sys.stderr)
+
+
+# --- ENGINE & PERSISTENCE (no display needed) ---
+def bench_core(app_module, fixtures, workdir, res):
+    O = app_module
+    import pygame
+    O.init_mixer()
+
+    short = [p for n, p in fixtures.items() if n.startswith("tone_2s") or n.startswith("tone_30s")]
+
+    for name, path in fixtures.items():
+        res.time(f"probe[{name}]", lambda: O.probe_audio(path))
+
+    # Decoding: straight from the file vs. the mmap'd PCM cache
+    pcm = O.PcmCache(os.path.join(workdir, "pcm"))
+    for path in short:
+        name = os.path.basename(path)
+        res.time(f"decode.file[{name}]", lambda: pygame.mixer.Sound(path), repeat=max(res.repeat // 4, 3))
+        pcm.decode(path)
+        res.time(f"decode.pcm_cache[{name}]", lambda: pcm.decode(path))
+
+    cache = O.SoundCache(decode=pcm.decode)
+    cache.get(short[0])
+    res.time("sound_cache.hit", lambda: cache.get(short[0]))
+    res.time("sound_cache.trim", lambda c: cache.get(short[0], c),
+             setup=lambda: (random.uniform(0, 0.5), None))
+
+    # Background loading of a full grid (PCM cache warm, sound cache cold)
+    def load_grid(loader):
+        for i in range(SLOTS):
+            loader.submit(f"S{i}", short[i % len(short)], stream=False)
+        done = 0
+        while done < SLOTS:
+            done += len(loader.drain(limit=SLOTS))
+            time.sleep(0.0005)
+        loader.shutdown()
+
+    def fresh_loader():
+        return O.AudioLoader(O.SoundCache(decode=pcm.decode))
+    res.time(f"loader.grid_{SLOTS}", load_grid, setup=fresh_loader, repeat=max(res.repeat // 4, 3))
+
+    # The same grid once the warmer has decoded it ahead, as for a predicted preset
+    def warmed_loader():
+        cache = O.SoundCache(decode=pcm.decode)
+        warmer = O.SoundWarmer(cache, lambda: True)
+        warmer.warm([(short[i % len(short)], False, None) for i in range(SLOTS)])
+        while warmer.is_busy():
+            time.sleep(0.001)
+        warmer.close()
+        return O.AudioLoader(cache)
+    res.time(f"loader.grid_{SLOTS}_predicted", load_grid, setup=warmed_loader, repeat=max(res.repeat // 4, 3))
+
+    # Trigger to play on the dummy device
+    sound = cache.get(short[0])
+
+    def trigger():
+        channel = pygame.mixer.find_channel()
+        channel.play(sound)
+    # Stop everything between runs so a free channel is always there, as on a quiet grid
+    res.time("trigger.find_channel_play", lambda _: trigger(), setup=pygame.mixer.stop, repeat=res.repeat * 10)
+    pygame.mixer.stop()
+
+    # Trigger through the engine protocol: command out, "started" event back
+    client = O.EngineClient.in_thread()
+    client.load("A1", short[0], False)
+    while not any(e[0] == "loaded" for e in client.drain()):
+        time.sleep(0.001)
+
+    def engine_trigger():
+        channel = client.play("A1")
+        while client.conn.poll(1):
+            if client.conn.recv()[0] == "started": break
+        channel.stop()
+    res.time("engine.play_roundtrip", engine_trigger, repeat=res.repeat * 5)
+    bench_engine_process(O, short[0], workdir, res)
+
+    # A burst of overlapping effects past the channel pool: it grows, then steals, never drops
+    client.set_mode("A1", "overlap")
+
+    def overlap_burst():
+        for _ in range(O.MAX_MIXER_CHANNELS + 32):
+            client.play("A1")
+        started = 0
+        while started < O.MAX_MIXER_CHANNELS + 32 and client.conn.poll(1):
+            started += client.conn.recv()[0] == "started"
+        client.stop("A1")
+    res.time(f"engine.overlap_burst_{O.MAX_MIXER_CHANNELS + 32}", overlap_burst, repeat=max(res.repeat // 4, 3))
+    client.set_mode("A1", None)
+
+    # Cue list GO: command out, "cued" event back, the item on air cut
+    client.cue_list(["A1"], 0.0, False)
+
+    def cue_go():
+        client.cue_seek(0)
+        client.cue_go()
+        while client.conn.poll(1):
+            if client.conn.recv()[0] == "cued": break
+    res.time("engine.cue_go_roundtrip", cue_go, repeat=res.repeat * 5)
+    client.stop("A1")
+    client.close()
+
+    # Voice scheduler bookkeeping for a busy grid
+    def voices_tick():
+        tracker = O.VoiceTracker()
+        for i in range(SLOTS):
+            tracker.add(i, pygame.mixer.Channel(i), 10.0)
+        tracker.next_deadline()
+        tracker.pop_finished()
+    res.time(f"voices.tick_{SLOTS}", voices_tick)
+
+    # Library index
+    db_path = os.path.join(workdir, "bench_library.db")
+    paths = [os.path.join(workdir, "lib", f"folder{i % 50}", f"jingle_{i:05d}.wav") for i in range(LIBRARY_SIZE)]
+
+    def fill(index):
+        index.add(paths)
+        index.close()
+
+    def fresh_index():
+        if os.path.exists(db_path): os.remove(db_path)
+        return O.LibraryIndex(db_path)
+    res.time(f"library.add_{LIBRARY_SIZE}", fill, setup=fresh_index, repeat=max(res.repeat // 4, 3))
+
+    index = O.LibraryIndex(db_path)
+    res.time("library.count_search", lambda: index.count("jingle_04"))
+    res.time("library.page", lambda o: index.page("", o, 20), setup=lambda: random.randrange(LIBRARY_SIZE - 20))
+    res.time("library.page_search", lambda: index.page("folder3", 0, 20))
+    index.close()
+
+    # Persistence
+    notes = ("INTRO - welcome back to the show\n" * (NOTES_SIZE // 32))[:NOTES_SIZE]
+    notes_path = os.path.join(workdir, "bench_notes.txt")
+    res.time("notes.atomic_write_2mb", lambda: O.atomic_write_text(notes_path, notes))
+
+    def notes_burst():
+        writer = O.NotesWriter(notes_path, os.path.join(workdir, "bench_backups"))
+        t0 = time.perf_counter()
+        for _ in range(20):  # A burst of keystrokes reaching the writer
+            writer.submit(notes)
+        submit_ms = (time.perf_counter() - t0) * 1000
+        writer.close()
+        return submit_ms
+    res.add("notes.submit_burst_20", [notes_burst() for _ in range(max(res.repeat // 4, 3))])
+
+    preset = {f"{chr(65 + i // 6)}{i % 6 + 1}": {"path": short[i % len(short)], "cue": [0.1, None]} for i in range(SLOTS)}
+    preset_path = os.path.join(workdir, "bench_preset.json")
+    res.time(f"preset.write_{SLOTS}", lambda: O.atomic_write_text(preset_path, json.dumps(preset, indent=4)))
+
+    # As-run log: recording is on the trigger path, the writer and exports are not
+    asrun = O.AsRunLog(os.path.join(workdir, "asrun", "asrun.jsonl"), max_bytes=1024 * 1024)
+    day = time.time() - 86400
+    res.time("asrun.record", lambda: asrun.record(day, day + 30, "Show", "A1", short[0], False, 0.8), repeat=res.repeat * 10)
+    for i in range(ASRUN_PLAYS):  # A busy day of plays, spread over rotated files
+        asrun.record(day + i * 5, day + i * 5 + 4, "Show", "A1", short[0], i % 7 == 0, 0.8)
+        if i % 1000 == 0:
+            asrun.flush()
+    asrun.flush()
+    export_path = os.path.join(workdir, "asrun_export.csv")
+    res.time(f"asrun.export_hour_of_{ASRUN_PLAYS}", lambda: asrun.export(export_path, day + 43200, day + 46800),
+             repeat=max(res.repeat // 4, 3))
+    asrun.close()
+
+    # Offline analysis
+    if O.np is not None:
+        samples = pcm.samples(short[-1])
+        rate = pygame.mixer.get_init()[0]
+        res.time("analysis.loudness_30s", lambda: O.analyze_loudness(samples, rate), repeat=max(res.repeat // 4, 3))
+        res.time("analysis.silence_30s", lambda: O.detect_silence(samples, rate), repeat=max(res.repeat // 4, 3))
+        res.time("waveform.peaks_30s", lambda: O.compute_peaks(samples), repeat=max(res.repeat // 4, 3))
+    else:
+        for name in ("analysis.loudness_30s", "analysis.silence_30s", "waveform.peaks_30s"):
+            res.skip(name, "numpy not installed")
+    pygame.mixer.quit()
+
+
+def bench_engine_process(O, path, workdir, res):
+    """The trigger round trip across processes, with serve_engine on a throwaway port."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        address = s.getsockname()
+    code = f"import sys; sys.path.insert(0, {REPO!r}); import OppodcastStudio as O; O.serve_engine({address!r})"
+    proc = subprocess.Popen([sys.executable, "-c", code], cwd=workdir,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        client = O.EngineClient.connect(wait=O.ENGINE_SPAWN_TIMEOUT * 2, address=address)
+        if client is None:
+            res.skip("engine.process_play_roundtrip", "engine process did not answer")
+            return
+        client.load("A1", path, False)
+        while not any(e[0] == "loaded" for e in client.drain()):
+            time.sleep(0.001)
+
+        def engine_trigger():
+            channel = client.play("A1")
+            while client.conn.poll(1):
+                if client.conn.recv()[0] == "started": break
+            channel.stop()
+        res.time("engine.process_play_roundtrip", engine_trigger, repeat=res.repeat * 5)
+        client.close()
+        proc.wait(5)
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+
+
+def bench_import(workdir, res):
+    """Cold import of the app module in a fresh interpreter (no window)."""
+    code = f"import sys; sys.path.insert(0, {REPO!r}); import OppodcastStudio"
+    samples = []
+    for _ in range(max(res.repeat // 4, 3)):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=workdir, check=True, capture_output=True)
+        samples.append((time.perf_counter() - t0) * 1000)
+    res.add("cold_start.import", samples)
+
+
+# --- UI (needs a display) ---
+def start_display():
+    """Make sure Tk can open a window; returns the Xvfb process we started, if any."""
+    if os.environ.get("DISPLAY") or sys.platform in ("win32", "darwin"):
+        return None
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        return None
+    display = f":{random.randint(100, 400)}"
+    proc = subprocess.Popen([xvfb, display, "-screen", "0", "1600x1000x24", "-nolisten", "tcp"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(1.0)
+    os.environ["DISPLAY"] = display
+    return proc
+
+
+def pump(app, until, timeout=30.0):
+    """Run the Tk loop until `until()` is true."""
+    deadline = time.perf_counter() + timeout
+    while not until():
+        app.update()
+        if time.perf_counter() > deadline:
+            raise TimeoutError("UI benchmark did not settle")
+        time.sleep(0.0005)
+
+
+def bench_ui(app_module, fixtures, workdir, res):
+    O = app_module
+    short = [p for n, p in fixtures.items() if n.startswith("tone_2s") or n.startswith("tone_30s")]
+    slots = [f"{r}{c}" for r in "ABCDE" for c in range(1, 7)][:SLOTS]
+    for name, offset in (("BenchA", 0), ("BenchB", 1)):
+        entries = {slot: short[(i + offset) % len(short)] for i, slot in enumerate(slots)}
+        with open(os.path.join(O.CONFIG_DIR, f"{name}.json"), "w") as f:
+            json.dump(entries, f)
+    layout = [{"rows": 5, "cols": 6, "slots": {slot: short[(i + b) % len(short)] for i, slot in enumerate(slots)}}
+              for b in range(BANKS)]
+    with open(os.path.join(O.CONFIG_DIR, "BenchBanks.json"), "w") as f:
+        json.dump({"banks": layout}, f)
+
+    t0 = time.perf_counter()
+    app = O.OppodcastDesktop()
+    app.update()
+    res.add("cold_start.window", [(time.perf_counter() - t0) * 1000])
+    # Progressive startup: the rest follows a step per loop turn, timed by the app itself
+    pump(app, lambda: any(step == "interactive" for step, _ in app.diagnostics.startup))
+    res.add("cold_start.interactive", [(time.perf_counter() - t0) * 1000],
+            timeline={step: round(ms, 1) for step, ms in app.diagnostics.startup})
+
+    def loaded():
+        return all(s.sound is not None for s in app.deck.banks[0].slots if s.file_path) and not app.engine.is_busy()
+
+    def load(name):
+        app.load_preset(name)
+        pump(app, loaded)
+    res.time(f"load_preset_{SLOTS}", lambda: load("BenchA"), repeat=max(res.repeat // 4, 3))
+
+    names = iter(["BenchB", "BenchA"] * res.repeat)
+    res.time("preset_switch", lambda: load(next(names)), repeat=max(res.repeat // 4, 3))
+
+    # On-air switch: staged behind the current grid, swapped in once ready
+    def switch(name):
+        app.change_preset(name)
+        pump(app, lambda: app.next_deck is None)
+    res.time("preset_switch_staged", lambda: switch(next(names)), repeat=max(res.repeat // 4, 3))
+
+    # Only the visible bank has to be ready; the rest loads behind it
+    res.time(f"load_preset_{BANKS}_banks", lambda: load("BenchBanks"), repeat=max(res.repeat // 4, 3))
+    banks = iter(list(range(1, BANKS)) * res.repeat)
+    res.time("bank_switch", lambda: (app.show_bank(next(banks)), app.update_idletasks()))
+    load("BenchA")
+
+    app.is_edit_mode = True
+    a, b = app.deck.slots[slots[0]], app.deck.slots[slots[1]]
+    res.time("swap_slots", lambda: app.swap_slots(a, b))
+    app.cancel_preset_save()
+
+    res.time("set_volume", lambda v: app.set_volume(v), setup=lambda: random.uniform(0.1, 1.0))
+
+    app.is_edit_mode = False
+    pad = app.deck.slots[slots[0]].view
+
+    def trigger_and_stop():
+        pad.on_click()
+        app.update_idletasks()
+        pad.on_click()
+    res.time("trigger.on_click", trigger_and_stop, repeat=res.repeat * 2)
+
+    app.library.add([os.path.join(workdir, "lib", f"jingle_{i:05d}.wav") for i in range(LIBRARY_SIZE)])
+    res.time(f"library_view.refresh_{LIBRARY_SIZE}", lambda: (app.library_view.refresh(), app.update_idletasks()))
+    res.time("library_view.scroll", lambda: (app.library_view.scroll(7), app.update_idletasks()))
+
+    app.txt_notes.delete("0.0", "end")
+    app.txt_notes.insert("0.0", ("INTRO - welcome back to the show\n" * (NOTES_SIZE // 32))[:NOTES_SIZE])
+    res.time("save_notes_2mb", app.save_notes)
+
+    app.on_close()
+
+
+def compare(current, baseline_path, tolerance, min_delta):
+    """Print median ratios against a previous run; True if nothing regressed."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    ok = True
+    print(f"{'benchmark':40} {'base':>10} {'now':>10} {'ratio':>7}", file=sys.stderr)
+    for name, result in current.items():
+        if name not in baseline: continue
+        base, now = baseline[name]["median"], result["median"]
+        ratio = now / base if base > 0 else 1.0
+        flag = ""
+        if ratio > 1 + tolerance and now - base > min_delta:
+            ok = False
+            flag = "  REGRESSION"
+        print(f"{name:40} {base:10.3f} {now:10.3f} {ratio:7.2f}{flag}", file=sys.stderr)
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("-o", "--output", help="write the JSON results here instead of stdout")
+    parser.add_argument("--quick", action="store_true", help="fewer repeats, for a fast smoke run")
+    parser.add_argument("--repeat", type=int, help="timed runs per benchmark (default 40, 8 with --quick)")
+    parser.add_argument("--compare", metavar="BASELINE", help="previous JSON results to check against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed median slowdown (default 0.25 = 25%%)")
+    parser.add_argument("--min-delta", type=float, default=0.05,
+                        help="ignore slowdowns smaller than this many ms (timer noise on tiny benchmarks)")
+    parser.add_argument("--no-ui", action="store_true", help="skip the benchmarks that need a window")
+    args = parser.parse_args()
+
+    res = Results(args.repeat or (8 if args.quick else 40))
+    workdir = tempfile.mkdtemp(prefix="oppodcast-bench-")
+    xvfb = None
+    try:
+        print("Generating fixtures...", file=sys.stderr)
+        fixtures = make_fixtures(workdir)
+
+        # The app keeps presets/caches relative to the working directory
+        os.chdir(workdir)
+        sys.path.insert(0, REPO)
+        bench_import(workdir, res)
+        import OppodcastStudio
+        bench_core(OppodcastStudio, fixtures, workdir, res)
+
+        if args.no_ui:
+            res.skip("ui", "--no-ui")
+        else:
+            xvfb = start_display()
+            try:
+                bench_ui(OppodcastStudio, fixtures, workdir, res)
+            except Exception as e:  # Typically no display available
+                res.skip("ui", f"{type(e).__name__}: {e}")
+    finally:
+        if xvfb: xvfb.terminate()
+        os.chdir(REPO)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    import pygame
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pygame": pygame.version.ver,
+            "numpy": getattr(sys.modules.get("numpy"), "__version__", None),
+            "repeat": res.repeat,
+        },
+        "results": res.results,
+        "skipped": res.skipped,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare and not compare(res.results, args.compare, args.tolerance, args.min_delta):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
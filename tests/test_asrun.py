@@ -0,0 +1,149 @@
+"""
+Headless tests of the as-run log: the in-memory ring, rotation, reading
+back around torn lines, and the CSV/JSON export, in a throwaway folder.
+
+    python -m unittest discover -s tests    (or: python -m pytest tests)
+"""
+import os
+import re
+import csv
+import sys
+import json
+import time
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+import OppodcastStudio as O  # noqa: E402
+
+T0 = 1_790_000_000.0  # Epoch seconds the fake plays start from
+
+
+def play(n, length=10):
+    """Arguments of record() for the n-th fake play."""
+    start = T0 + n * 60
+    return start, start + length, "Default", f"A{n}", f"/music/{n}.wav", n % 2 == 1, 1.0
+
+
+def stamp(t):
+    return datetime.fromtimestamp(t).isoformat(sep=" ", timespec="milliseconds")
+
+
+class AsRunLogTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="oppodcast-test-")
+        self.path = os.path.join(self.workdir, "logs", "asrun.jsonl")
+        self.log = None
+
+    def tearDown(self):
+        if self.log:
+            self.log.close()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def open(self, **kwargs):
+        """A log whose writer only runs when flushed or closed."""
+        self.log = O.AsRunLog(self.path, flush_every=3600, **kwargs)
+        return self.log
+
+    def lines(self, path=None):
+        with open(path or self.path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_record_and_read_back(self):
+        log = self.open()
+        for n in range(3):
+            log.record(*play(n))
+        self.assertFalse(os.path.exists(self.path))  # record() does no I/O
+        self.assertEqual(list(log.entries()), [list(play(n)) for n in range(3)])
+        self.assertEqual(self.lines(), [list(play(n)) for n in range(3)])
+
+    def test_ring_overflow_drops_the_oldest(self):
+        log = self.open(capacity=4)
+        for n in range(10):
+            log.record(*play(n))
+        self.assertEqual(log.dropped, 6)
+        log.flush()
+        self.assertEqual(self.lines(), [list(play(n)) for n in range(6, 10)])
+        log.record(*play(10))
+        log.flush()
+        self.assertEqual(log.dropped, 6)
+        self.assertEqual(self.lines()[-1], list(play(10)))
+
+    def test_close_writes_what_is_left(self):
+        log = self.open()
+        log.record(*play(0))
+        log.close()
+        self.assertFalse(log.thread.is_alive())
+        self.assertEqual(self.lines(), [list(play(0))])
+
+    def test_rotation_and_keep(self):
+        log = self.open(max_bytes=1, keep=2)  # Every write fills the file
+        for n in range(4):
+            log.record(*play(n))
+            log.flush()
+            time.sleep(0.002)  # Rotated names are stamped to the microsecond
+        files = log.files()
+        self.assertEqual(files[-1], (None, self.path))
+        self.assertFalse(os.path.exists(self.path))
+        rotated = [path for _, path in files[:-1]]
+        self.assertEqual(len(rotated), 2)
+        for path in rotated:
+            self.assertRegex(os.path.basename(path), r"^asrun-\d{8}-\d{6}-\d{6}\.jsonl$")
+        self.assertEqual([self.lines(path) for path in rotated], [[list(play(2))], [list(play(3))]])
+        self.assertEqual(sorted(os.listdir(os.path.dirname(self.path))), sorted(map(os.path.basename, rotated)))
+        self.assertEqual(list(log.entries()), [list(play(2)), list(play(3))])
+
+    def test_time_filter_and_torn_lines(self):
+        log = self.open()
+        for n in range(5):
+            log.record(*play(n))
+        log.flush()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('[1790000600.0,17900\n')  # Torn inside the prefix
+            f.write('[1790000600.0,1790000610.0,"Default","A9",\n')  # Torn after it
+            f.write('not json\n')
+            f.write(json.dumps(list(play(5)), separators=(",", ":")))  # Last line, unterminated
+        self.assertEqual(list(log.entries()), [list(play(n)) for n in range(6)])
+        # Plays 1-3 were on air between T0+65 and T0+185: 1 by its stop, 3 by its start
+        self.assertEqual([e[3] for e in log.entries(T0 + 65, T0 + 185)], ["A1", "A2", "A3"])
+        self.assertEqual([e[3] for e in log.entries(T0 + 200)], ["A4", "A5"])
+        self.assertEqual([e[3] for e in log.entries(None, T0 + 5)], ["A0"])
+
+    def test_export_csv(self):
+        log = self.open()
+        for n in (2, 0, 1):
+            log.record(*play(n))
+        out = os.path.join(self.workdir, "report.csv")
+        self.assertEqual(log.export(out, T0, T0 + 70), 2)
+        with open(out, newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(rows[0], list(O.AsRunLog.FIELDS))
+        start, stop, *rest = play(0)
+        self.assertEqual(rows[1], [stamp(start), stamp(stop), *map(str, rest)])
+        self.assertEqual(rows[2][3], "A1")
+        self.assertEqual(rows[2][5], "True")
+        self.assertTrue(re.match(r"\d{4}-\d\d-\d\d \d\d:\d\d:\d\d\.\d{3}$", rows[1][0]))
+
+    def test_export_json(self):
+        log = self.open()
+        for n in range(3):
+            log.record(*play(n))
+        out = os.path.join(self.workdir, "report.JSON")
+        self.assertEqual(log.export(out), 3)
+        with open(out, encoding="utf-8") as f:
+            rows = json.load(f)
+        start, stop, preset, slot, path, interrupted, volume = play(1)
+        self.assertEqual(rows[1], {"start": stamp(start), "stop": stamp(stop), "preset": preset, "slot": slot,
+                                   "file": path, "interrupted": interrupted, "volume": volume})
+        self.assertEqual([row["slot"] for row in rows], ["A0", "A1", "A2"])
+        self.assertEqual(log.export(os.path.join(self.workdir, "empty.json"), T0 + 10000), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,255 @@
+"""
+Headless tests of the audio engine protocol: AudioEngine behind a real
+serve_engine process on a throwaway port, driven through EngineClient the
+way the window drives it, plus the same protocol on a thread.
+
+    python -m unittest discover -s tests    (or: python -m pytest tests)
+
+Audio goes to SDL's dummy driver and everything runs in a temporary
+directory, so no sound card is needed and the real caches are untouched.
+"""
+import os
+import sys
+import time
+import wave
+import socket
+import shutil
+import signal
+import tempfile
+import unittest
+import subprocess
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+import OppodcastStudio as O  # noqa: E402
+
+TIMEOUT = 10  # Seconds to wait for an event before failing
+
+
+def write_wav(path, seconds, rate=44100):
+    with wave.open(path, "wb") as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(b"\x00\x10\x00\x10" * int(seconds * rate))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def events_until(client, kind, slot_id=None, timeout=TIMEOUT):
+    """Drain `client` until an event of `kind` (for `slot_id`) arrives; returns every event up to it."""
+    deadline = time.monotonic() + timeout
+    seen = []
+    while time.monotonic() < deadline:
+        for event in client.drain():
+            seen.append(event)
+            if event[0] == kind and (slot_id is None or event[1] == slot_id):
+                return seen
+        time.sleep(0.01)
+    raise AssertionError(f"no {kind!r} event for {slot_id!r} within {timeout} s")
+
+
+def wait_for(client, kind, slot_id=None, timeout=TIMEOUT):
+    """Drain `client` until an event of `kind` (for `slot_id`) arrives; returns it."""
+    return events_until(client, kind, slot_id, timeout)[-1]
+
+
+class EngineCase(unittest.TestCase):
+    """Fixture files and a working directory shared by the protocol tests."""
+    @classmethod
+    def setUpClass(cls):
+        cls.cwd = os.getcwd()
+        cls.workdir = tempfile.mkdtemp(prefix="oppodcast-test-")
+        os.chdir(cls.workdir)  # The engine key and caches are relative to it
+        cls.short = os.path.join(cls.workdir, "short.wav")
+        cls.long = os.path.join(cls.workdir, "long.wav")
+        write_wav(cls.short, 0.3)
+        write_wav(cls.long, 20)
+
+    @classmethod
+    def tearDownClass(cls):
+        os.chdir(cls.cwd)
+        shutil.rmtree(cls.workdir, ignore_errors=True)
+
+    def load(self, client, slot_id, path):
+        client.load(slot_id, path)
+        event = wait_for(client, "loaded", slot_id)
+        self.assertEqual(event[2], path)
+        return event[4]
+
+
+class ProcessEngineTest(EngineCase):
+    """serve_engine in its own process, as `OppodcastStudio.py --engine` runs it."""
+    def setUp(self):
+        self.address = ("127.0.0.1", free_port())
+        self.proc = self.spawn()
+        self.client = self.connect()
+
+    def tearDown(self):
+        if self.proc.poll() is None:
+            self.client.close()
+            try:
+                self.proc.wait(5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+
+    def spawn(self):
+        code = f"import sys; sys.path.insert(0, {REPO!r}); import OppodcastStudio as O; O.serve_engine({self.address!r})"
+        return subprocess.Popen([sys.executable, "-c", code], cwd=self.workdir,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def connect(self):
+        client = O.EngineClient.connect(wait=TIMEOUT, address=self.address)
+        self.assertIsNotNone(client, "engine did not answer")
+        return client
+
+    def reconnect(self):
+        """Connect again, as a restarted window would; returns the engine's state snapshot."""
+        self.client = self.connect()
+        kind, state = self.client.drain()[0]
+        self.assertEqual(kind, "state")
+        return state
+
+    def test_connect_sends_state(self):
+        kind, state = self.client.drain()[0]
+        self.assertEqual(kind, "state")
+        self.assertEqual(state["voices"], {})
+
+    def test_load_play_and_end(self):
+        sound = self.load(self.client, "P/A1", self.short)
+        self.assertAlmostEqual(sound.get_length(), 0.3, places=2)
+        self.assertFalse(sound.streamed)
+        channel = self.client.play("P/A1")
+        self.assertEqual(wait_for(self.client, "started", "P/A1")[0], "started")
+        self.assertTrue(self.client.is_playing("P/A1"))
+        wait_for(self.client, "ended", "P/A1")
+        self.assertFalse(channel.get_busy())
+        self.assertFalse(self.client.is_busy())
+
+    def test_missing_file_fails(self):
+        self.client.load("P/A1", os.path.join(self.workdir, "nowhere.wav"))
+        wait_for(self.client, "failed", "P/A1")
+        self.assertNotIn("P/A1", self.client.sounds)
+
+    def test_stop_all(self):
+        self.load(self.client, "P/A1", self.long)
+        self.load(self.client, "P/A2", self.long)
+        self.client.play("P/A1")
+        self.client.play("P/A2")
+        wait_for(self.client, "started", "P/A2")
+        self.client.stop_all()
+        self.assertFalse(self.client.is_playing("P/A1"))
+        self.assertFalse(self.client.is_playing("P/A2"))
+        # What the engine itself holds, as a reconnecting window would see it
+        self.client.conn.close()
+        state = self.reconnect()
+        self.assertEqual(state["voices"], {})
+
+    def test_reconnect_with_voices_on_air(self):
+        self.load(self.client, "P/A1", self.long)
+        token = self.client.play("P/A1").token
+        start = wait_for(self.client, "started", "P/A1")[2]
+        self.client.conn.close()  # The window crashed: the engine keeps playing
+        time.sleep(0.3)
+        self.assertIsNone(self.proc.poll())
+        state = self.reconnect()
+        self.assertEqual(set(state["voices"]), {"P/A1"})
+        voice_token, voice_start, duration, paused_at, loop = state["voices"]["P/A1"]
+        self.assertEqual((voice_token, paused_at, loop), (token, None, False))
+        self.assertAlmostEqual(voice_start, start, places=3)
+        self.assertAlmostEqual(duration, 20, places=1)
+        self.assertFalse(state["paused"])
+
+    def test_engine_death(self):
+        self.load(self.client, "P/A1", self.long)
+        self.client.play("P/A1")
+        wait_for(self.client, "started", "P/A1")
+        self.proc.send_signal(signal.SIGKILL if hasattr(signal, "SIGKILL") else signal.SIGTERM)
+        self.proc.wait(5)
+        deadline = time.monotonic() + TIMEOUT
+        while not self.client.lost and time.monotonic() < deadline:
+            self.client.drain()
+            time.sleep(0.01)
+        self.assertTrue(self.client.lost)
+        self.client.load("P/A2", self.short)  # Dropped, without raising
+        self.assertFalse(self.client.is_busy())
+
+    def test_shutdown_on_close(self):
+        self.client.close()
+        self.assertEqual(self.proc.wait(5), 0)
+
+
+class ThreadEngineTest(EngineCase):
+    """The same protocol with the engine on a thread (OPPODCAST_ENGINE=thread)."""
+    def setUp(self):
+        self.client = O.EngineClient.in_thread()
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_load_play_and_end(self):
+        self.load(self.client, "P/A1", self.short)
+        self.client.play("P/A1")
+        wait_for(self.client, "started", "P/A1")
+        wait_for(self.client, "ended", "P/A1")
+
+    def test_retrigger_only_reports_the_latest_voice(self):
+        self.load(self.client, "P/A1", self.long)
+        self.client.set_mode("P/A1", "retrigger")
+        first = self.client.play("P/A1")
+        second = self.client.play("P/A1")
+        wait_for(self.client, "started", "P/A1")
+        self.assertIsNot(first, second)
+        self.assertTrue(self.client.stop("P/A1"))
+        self.assertFalse(self.client.is_playing("P/A1"))
+
+    def test_full_pool_steals_the_lowest_priority_voice(self):
+        # The oldest voice is a loop, then overlap voices (lowest priority) fill the pool
+        fillers = [f"P/O{i}" for i in range(O.MAX_MIXER_CHANNELS - 1)]
+        for slot_id in ["P/L", *fillers, "P/N"]:
+            self.load(self.client, slot_id, self.long)
+        self.client.set_mode("P/L", "loop")
+        self.client.play("P/L")
+        for slot_id in fillers:
+            self.client.set_mode(slot_id, "overlap")
+            self.client.play(slot_id)
+        wait_for(self.client, "started", fillers[-1])
+        self.assertTrue(all(self.client.is_playing(s) for s in ["P/L", *fillers]))
+
+        self.client.play("P/N")
+        events = events_until(self.client, "started", "P/N")
+        self.assertEqual([e[1] for e in events if e[0] == "ended"], [fillers[0]])
+        self.assertFalse(self.client.is_playing(fillers[0]))
+        self.assertTrue(self.client.is_playing("P/L"))
+        self.assertTrue(self.client.is_playing(fillers[1]))
+        self.client.stop_all()
+
+    def test_cue_list_follows_and_seeks(self):
+        self.load(self.client, "P/A1", self.short)
+        self.load(self.client, "P/A2", self.short)
+        self.client.cue_list(["P/A1", "P/A2"], 0.0, True)
+        self.assertEqual(wait_for(self.client, "cue"), ("cue", -1))
+        self.client.cue_go()  # The second item follows by itself, queued behind the first
+        events = events_until(self.client, "ended", "P/A2")
+        cued = [e for e in events if e[0] == "cued"]
+        self.assertEqual([e[1] for e in cued], ["P/A1", "P/A2"])
+        self.assertGreaterEqual(cued[1][3], cued[0][3] + 0.25)
+        self.assertEqual([e for e in events if e[0] == "cue"], [("cue", 0), ("cue", 1)])
+
+        self.client.cue_seek(1)
+        self.client.cue_go()
+        events = events_until(self.client, "ended", "P/A2")
+        self.assertEqual([e[1] for e in events if e[0] == "cued"], ["P/A2"])
+        self.assertEqual([e for e in events if e[0] == "cue"], [("cue", 0), ("cue", 1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+Headless tests of the library index and folder watcher: a throwaway folder
+and SQLite file, scanned the way the watcher thread scans a library root.
+
+    python -m unittest discover -s tests    (or: python -m pytest tests)
+"""
+import os
+import sys
+import time
+import wave
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+import OppodcastStudio as O  # noqa: E402
+
+TIMEOUT = 10  # Seconds to wait for the importer before failing
+
+
+def write_wav(path, seconds, rate=44100):
+    with wave.open(path, "wb") as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(b"\x00\x10\x00\x10" * int(seconds * rate))
+
+
+class LibraryCase(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp(prefix="oppodcast-test-")
+        self.root = os.path.join(self.workdir, "music")
+        os.makedirs(os.path.join(self.root, "jingles"))
+        self.index = O.LibraryIndex(os.path.join(self.workdir, "library.db"))
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def file(self, *parts, seconds=0.2):
+        path = os.path.join(self.root, *parts)
+        write_wav(path, seconds)
+        return path
+
+
+class LibraryIndexTest(LibraryCase):
+    def test_files_under_is_a_prefix_range(self):
+        inside = os.path.join(self.root, "a.wav")
+        nested = os.path.join(self.root, "jingles", "b.wav")
+        sibling = self.root + "2" + os.sep + "c.wav"  # Same string prefix, other folder
+        for path, size in ((inside, 1), (nested, 2), (sibling, 3)):
+            self.index.put(path, {"size": size, "mtime_ns": 10, "status": "ok"})
+        self.assertEqual(self.index.files_under(self.root), {inside: (10, 1), nested: (10, 2)})
+        self.assertEqual(self.index.files_under(os.path.join(self.root, "jingles")), {nested: (10, 2)})
+        self.assertEqual(self.index.files_under(os.path.join(self.workdir, "elsewhere")), {})
+
+
+class LibraryWatcherTest(LibraryCase):
+    def setUp(self):
+        super().setUp()
+        self.importer = O.LibraryImporter(self.index, None)
+        self.watcher = O.LibraryWatcher(self.index, self.importer, interval=3600)
+
+    def tearDown(self):
+        self.watcher.stop()
+        self.watcher.thread.join(5)
+        self.importer.shutdown()
+        super().tearDown()
+
+    def scan(self):
+        """One scan of the root, waiting for the importer to file what it queued."""
+        self.watcher.scan(self.root)
+        deadline = time.monotonic() + TIMEOUT
+        while self.importer.is_busy():
+            self.assertLess(time.monotonic(), deadline, "importer did not finish")
+            self.importer.drain()
+            time.sleep(0.01)
+        return self.watcher.drain()
+
+    def test_added_changed_removed(self):
+        a = self.file("a.wav")
+        b = self.file("jingles", "b.wav")
+        self.file("notes.txt")
+        self.assertEqual(self.scan(), ({O.path_key(a), O.path_key(b)}, set(), set()))
+        self.assertEqual(self.index.files_under(self.root)[b], (os.stat(b).st_mtime_ns, os.stat(b).st_size))
+
+        self.assertEqual(self.scan(), (set(), set(), set()))
+
+        write_wav(a, 0.4)
+        st = os.stat(a)
+        os.utime(a, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+        self.assertEqual(self.scan(), (set(), {O.path_key(a)}, set()))
+        self.assertEqual(self.index.files_under(self.root)[a], (st.st_mtime_ns + 10 ** 9, st.st_size))
+
+        os.remove(b)
+        self.assertEqual(self.scan(), (set(), set(), {O.path_key(b)}))
+        self.assertEqual(set(self.index.files_under(self.root)), {a})
+
+    def test_deleted_folder_is_removed(self):
+        b = self.file("jingles", "b.wav")
+        self.scan()
+        shutil.rmtree(os.path.join(self.root, "jingles"))
+        self.assertEqual(self.scan(), (set(), set(), {O.path_key(b)}))
+
+    def test_unreachable_root_keeps_the_index(self):
+        a = self.file("a.wav")
+        self.scan()
+        moved = self.root + "-unplugged"
+        os.rename(self.root, moved)  # As if the drive was unplugged
+        self.assertEqual(self.scan(), (set(), set(), set()))
+        self.assertEqual(set(self.index.files_under(self.root)), {a})
+
+    def test_unlistable_folder_aborts_the_scan(self):
+        a = self.file("a.wav")
+        b = self.file("jingles", "b.wav")
+        self.scan()
+        os.remove(a)
+        walk = os.walk
+
+        def failing_walk(top, onerror=None, **kwargs):
+            for entry in walk(top, onerror=onerror, **kwargs):
+                if entry[0].endswith("jingles"):
+                    onerror(PermissionError(13, "Permission denied", entry[0]))
+                yield entry
+
+        with mock.patch.object(O.os, "walk", failing_walk), self.assertRaises(PermissionError):
+            self.watcher.scan(self.root)
+        self.assertEqual(self.watcher.drain(), (set(), set(), set()))
+        self.assertEqual(set(self.index.files_under(self.root)), {a, b})
+
+
+if __name__ == "__main__":
+    unittest.main()
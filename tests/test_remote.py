@@ -0,0 +1,190 @@
+"""
+Headless tests of the remote control's wire formats and guards: OSC
+packets, WebSocket frames, the shared token, browser origins and the
+per-client rate limit. No sockets are bound.
+
+    python -m unittest discover -s tests    (or: python -m pytest tests)
+"""
+import os
+import sys
+import struct
+import asyncio
+import unittest
+from unittest import mock
+
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+import OppodcastStudio as O  # noqa: E402
+
+
+def bundle(*elements):
+    """OSC bundle of already encoded packets, with an 'immediately' time tag."""
+    return b"#bundle\0" + struct.pack(">Q", 1) + b"".join(struct.pack(">i", len(e)) + e for e in elements)
+
+
+def client_frame(payload, opcode=0x1, mask=b"\x01\x02\x03\x04", masked=True):
+    """A WebSocket frame as a browser sends it: always masked, unless told otherwise."""
+    length = len(payload)
+    if length < 126:
+        head = struct.pack(">BB", 0x80 | opcode, (0x80 if masked else 0) | length)
+    else:
+        head = struct.pack(">BBH", 0x80 | opcode, (0x80 if masked else 0) | 126, length)
+    if not masked:
+        return head + payload
+    return head + mask + bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+
+
+def read_frame(data):
+    async def read():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return await O.ws_read(reader)
+    return asyncio.run(read())
+
+
+class FakeEngine:
+    def __init__(self):
+        self.calls = []
+
+    def trigger(self, slot_id):
+        self.calls.append(("trigger", slot_id))
+
+    def stop_all(self):
+        self.calls.append(("stop_all",))
+
+
+class FakeTransport:
+    def __init__(self):
+        self.sent = []
+
+    def sendto(self, data, addr):
+        self.sent.append((data, addr))
+
+
+class OscTest(unittest.TestCase):
+    def test_message_round_trip(self):
+        cases = [("/oppodcast/trigger", ["A1"]), ("/oppodcast/volume", [0.5]), ("/oppodcast/go", []),
+                 ("/oppodcast/trigger/B2", [1]), ("/x", [True, False, "ü", 7, -3])]
+        for address, args in cases:
+            with self.subTest(address=address):
+                self.assertEqual(O.osc_parse(O.osc_message(address, *args)), [(address, args)])
+
+    def test_nested_bundles_are_flattened_in_order(self):
+        a, b, c = O.osc_message("/a", 1), O.osc_message("/b", "x"), O.osc_message("/c")
+        self.assertEqual(O.osc_parse(bundle(a, bundle(b, bundle(c)), a)),
+                         [("/a", [1]), ("/b", ["x"]), ("/c", []), ("/a", [1])])
+
+    def test_depth_cap(self):
+        packet = O.osc_message("/a")
+        for _ in range(O.OSC_MAX_DEPTH):
+            packet = bundle(packet)
+        self.assertEqual(O.osc_parse(packet), [("/a", [])])
+        with self.assertRaises(ValueError):
+            O.osc_parse(bundle(packet))
+
+    def test_deep_nesting_does_not_recurse(self):
+        packet = O.osc_message("/a")
+        for _ in range(5000):
+            packet = bundle(packet)
+        with self.assertRaises(ValueError):
+            O.osc_parse(packet)
+
+    def test_bad_element_sizes(self):
+        message = O.osc_message("/a")
+        head = b"#bundle\0" + struct.pack(">Q", 1)
+        for size in (0, -4, len(message) + 4, 1 << 30):
+            with self.subTest(size=size), self.assertRaises(ValueError):
+                O.osc_parse(head + struct.pack(">i", size) + message)
+
+    def test_malformed_packets_are_dropped(self):
+        remote = O.RemoteControl(FakeEngine(), {"preset": "Default"})
+        protocol = O._OscProtocol(remote)
+        deep = O.osc_message("/oppodcast/stop_all")
+        for _ in range(5000):
+            deep = bundle(deep)
+        for packet in (deep, b"/oppodcast/trigger", O.osc_message("/oppodcast/volume", 1)[:-2],
+                       bundle(O.osc_message("/oppodcast/stop_all"))[:-4]):
+            protocol.datagram_received(packet, ("127.0.0.1", 9999))  # Must not raise
+        self.assertEqual(remote.engine.calls, [])
+
+
+class WebSocketTest(unittest.TestCase):
+    def test_masked_frames(self):
+        self.assertEqual(read_frame(client_frame(b'{"cmd": "go"}')), (0x1, b'{"cmd": "go"}'))
+        self.assertEqual(read_frame(client_frame(b"x" * 300, opcode=0x9)), (0x9, b"x" * 300))
+        self.assertEqual(read_frame(client_frame(b"", opcode=0x8)), (0x8, b""))
+
+    def test_unmasked_frame_is_rejected(self):
+        with self.assertRaises(ValueError):
+            read_frame(client_frame(b'{"cmd": "go"}', masked=False))
+
+    def test_oversized_frame_is_rejected(self):
+        head = struct.pack(">BBQ", 0x81, 0x80 | 127, O.REMOTE_MAX_MESSAGE + 1)
+        with self.assertRaises(ValueError):
+            read_frame(head + b"\0" * 4)
+
+    def test_truncated_frame(self):
+        with self.assertRaises(asyncio.IncompleteReadError):
+            read_frame(client_frame(b"hello")[:-2])
+
+
+class GuardTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = FakeEngine()
+        self.state = {"playing": [], "paused": False, "volume": 1.0, "preset": "Default"}
+
+    def test_loopback_needs_no_token(self):
+        remote = O.RemoteControl(self.engine, self.state, host="127.0.0.1")
+        self.assertIsNone(remote.token)
+        self.assertTrue(remote.check_token(None))
+
+    def test_token(self):
+        remote = O.RemoteControl(self.engine, self.state, host="0.0.0.0", token="secret")
+        self.assertTrue(remote.check_token("secret"))
+        for value in (None, "", "secre", "secret ", "Secret", 123, ["secret"]):
+            with self.subTest(value=value):
+                self.assertFalse(remote.check_token(value))
+
+    def test_osc_commands_need_a_subscribed_host(self):
+        remote = O.RemoteControl(self.engine, self.state, host="0.0.0.0", token="secret")
+        remote.osc_transport = FakeTransport()
+        remote.on_osc("/oppodcast/stop_all", [], ("10.0.0.5", 9000))
+        remote.on_osc("/oppodcast/subscribe", ["wrong"], ("10.0.0.5", 9000))
+        remote.on_osc("/oppodcast/stop_all", [], ("10.0.0.5", 9000))
+        self.assertEqual(self.engine.calls, [])
+        self.assertEqual(remote.osc_transport.sent, [])
+        remote.on_osc("/oppodcast/subscribe", ["secret"], ("10.0.0.5", 9000))
+        self.assertEqual(len(remote.osc_transport.sent), 1)
+        remote.on_osc("/oppodcast/stop_all", [], ("10.0.0.5", 9001))
+        remote.on_osc("/oppodcast/stop_all", [], ("10.0.0.6", 9000))
+        self.assertEqual(self.engine.calls, [("stop_all",)])
+
+    def test_origin(self):
+        remote = O.RemoteControl(self.engine, self.state)
+        for origin in (None, "http://localhost:8080", "http://127.0.0.1", "http://[::1]:3000"):
+            with self.subTest(origin=origin):
+                self.assertTrue(remote.check_origin(origin))
+        for origin in ("http://evil.example", "null", "", "http://localhost.evil.example"):
+            with self.subTest(origin=origin):
+                self.assertFalse(remote.check_origin(origin))
+        with mock.patch.object(O, "REMOTE_ORIGINS", {"https://panel.example"}):
+            self.assertTrue(remote.check_origin("https://panel.example"))
+            self.assertFalse(remote.check_origin("https://panel.example.evil"))
+
+    def test_rate_limit(self):
+        remote = O.RemoteControl(self.engine, self.state)
+        with mock.patch.object(O.time, "monotonic", return_value=1000.0):
+            self.assertEqual(sum(remote.allow("a") for _ in range(O.REMOTE_BURST + 10)), O.REMOTE_BURST)
+            self.assertTrue(remote.allow("b"))  # Buckets are per client
+        with mock.patch.object(O.time, "monotonic", return_value=1000.0 + 2.5 / O.REMOTE_RATE):
+            self.assertEqual(sum(remote.allow("a") for _ in range(10)), 2)
+        with mock.patch.object(O.time, "monotonic", return_value=2000.0):
+            self.assertEqual(sum(remote.allow("a") for _ in range(O.REMOTE_BURST + 10)), O.REMOTE_BURST)
+
+
+if __name__ == "__main__":
+    unittest.main()